@@ -2,7 +2,10 @@
 import argparse
 import copy
 import contextlib
+import functools
+import hashlib
 import inspect
+import io
 import json
 import os
 import re
@@ -10,12 +13,14 @@ import shutil
 import stat
 import subprocess
 import sys
+import threading
 import time
 import types
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Optional, Union
 
+from doc_build import pandoc_server
 from doc_build.ast_diff import diff_ast_files
 from doc_build.diff_colors import (
     DIFF_SECTION_DEL_PALE_RED,
@@ -23,6 +28,8 @@ from doc_build.diff_colors import (
     DIFF_WORD_DEL_RED,
     DIFF_WORD_INS_GREEN,
 )
+from doc_build.filters.shared_filter_utils import get_section_anchor
+from doc_build.source_map import SOURCE_MAP_FILENAME, SourceMap
 from doc_build.utils import git as git_utils
 
 try:
@@ -49,6 +56,17 @@ MARKDOWN_OUTPUT_FORMAT = "gfm"
 MARKDOWN_FORMAT = "markdown-hard_line_breaks"
 COMBINED_SPEC_BASENAME = "combined_spec"
 COMBINED_SPEC_FILENAME = f"{COMBINED_SPEC_BASENAME}.md"
+# Path -> anchor index of the inlined sections, written by flatten() and read
+# by filter_resolve_sections.
+SECTION_INDEX_FILENAME = "section_index.json"
+# Clause-number maps for filter_iso_xrefs, computed once per build.
+ISO_CLAUSE_MAPS_FILENAME = "iso_clause_maps.json"
+# Persistent image content-hash index (see filters/image_hash_cache.py), kept
+# in the build cache dir so it survives between builds.
+IMAGE_HASH_CACHE_FILENAME = "image_hashes.json"
+# Code points covered by each bundled font (see pdf_precheck.py), in the build
+# cache dir.
+FONT_COVERAGE_CACHE_FILENAME = "font_coverage.json"
 
 DIFF_BEFORE_FILENAME_TEMPLATE = "{base}.before_{from_short}"
 DIFF_AFTER_FILENAME_TEMPLATE = "{base}.after_{to_short}"
@@ -61,6 +79,7 @@ DIFF_DIFF_FILENAME_TEMPLATE = "{base}.diff_{from_short}_to_{to_short}"
 GATE_DEFAULT_NO_CHECK_GLYPHS = False
 GATE_DEFAULT_CHECK_OVERFLOW = False
 GATE_DEFAULT_OVERFLOW_THRESHOLD_PT = 1.0
+GATE_DEFAULT_STRICT_PRECHECK = False
 
 
 class _ZeroToTwoArgsAction(argparse.Action):
@@ -177,6 +196,117 @@ def _report_pdf_diagnostics(
         )
 
 
+# Warnings tectonic prints that carry no information about the PDF.
+_IGNORED_TECTONIC_WARNINGS = (
+    # Spurious warning: https://github.com/tectonic-typesetting/tectonic/discussions/1192#discussioncomment-9463365
+    "warning: Trying to include PDF file with version ",
+    # Can also be safely ignored
+    "warning: accessing absolute path ",
+    # Just reporting fluff
+    "warning: warnings were issued",
+)
+
+
+class _PdfGateTripped(Exception):
+    """Raised while tectonic runs once the PDF quality gate is certain to fail."""
+
+
+class _TectonicDiagnostics:
+    """tectonic's stderr, sorted line by line into what the PDF quality gate reads.
+
+    ``overflows`` holds ``[pt, line]`` pairs, ``missing_glyphs`` the raw
+    warning lines and ``messages`` any other line worth showing.  Lines are
+    fed in as tectonic prints them (add_line), keeping live counts of the
+    defects the gate of *args* fails on; once the gate is certain to fail,
+    add_line raises _PdfGateTripped so the typeset can be abandoned early.
+
+    Keeping the diagnostics as data rather than logging them straight away
+    also lets a cached PDF replay those of the run that produced it.
+    """
+
+    def __init__(self, args, overflows=(), missing_glyphs=(), messages=()):
+        self.check_glyphs = not getattr(args, "no_check_glyphs", GATE_DEFAULT_NO_CHECK_GLYPHS)
+        self.check_overflow = getattr(args, "check_overflow", GATE_DEFAULT_CHECK_OVERFLOW)
+        self.overflow_threshold_pt = getattr(
+            args, "overflow_threshold_pt", GATE_DEFAULT_OVERFLOW_THRESHOLD_PT
+        )
+        self.overflows = []  # [pt: float, line: str]
+        self.missing_glyphs = []  # raw warning lines
+        self.messages = list(messages)
+        self.overflow_count = 0  # overflows at or above the threshold
+        for pt, line in overflows:
+            self._add_overflow(pt, line)
+        self.missing_glyphs.extend(missing_glyphs)
+
+    @classmethod
+    def from_dict(cls, args, data):
+        return cls(args, data["overflows"], data["missing_glyphs"], data["messages"])
+
+    def as_dict(self):
+        return {
+            "overflows": self.overflows,
+            "missing_glyphs": self.missing_glyphs,
+            "messages": self.messages,
+        }
+
+    def _add_overflow(self, pt, line):
+        self.overflows.append([pt, line])
+        if pt >= self.overflow_threshold_pt:
+            self.overflow_count += 1
+
+    def gate_fails(self):
+        return bool(
+            (self.check_glyphs and self.missing_glyphs)
+            or (self.check_overflow and self.overflow_count)
+        )
+
+    def add_line(self, line):
+        if line.startswith(_IGNORED_TECTONIC_WARNINGS):
+            return
+        # Underfull boxes are cosmetic (loose inter-word spacing),
+        # never a margin overflow -- keep ignoring them.
+        # https://www.overleaf.com/learn/how-to/Understanding_underfull_and_overfull_box_warnings
+        if "Underfull " in line:
+            return
+
+        # Overfull \hbox (Xpt too wide): content runs past the right
+        # text margin. Collect (don't silently drop) so it can be
+        # reported and optionally gated. See aousd/doc_build#100.
+        m = _OVERFULL_RE.search(line)
+        if m:
+            self._add_overflow(float(m.group(1)), line)
+        # A character with no glyph in the chosen font is silently
+        # omitted from the PDF -- meaning-changing corruption.
+        elif "Missing character:" in line or "could not represent character" in line:
+            self.missing_glyphs.append(line)
+        else:
+            self.messages.append(line)
+            return
+
+        if self.gate_fails():
+            raise _PdfGateTripped()
+
+    def report(self):
+        """Log the diagnostics and apply the PDF quality gate (_report_pdf_diagnostics)."""
+        for line in self.messages:
+            log(line, file=sys.stderr)
+
+        _report_pdf_diagnostics(
+            self.overflows,
+            self.missing_glyphs,
+            check_glyphs=self.check_glyphs,
+            check_overflow=self.check_overflow,
+            overflow_threshold_pt=self.overflow_threshold_pt,
+        )
+
+
+# Image paths in pandoc's LaTeX output, e.g.
+# \includegraphics[keepaspectratio,alt={Diagram}]{../cache/svg/<sha>-96.pdf}
+_INCLUDEGRAPHICS_RE = re.compile(
+    r"\\includegraphics(?:\[(?:[^\[\]{}]|\{[^{}]*\})*\])?\{([^{}]+)\}"
+)
+
+
 class ExecCommand:
     def __init__(self, binary_name):
         if binary := shutil.which(binary_name):
@@ -184,20 +314,40 @@ class ExecCommand:
         else:
             sys.exit(f"Please install {binary_name}")
 
-    def __run(self, arguments, stderr_processor=None, *args, **kwargs):
+    def __run(self, arguments, stderr_processor=None, *args, check=False, **kwargs):
         command = [self.binary] + arguments
         if stderr_processor:
-
+            # stderr_processor is called with each line of stderr as it is
+            # printed; if it raises, the command is killed and the exception
+            # propagates.  stdout is drained on a thread so that neither pipe
+            # can fill up and stall the command.  A non-zero exit status only
+            # raises CalledProcessError with check=True; without a
+            # stderr_processor it always does (subprocess.check_call).
             process = subprocess.Popen(
                 command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, *args, **kwargs
             )
-            std_out, std_err = process.communicate()
-
-            if std_err := std_err.decode("utf-8"):
-                stderr_processor(std_err)
-
-            if std_out := std_out.decode("utf-8"):
+            std_out = []
+            stdout_reader = threading.Thread(
+                target=lambda: std_out.append(process.stdout.read()), daemon=True
+            )
+            stdout_reader.start()
+            try:
+                with io.TextIOWrapper(process.stderr, encoding="utf-8", errors="replace") as std_err:
+                    for line in std_err:
+                        stderr_processor(line.rstrip("\r\n"))
+            except BaseException:
+                process.kill()
+                raise
+            finally:
+                process.wait()
+                stdout_reader.join()
+                process.stdout.close()
+
+            if std_out := b"".join(std_out).decode("utf-8"):
                 log(std_out)
+
+            if check and process.returncode:
+                raise subprocess.CalledProcessError(process.returncode, command)
         else:
             subprocess.check_call(command, *args, **kwargs)
 
@@ -215,109 +365,26 @@ class ExecCommand:
         return subprocess.check_output(command, *args, **kwargs).decode("utf-8")
 
 
-pandoc = ExecCommand("pandoc")
-tectonic = ExecCommand("tectonic")
-git = ExecCommand("git")
-
-
-def _ensure_windows_wrapper_exe(capture_wrapper: Path, wrapper_exe: Path) -> None:
-    """Build the tectonic.exe wrapper via PyInstaller if it does not exist or is stale.
+class PandocCommand(ExecCommand):
+    def convert(self, text, from_format, to_format):
+        """Return *text* converted from *from_format* to *to_format*.
 
-    Rebuilds if wrapper_exe is older than capture_wrapper (the Python source).
-    Uses `pixi exec pyinstaller` so PyInstaller need not be a permanent dependency.
-    """
-    if wrapper_exe.exists() and wrapper_exe.stat().st_mtime >= capture_wrapper.stat().st_mtime:
-        return
+        Goes through the pandoc server when one is running (see
+        pandoc_server, ``--pandoc-server``), otherwise runs pandoc.  The
+        result has LF line endings and a final newline either way, as
+        pandoc writes to stdout.
+        """
+        output = pandoc_server.convert(text, from_format, to_format)
+        if output is None:
+            return self.get_output(
+                ["-f", from_format, "-t", to_format, "--eol=lf"], input=text.encode("utf-8")
+            )
+        return output if output.endswith("\n") else output + "\n"
 
-    import tempfile
 
-    log("Building tectonic.exe wrapper via PyInstaller (one-time setup)...")
-    with tempfile.TemporaryDirectory() as tmp:
-        subprocess.run(
-            [
-                "pixi",
-                "exec",
-                "pyinstaller",
-                "--onefile",
-                "--name",
-                "tectonic",
-                "--distpath",
-                str(wrapper_exe.parent),
-                "--workpath",
-                tmp,
-                "--specpath",
-                tmp,
-                "--noconfirm",
-                str(capture_wrapper),
-            ],
-            check=True,
-        )
-
-
-def _call_wrapped_tectonic(
-    pandoc_cmd: list,
-    capture_wrapper: Path,
-    real_tectonic: str,
-    base_env: dict,
-    stderr_processor,
-    tex_file: Path,
-    media_dir: Path,
-) -> None:
-    """Run pandoc with the tectonic capture wrapper active.
-
-    Constructs the capture environment (TEX_CAPTURE_PATH, TEX_MEDIA_DIR,
-    REAL_TECTONIC_PATH) and invokes pandoc.
-
-    On Unix, injects the wrapper directory at the front of PATH so pandoc finds
-    our shebang wrapper before the real tectonic.
-
-    On Windows, pandoc ignores PATH and uses the tectonic that ships in the
-    same pixi environment directory.  The real tectonic.exe must be inside the
-    pixi project (i.e. pixi-managed); we temporarily rename it and drop the
-    pre-built wrapper exe in its place, restoring everything via try/finally.
-    Raises RuntimeError if the real tectonic is outside the pixi project.
-    """
-    capture_env = {
-        **base_env,
-        "TEX_CAPTURE_PATH": str(tex_file),
-        "TEX_MEDIA_DIR": str(media_dir),
-    }
-
-    if sys.platform != "win32":
-        run_env = {
-            **capture_env,
-            "REAL_TECTONIC_PATH": real_tectonic,
-            "PATH": f"{capture_wrapper.parent}{os.pathsep}{capture_env.get('PATH', '')}",
-        }
-        pandoc(pandoc_cmd, stderr_processor=stderr_processor, env=run_env)
-        return
-
-    # Windows: pandoc finds tectonic via its own install directory, not PATH.
-    # Resolve both paths before comparing to normalize mixed slashes and case.
-    # capture_wrapper is <scripts_root>/tools/tectonic; project root is two levels up.
-    pixi_project_root = capture_wrapper.parent.parent.parent.resolve()
-    real_path = Path(real_tectonic).resolve()
-    try:
-        real_path.relative_to(pixi_project_root)
-    except ValueError:
-        raise RuntimeError(
-            f"tectonic binary is outside the pixi project:\n"
-            f"  tectonic: {real_path}\n"
-            f"  project:  {pixi_project_root}\n"
-            "Cannot safely intercept it on Windows."
-        )
-
-    wrapper_exe = capture_wrapper.parent / "tectonic.exe"
-    _ensure_windows_wrapper_exe(capture_wrapper, wrapper_exe)
-    renamed = real_path.with_name("tectonic.original.exe")
-    real_path.rename(renamed)
-    try:
-        shutil.copy2(wrapper_exe, real_path)
-        run_env = {**capture_env, "REAL_TECTONIC_PATH": str(renamed)}
-        pandoc(pandoc_cmd, stderr_processor=stderr_processor, env=run_env)
-    finally:
-        real_path.unlink(missing_ok=True)
-        renamed.rename(real_path)
+pandoc = PandocCommand("pandoc")
+tectonic = ExecCommand("tectonic")
+git = ExecCommand("git")
 
 
 class DocBuilder:
@@ -327,6 +394,8 @@ class DocBuilder:
             self._repo_root = Path(repo_root)
         else:
             self._repo_root = git_utils.repo_root(cwd=self._get_class_file().parent)
+        # Pandoc JSON ASTs keyed by the sha256 of the parsed Markdown.
+        self._ast_cache: Dict[str, dict] = {}
 
     # MARK: Target Functions
     def build_docs(self, args):
@@ -351,19 +420,9 @@ class DocBuilder:
                 )
         args.output.mkdir(parents=True, exist_ok=True)
 
-        if args.heading_case_lint:
-            from doc_build.iso_heading_case_lint import check_spec, format_report
-            pn_path = args.heading_proper_nouns or self.get_heading_proper_nouns()
-            spec_root = self.get_specification_root()
-            log(f"\tChecking heading sentence case in {spec_root} ...")
-            violations = check_spec(spec_root, proper_nouns_path=pn_path)
-            report = format_report(violations, spec_root=spec_root)
-            if report:
-                log(report)
-            else:
-                log("\tNo heading case violations found.")
-
         if args.diff:
+            # The diff has no sources of its own: lint the working tree.
+            self._lint_build(args)
             from_ref, to_ref = args.diff[0], args.diff[1]
             diff_md, from_short, to_short = self.generate_combined_diff(
                 args, from_ref, to_ref
@@ -410,8 +469,90 @@ class DocBuilder:
             # │           ├── ...
         else:
             combined = self._setup_and_preprocess(args)
+            self._lint_build(args, combined)
             return self._render_combined(args, combined, self.get_file_base_name())
 
+    def _lint_build(self, args, combined: Optional[Path] = None):
+        """Run the checks selected by --iso-lint/--heading-case-lint/--spellcheck and log the violations.
+
+        With *combined*, the flattened spec of this build, the checks see
+        its sources through a single parse of it (iso_lint_utils.check_flattened),
+        reported at their file:line via the build's source map.  Otherwise
+        each file of the specification is parsed and checked.  Violations
+        never fail the build.
+        """
+        iso_lint = getattr(args, "iso_lint", False)
+        if not (iso_lint or args.heading_case_lint or args.spellcheck):
+            return
+
+        from doc_build import iso_bold_table_lint, iso_clause_lint, iso_heading_case_lint
+        from doc_build.iso_lint_utils import check_flattened, parse_markdown
+
+        spec_root = self.get_specification_root()
+        pn_path = args.heading_proper_nouns or self.get_heading_proper_nouns()
+        extra_nouns = iso_heading_case_lint.load_proper_nouns(pn_path)
+
+        linters = []
+        if iso_lint or args.heading_case_lint:
+            linters.append(
+                ("heading sentence case", "No heading case violations found.",
+                 functools.partial(iso_heading_case_lint.check_file, extra_nouns=extra_nouns),
+                 lambda v: (str(v.file), v.lineno),
+                 functools.partial(iso_heading_case_lint.check_spec, proper_nouns_path=pn_path),
+                 iso_heading_case_lint.format_report),
+            )
+        if iso_lint:
+            linters[:0] = [
+                ("ISO clause structure", "No ISO clause structure violations found.",
+                 iso_clause_lint.check_file,
+                 lambda v: (str(v.file), v.heading_lineno),
+                 iso_clause_lint.check_spec,
+                 iso_clause_lint.format_report),
+            ]
+            linters.append(
+                ("bold table headers", "No bold-table-header violations found.",
+                 iso_bold_table_lint.check_file,
+                 lambda v: (str(v.file), v.lineno),
+                 iso_bold_table_lint.check_spec,
+                 iso_bold_table_lint.format_report),
+            )
+
+        doc = parse_markdown(combined) if combined is not None else None
+        source_map = SourceMap.load(self.get_artifacts_dir(args.output) / SOURCE_MAP_FILENAME)
+        for label, ok_msg, check_file, sort_key, check_spec, format_report in linters:
+            log(f"\tChecking {label} in {spec_root} ...")
+            if doc is not None:
+                violations = check_flattened(
+                    doc, source_map, check_file, sort_key,
+                    self.get_artifacts_dir(args.output), spec_root,
+                )
+            else:
+                violations = check_spec(spec_root)
+            report = format_report(violations, spec_root=spec_root)
+            log(report if report else f"\t{ok_msg}")
+
+        if args.spellcheck:
+            from doc_build import spell_check
+            from doc_build.filters.spelling import load_word_list
+
+            log(f"\tChecking spelling in {spec_root} ...")
+            store = self.get_known_words_store(args.output)
+            project_words = load_word_list(self.get_spelling_words())
+            try:
+                if doc is not None:
+                    misspellings = spell_check.check_flattened(
+                        doc, source_map, spec_root, store, project_words
+                    )
+                else:
+                    misspellings = spell_check.check_spec(
+                        spec_root, store_path=store, project_words=project_words
+                    )
+            except (OSError, subprocess.CalledProcessError) as e:
+                log(f"\tCould not run the spell checker: {e}")
+                return
+            report = spell_check.format_report(misspellings, spec_root=spec_root)
+            log(report if report else "\tNo misspellings found.")
+
     def _render_combined(
         self,
         args,
@@ -511,14 +652,26 @@ class DocBuilder:
                 log("\tAdding Draft Watermark...")
                 shared_command.extend(["-V", "draft=true"])
 
+            section_index = artifacts_dir / SECTION_INDEX_FILENAME
+            if section_index.exists():
+                shared_command.extend(["-M", f"AOUSD_SECTION_INDEX={section_index}"])
+
             if args.iso_xrefs:
-                shared_command.extend(["-M", f"ISO_CLAUSE_MAP={self.get_iso_clause_map()}"])
+                shared_command.extend([
+                    "-M", f"ISO_CLAUSE_MAP={self.get_iso_clause_map()}",
+                    "-M", f"ISO_CLAUSE_MAPS={self.write_iso_clause_maps(artifacts_dir, combined)}",
+                ])
+            if getattr(args, "railroad_css_classes", False):
+                shared_command.extend(["-M", "RAILROAD_CSS_CLASSES=true"])
             if from_pretty is not None and to_pretty is not None:
                 shared_command.extend([
                     "-M", f"diff-from-pretty={from_pretty}",
                     "-M", f"diff-to-pretty={to_pretty}",
                 ])
 
+            if not args.no_pdf:
+                self._precheck_pdf(args, combined, output_dir)
+
             pdf = None
             docx = None
             html = None
@@ -531,6 +684,7 @@ class DocBuilder:
                 bundle_images_args = [
                     "-M", f"AOUSD_OUTPUT_DIR={output_dir}",
                     "-M", f"AOUSD_IMAGES_ROOT={artifacts_dir}",
+                    "-M", f"AOUSD_HASH_CACHE={self.get_image_hash_cache(output_dir)}",
                     "-F", bundle_images_filter,
                 ]
                 log(f"\tBuilding Markdown to {md}...")
@@ -565,111 +719,47 @@ class DocBuilder:
                 build_env = os.environ.copy()
                 build_env["SOURCE_DATE_EPOCH"] = source_date_epoch
 
-                def stderr_processor(std_err):
-                    lines = std_err.splitlines()
-                    overflows = []  # (pt: float, line: str)
-                    missing_glyphs = []  # raw warning lines
-
-                    for line in lines:
-                        # Spurious warning: https://github.com/tectonic-typesetting/tectonic/discussions/1192#discussioncomment-9463365
-                        if line.startswith(
-                            "warning: Trying to include PDF file with version "
-                        ):
-                            continue
-                        # Underfull boxes are cosmetic (loose inter-word spacing),
-                        # never a margin overflow -- keep ignoring them.
-                        # https://www.overleaf.com/learn/how-to/Understanding_underfull_and_overfull_box_warnings
-                        if "Underfull " in line:
-                            continue
-                        # Can also be safely ignored
-                        if line.startswith("warning: accessing absolute path "):
-                            continue
-
-                        # Just reporting fluff
-                        if line.startswith("warning: warnings were issued"):
-                            continue
-
-                        # Overfull \hbox (Xpt too wide): content runs past the right
-                        # text margin. Collect (don't silently drop) so it can be
-                        # reported and optionally gated. See aousd/doc_build#100.
-                        m = _OVERFULL_RE.search(line)
-                        if m:
-                            overflows.append((float(m.group(1)), line))
-                            continue
-                        # A character with no glyph in the chosen font is silently
-                        # omitted from the PDF -- meaning-changing corruption.
-                        if (
-                            "Missing character:" in line
-                            or "could not represent character" in line
-                        ):
-                            missing_glyphs.append(line)
-                            continue
-
-                        log(line, file=sys.stderr)
-
-                    _report_pdf_diagnostics(
-                        overflows,
-                        missing_glyphs,
-                        check_glyphs=not getattr(
-                            args, "no_check_glyphs", GATE_DEFAULT_NO_CHECK_GLYPHS),
-                        check_overflow=getattr(
-                            args, "check_overflow", GATE_DEFAULT_CHECK_OVERFLOW),
-                        overflow_threshold_pt=getattr(
-                            args, "overflow_threshold_pt",
-                            GATE_DEFAULT_OVERFLOW_THRESHOLD_PT),
-                    )
-
                 pdf_extra = [f"--include-in-header={latex_diff_preamble}"] if is_diff else []
+                # SVGs (including generated diagrams) are pre-converted to
+                # cached PDFs by the last filter, so pandoc does not run
+                # rsvg-convert itself for every PDF build.
                 latex_cmd_base = shared_command + [
                     f"--template={latex_template}",
+                    "-M", f"AOUSD_CACHE_DIR={self.get_cache_dir(output_dir)}",
+                    "-F", self.get_filter("svg_to_pdf"),
                 ] + pdf_extra
 
-                if not args.keep_pdf_latex:
-                    # Standard path: pandoc pipes directly to tectonic via stdin.
-                    log(f"\tBuilding PDF to {pdf}...")
-                    pandoc(
-                        latex_cmd_base + ["--pdf-engine=tectonic", "-o", pdf],
-                        stderr_processor=stderr_processor,
-                        env=build_env,
-                    )
-                else:
-                    tex_file = output_dir / f"{filename}.tex"
-                    recreate_script = output_dir / "recreate_pdf.py"
+                # Two stages: pandoc writes the LaTeX into the build cache,
+                # then tectonic typesets it -- unless neither the LaTeX nor
+                # anything it loads changed since the last build.
+                tex_file = self.get_cache_dir(output_dir) / "pdf" / f"{filename}.tex"
+                tex_file.parent.mkdir(parents=True, exist_ok=True)
+                log(f"\tBuilding PDF to {pdf}...")
+                pandoc(latex_cmd_base + ["--to", "latex", "-o", tex_file], env=build_env)
+                self._typeset_pdf(
+                    args,
+                    tex_file,
+                    pdf,
+                    font_dirs=(front_page_dir, fonts_dir),
+                    build_env=build_env,
+                    hash_cache=self.get_image_hash_cache(output_dir),
+                )
 
-                    # A capture wrapper named "tectonic" intercepts the LaTeX pandoc
-                    # pipes to tectonic, saves it to disk, then forwards to the real
-                    # tectonic.  We use the bare engine name "--pdf-engine=tectonic" so
-                    # pandoc applies its own SVG pre-conversion (only triggered by name,
-                    # not a full path).  The wrapper is found first because its parent
-                    # dir is prepended to PATH.
-                    capture_wrapper = self.get_scripts_root() / "tools" / "tectonic"
-                    # Ensure executable bit is set (can be lost when installed from git).
-                    if sys.platform != "win32":
-                        _mode = capture_wrapper.stat().st_mode
-                        if not (_mode & stat.S_IXUSR):
-                            capture_wrapper.chmod(_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+                if args.keep_pdf_latex:
+                    kept_tex_file = output_dir / f"{filename}.tex"
+                    recreate_script = output_dir / "recreate_pdf.py"
+                    shutil.copy2(tex_file, kept_tex_file)
 
                     # casting to os-native path ensures consistent slashes - was getting paths like:
                     #    C:\\doc_build\\.pixi\\envs\\default\\Library/bin\\tectonic.EXE
                     tectonic_path = str(Path(tectonic.binary))
 
-                    log(f"\tBuilding PDF to {pdf}...")
-                    _call_wrapped_tectonic(
-                        latex_cmd_base + ["--pdf-engine=tectonic", "-o", pdf],
-                        capture_wrapper,
-                        tectonic_path,
-                        build_env,
-                        stderr_processor,
-                        tex_file=tex_file,
-                        media_dir=output_dir / "images",
-                    )
-
                     recreate_template = self.get_scripts_root() / "tools" / "recreate_pdf.py.template"
                     recreate_script.write_text(
                         recreate_template.read_text(encoding="utf-8").format(
                             source_date_epoch=source_date_epoch,
                             tectonic_path=tectonic_path,
-                            tex_file_name=tex_file.name,
+                            tex_file_name=kept_tex_file.name,
                             pdf_name=pdf.name,
                         ),
                         encoding="utf-8",
@@ -679,16 +769,242 @@ class DocBuilder:
                             recreate_script.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
                         )
 
-                    log(f"\tCaptured LaTeX: {tex_file}")
+                    log(f"\tCaptured LaTeX: {kept_tex_file}")
                     log(f"\tTo recreate PDF from .tex: {recreate_script}")
 
             if not args.no_docx and not skip_docx:
                 docx = output_dir / f"{filename}.docx"
                 log(f"\tBuilding DocX to {docx}...")
-                pandoc(shared_command + ["-o", docx, "-F", self.get_filter("convert_svg")])
+                pandoc(
+                    shared_command
+                    + [
+                        "-o", docx,
+                        "-M", f"AOUSD_CACHE_DIR={self.get_cache_dir(output_dir)}",
+                        "-F", self.get_filter("convert_svg"),
+                    ]
+                )
 
         return pdf, docx, html, md
 
+    def _precheck_pdf(self, args, combined, output_dir: Path):
+        """Report the defects the PDF quality gate would find, before typesetting.
+
+        Predicts, from the combined spec alone (see pdf_precheck), the
+        characters the bundled fonts have no glyph for and the code lines and
+        railroad diagrams that overflow the right margin, each with the source
+        locations it occurs at.  The predictions are heuristic, so they are
+        only reported: the gate on the typeset PDF (_report_pdf_diagnostics)
+        decides.  With --strict-precheck the build fails here instead, before
+        any output is written, when the corresponding gate (--no-check-glyphs,
+        --check-overflow) would.
+        """
+        from doc_build import pdf_precheck
+
+        scripts_dir = Path(__file__).resolve().parent
+        ast = self.get_markdown_ast(combined)
+        text = self._read_file(combined)
+        source_map = SourceMap.load(self.get_artifacts_dir(output_dir) / SOURCE_MAP_FILENAME)
+        failures = []
+
+        if not getattr(args, "no_glyph_precheck", False):
+            missing = pdf_precheck.find_missing_glyphs(
+                ast,
+                (scripts_dir / "fonts", scripts_dir / "front_page"),
+                self.get_cache_dir(output_dir) / FONT_COVERAGE_CACHE_FILENAME,
+            )
+            if missing:
+                lines = pdf_precheck.locate_characters(text, missing)
+                locations = {c: [source_map.format(line) for line in lines[c]] for c in missing}
+                log(
+                    f"\n[doc_build] Glyph pre-check: {len(missing)} character(s) have no glyph "
+                    "in the font they are typeset in and would be dropped from the PDF:",
+                    file=sys.stderr,
+                )
+                log(pdf_precheck.format_report(missing, locations), file=sys.stderr)
+                if not getattr(args, "no_check_glyphs", GATE_DEFAULT_NO_CHECK_GLYPHS):
+                    failures.append(
+                        f"{len(missing)} character(s) would be silently dropped from the PDF"
+                    )
+
+        if not getattr(args, "no_overflow_precheck", False):
+            threshold_pt = getattr(args, "overflow_threshold_pt", GATE_DEFAULT_OVERFLOW_THRESHOLD_PT)
+            overflows = pdf_precheck.predict_overflows(
+                ast,
+                scripts_dir / "fonts",
+                self._railroad_widths(args, ast, output_dir),
+                threshold_pt=threshold_pt,
+            )
+            if overflows:
+                lines = pdf_precheck.locate_lines_in_order(text, (o.text for o in overflows))
+                locations = [
+                    source_map.format(line) if line is not None else "<unknown>" for line in lines
+                ]
+                log(
+                    f"\n[doc_build] Overflow pre-check: {len(overflows)} code line(s) or "
+                    f"diagram(s) would exceed the text width by >= {threshold_pt}pt:",
+                    file=sys.stderr,
+                )
+                log(pdf_precheck.format_overflow_report(overflows, locations), file=sys.stderr)
+                if getattr(args, "check_overflow", GATE_DEFAULT_CHECK_OVERFLOW):
+                    failures.append(
+                        f"{len(overflows)} code line(s) or diagram(s) would overflow the "
+                        f"right margin by >= {threshold_pt}pt"
+                    )
+
+        if failures and getattr(args, "strict_precheck", GATE_DEFAULT_STRICT_PRECHECK):
+            raise SystemExit(
+                "[doc_build] PDF quality gate failed (aousd/doc_build#100):\n  - "
+                + "\n  - ".join(failures)
+                + "\n(omit --strict-precheck to leave the decision to the gate on the "
+                "typeset PDF, or skip the pre-checks with --no-glyph-precheck and "
+                "--no-overflow-precheck)"
+            )
+
+    def _railroad_widths(self, args, ast, output_dir: Path):
+        """Return a function mapping a ``peg`` block to its diagram width in points, or None.
+
+        filter_railroad writes diagrams to ``{AOUSD_BUILD}/{PART}_{key}.svg``,
+        with both taken from the pandoc metadata (the defaults file or the
+        document) and AOUSD_BUILD relative to the artifacts dir.  The widths
+        come from filter_railroad --measure, in one run for all the peg
+        blocks of *ast*: rendered diagrams are measured from their SVG and
+        the others laid out from their rules, so a clean build predicts them
+        too.  Returns None when the spec does not configure railroad
+        diagrams or they cannot be measured.
+        """
+        from doc_build.filters.pandocfilters import walk
+        from doc_build.filters.shared_filter_utils import get_metadata_str
+
+        defaults = yaml.safe_load(self._read_file(self.get_metadata_defaults_file())) or {}
+        metadata = {key: str(value) for key, value in (defaults.get("metadata") or {}).items()}
+        for key in ("AOUSD_BUILD", "PART"):
+            try:
+                metadata[key] = get_metadata_str(ast.get("meta", {}), key)
+            except KeyError:
+                pass
+        if "AOUSD_BUILD" not in metadata or "PART" not in metadata:
+            return None
+
+        codes = []
+
+        def collect(key, value, _format, _meta):
+            if key == "CodeBlock" and value[0][1] == ["peg"]:
+                codes.append(value[1])
+
+        walk(ast.get("blocks", []), collect, "", {})
+        if not codes:
+            return None
+
+        artifacts = self.get_artifacts_dir(output_dir)
+        (artifacts / metadata["AOUSD_BUILD"]).mkdir(parents=True, exist_ok=True)
+        command = [
+            sys.executable, str(self.get_filter("railroad")),
+            "--measure", metadata["AOUSD_BUILD"], metadata["PART"],
+        ]
+        if getattr(args, "railroad_css_classes", False):
+            command.append("--css-classes")
+        result = subprocess.run(
+            command, cwd=artifacts, input=json.dumps(codes), capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            log(
+                f"\n[doc_build] Overflow pre-check: {len(codes)} railroad diagram(s) not "
+                f"checked, measuring them failed:\n{result.stderr.strip()}",
+                file=sys.stderr,
+            )
+            return None
+        return dict(zip(codes, json.loads(result.stdout))).get
+
+    def _typeset_pdf(self, args, tex_file: Path, pdf: Path, *, font_dirs, build_env, hash_cache: Path):
+        """Typeset *tex_file* with tectonic into *pdf*, skipping tectonic if nothing changed.
+
+        Runs in the artifacts dir, which the paths in the LaTeX are relative to.
+        The PDF and tectonic's diagnostics are kept next to the .tex, under a
+        key hashing the .tex, every image and font it loads, and an explicitly
+        set SOURCE_DATE_EPOCH.  When the key matches the previous build the
+        cached PDF is reused and its diagnostics replayed through the gate.
+        tectonic's .aux/.toc/.out are kept between runs in ``<tex stem>/``.
+        """
+        from doc_build.filters.image_hash_cache import ImageHashCache
+
+        cache = ImageHashCache(hash_cache)
+        tex = tex_file.read_bytes()
+        media = {
+            Path(path).resolve()
+            for path in _INCLUDEGRAPHICS_RE.findall(tex.decode("utf-8"))
+        }
+        for font_dir in font_dirs:
+            media.update(path.resolve() for path in Path(font_dir).iterdir())
+        media = [path for path in media if path.is_file()]
+
+        key = hashlib.sha256(tex)
+        for path, digest in sorted(cache.hash_many(media).items()):
+            key.update(f"\0{path}\0{digest}".encode("utf-8"))
+        # Without an explicit SOURCE_DATE_EPOCH the PDF embeds the build time,
+        # which does not make it worth typesetting again.
+        key.update(f"\0{os.environ.get('SOURCE_DATE_EPOCH', '')}\0{tectonic.binary}".encode("utf-8"))
+        key = key.hexdigest()
+        cache.save()
+
+        cached_pdf = tex_file.with_suffix(".pdf")
+        state_file = tex_file.with_suffix(".json")
+        try:
+            state = json.loads(state_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            state = {}
+
+        if state.get("key") == key and cached_pdf.exists():
+            log(f"\tLaTeX unchanged, reusing {cached_pdf}")
+            diagnostics = _TectonicDiagnostics.from_dict(args, state["diagnostics"])
+        else:
+            diagnostics = _TectonicDiagnostics(args)
+
+            # tectonic reruns the engine until .aux/.toc/.out stop changing.
+            # Keeping them in a stable outdir, which is also on tectonic's
+            # search path, seeds the next run with the last build's state, so
+            # a document whose structure did not change converges in one pass.
+            intermediates_dir = tex_file.with_suffix("")
+            intermediates_dir.mkdir(exist_ok=True)
+            state_file.unlink(missing_ok=True)
+            try:
+                with open(tex_file, "rb") as tex_in:
+                    tectonic(
+                        [
+                            "-",
+                            "--outdir", str(intermediates_dir),
+                            "--keep-intermediates",
+                            "-Z", f"search-path={intermediates_dir}",
+                        ],
+                        stderr_processor=diagnostics.add_line,
+                        check=True,
+                        stdin=tex_in,
+                        env=build_env,
+                    )
+            except (_PdfGateTripped, subprocess.CalledProcessError) as e:
+                # Do not seed the next build from a run that may have left
+                # them half-written.
+                shutil.rmtree(intermediates_dir, ignore_errors=True)
+                if isinstance(e, _PdfGateTripped):
+                    # The gate is going to fail the build: stop typesetting
+                    # now rather than after the whole document.
+                    log("\tPDF quality gate failed, stopped tectonic early", file=sys.stderr)
+                    diagnostics.report()
+                raise
+            os.replace(intermediates_dir / "texput.pdf", cached_pdf)
+            state_file.write_text(
+                json.dumps({"key": key, "diagnostics": diagnostics.as_dict()}), encoding="utf-8"
+            )
+
+        # Copied, not linked: the published PDF must not change when a later
+        # build rewrites the cache entry.
+        tmp_pdf = pdf.with_name(f".{pdf.name}.{os.getpid()}.tmp")
+        try:
+            shutil.copyfile(cached_pdf, tmp_pdf)
+            os.replace(tmp_pdf, pdf)
+        finally:
+            tmp_pdf.unlink(missing_ok=True)
+        diagnostics.report()
+
     def get_doc_build_filters(self):
         """Return a list of paths to the filters the build_doc method runs in the order they must run"""
         return [
@@ -717,23 +1033,42 @@ class DocBuilder:
         entry_point = self.get_entry_point(args)
         combined = self.get_combined_file_name(args.output)
 
-        self.flatten(args, entry_point, combined, substitutions=substitutions)
+        source_map = self.flatten(args, entry_point, combined, substitutions=substitutions)
 
+        flattened = self._read_file(combined)
         if args.no_draft:
             self.add_publish_copyright(combined)
         else:
             self.add_draft_copyright(combined)
+        # Move the map past the legal intro now preceding the flattened text.
+        wrapped = self._read_file(combined)
+        source_map.shift(wrapped[: max(0, wrapped.find(flattened))].count("\n"))
+        source_map.save(self.get_artifacts_dir(args.output) / SOURCE_MAP_FILENAME)
 
         return combined
 
     def flatten(self, args, source, output, substitutions: Dict[str, str] = None):
+        """Inline every linked section of *source* into *output*.
+
+        Also writes SECTION_INDEX_FILENAME to the artifacts dir, mapping each
+        inlined section's path (relative to the artifacts dir) to the anchor
+        of its first heading, so filter_resolve_sections can resolve links
+        without rescanning the tree.  Returns the SourceMap of *output*.
+        """
         log(f"\tFlattening {source}...")
         substitutions = substitutions or {}
         artifacts = self.get_artifacts_dir(args.output)
+        section_index = {}
+        source_map = SourceMap()
+        out_line = 1
+
+        def source_name(path):
+            return Path(os.path.relpath(os.path.abspath(path), artifacts)).as_posix()
+
         with open(source, "r", encoding="utf-8") as source_file:
             lines = source_file.readlines()
             with open(output, "w", encoding="utf-8") as out:
-                for line in lines:
+                for line_number, line in enumerate(lines, 1):
                     if res := re.search(r"\[(.*)]\((.*\.md)\)", line):
                         path = res.group(2)
                         tokens = path.split("/")
@@ -760,17 +1095,40 @@ class DocBuilder:
                         assert os.path.exists(path), f"Could not find {path}"
 
                         with open(path, "r", encoding="utf-8") as section:
-                            out.write(section.read())
+                            content = section.read()
+                            out.write(content)
                             out.write("\n\n")
 
+                        rel = source_name(path)
+                        source_map.add(out_line, rel, 1, len(content.splitlines()))
+                        out_line += content.count("\n") + 2
+
+                        anchor = get_section_anchor(content.splitlines())
+                        if anchor is not None:
+                            section_index.setdefault(rel, anchor)
+
                     else:
                         out.write(line)
+                        source_map.add(out_line, source_name(source), line_number)
+                        out_line += line.count("\n")
+
+        with open(artifacts / SECTION_INDEX_FILENAME, "w", encoding="utf-8") as f:
+            json.dump(section_index, f, indent=2)
+
+        return source_map
 
     def _setup_and_preprocess(self, args):
-        """Copy specification into artifacts dir and run preprocess_build. Caller must ensure args.output exists."""
+        """Copy specification into artifacts dir and run preprocess_build. Caller must ensure args.output exists.
+
+        Files of the artifacts dir are replaced, not overwritten in place: the
+        images of a published Markdown bundle may be hard links to them.
+        """
+        from doc_build.filters.image_hash_cache import copy_replacing
+
         shutil.copytree(
             self.get_specification_root(),
             self.get_artifacts_dir(args.output),
+            copy_function=copy_replacing,
             dirs_exist_ok=True,
         )
         return self.preprocess_build(args)
@@ -840,6 +1198,7 @@ class DocBuilder:
         # versions (absolute paths would differ because the two worktrees are
         # in different directories). filter_diff_images resolves paths
         # relative to their respective artifacts dirs after diffing.
+        hash_cache = self.get_image_hash_cache(args.output)
         for (md_input, ast_output) in [(combined_from, ast_from), (combined_to, ast_to)]:
             artifacts_dir = md_input.parent
             pandoc(
@@ -855,6 +1214,8 @@ class DocBuilder:
                     self.get_filter("inject_image_hash"),
                     "-M",
                     f"AOUSD_ARTIFACTS_DIR={artifacts_dir}",
+                    "-M",
+                    f"AOUSD_HASH_CACHE={hash_cache}",
                 ]
             )
 
@@ -865,14 +1226,16 @@ class DocBuilder:
         diff_to_artifacts = combined_to.parent
         diff_artifacts = diff_dir / "artifacts"
         self._copy_diff_images(
-            diff_ast_path, diff_from_artifacts, diff_to_artifacts, diff_artifacts
+            diff_ast_path, diff_from_artifacts, diff_to_artifacts, diff_artifacts,
+            hash_cache=hash_cache,
         )
 
         # Not strictly necessary (Pandoc can take JSON as input), but converting
         # to markdown unifies the pipeline with the non-diff path and eases debugging.
         combined_diff_md = diff_dir / f"{diff_basename}.md"
-        pandoc(
-            ["-f", "json", "-t", MARKDOWN_FORMAT, "-o", combined_diff_md, diff_ast_path]
+        combined_diff_md.write_text(
+            pandoc.convert(diff_ast_path.read_text(encoding="utf-8"), "json", MARKDOWN_FORMAT),
+            encoding="utf-8",
         )
         return combined_diff_md, from_short, to_short
 
@@ -883,24 +1246,32 @@ class DocBuilder:
         from_artifacts: Path,
         to_artifacts: Path,
         diff_artifacts: Path,
+        hash_cache: Path | None = None,
     ) -> None:
         """Copy images from the diff AST to diff_artifacts/images/.
 
         Classifies images as before/after/unchanged based on which diff
         Div they appear in, and copies to diff_artifacts/images/ using
-        get_image_rel() for output paths.
+        get_image_rel() for output paths. Copies go through an ImageBundler,
+        so unchanged destinations are skipped and identical content is
+        linked rather than copied again.
 
         For substitution pairs where both images map to the same output
         path but have different content hashes, they are renamed to
         <stem>.before.<ext> / <stem>.after.<ext> and the diff AST paths
         are updated accordingly.
 
-        Raises RuntimeError if two before (or two after) images map to
-        the same output path.
+        Raises RuntimeError if two before (or two after) images with
+        different content map to the same output path. Content is compared
+        through the ImageHashCache at *hash_cache*, if given.
         """
+        from doc_build.filters.image_hash_cache import ImageBundler, ImageHashCache
         from doc_build.filters.pandocfilters import walk, get_value
         from doc_build.filters.shared_filter_utils import get_image_rel
 
+        cache = ImageHashCache(hash_cache)
+        bundler = ImageBundler(cache)
+
         HASH_ATTR_KEY = "data-image-hash"
         ORIGINAL_PATH_ATTR_KEY = "data-original-path"
 
@@ -926,15 +1297,14 @@ class DocBuilder:
         def _safe_copy(src: Path, dest: Path, seen: dict, context: str) -> None:
             rel_key = str(dest)
             if rel_key in seen:
-                if seen[rel_key] != str(src):
+                if seen[rel_key] != str(src) and not cache.same_content(seen[rel_key], src):
                     raise RuntimeError(
                         f"{context}: image collision at {str(dest)!r}: "
                         f"already mapped from {seen[rel_key]!r}, "
                         f"cannot also map from {str(src)!r}"
                     )
                 return
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(src, dest)
+            bundler.add(src, dest)
             seen[rel_key] = str(src)
 
         def _collect_images(subtree) -> list:
@@ -1041,7 +1411,11 @@ class DocBuilder:
                         processed.add(id(img))
             return None
 
-        walk(diff_ast.get("blocks", []), action, "", {})
+        try:
+            walk(diff_ast.get("blocks", []), action, "", {})
+        finally:
+            bundler.close()
+        cache.save()
 
         diff_artifacts.mkdir(parents=True, exist_ok=True)
         with open(diff_ast_path, "w", encoding="utf-8") as f:
@@ -1063,12 +1437,45 @@ class DocBuilder:
 
         log(f"\tLint output: {linted}")
 
+    def _iso_lint_scope(self, args):
+        """Return the check_spec keyword arguments for the ISO lint options.
+
+        ``files`` is None to check the whole spec, or the files changed per
+        ``--changed-since``/``--staged``.  ``cache`` is the persistent
+        LintResultsCache in the build cache dir, or None with ``--no-lint-cache``.
+        Each file's violation count is logged as soon as it is checked, and
+        ``fail_fast`` follows ``--fail-fast``.
+        """
+        from doc_build.iso_lint_utils import (
+            LINT_CACHE_FILENAME, LintResultsCache, progress_reporter,
+        )
+
+        files = None
+        if args.changed_since or args.staged:
+            files = git_utils.changed_files(
+                self.get_specification_root(), args.changed_since, staged=args.staged,
+            )
+            log(f"Limiting ISO lint to {len(files)} changed file(s).")
+
+        cache = None
+        if not args.no_lint_cache:
+            cache = LintResultsCache(self.get_cache_dir(Path(args.output)) / LINT_CACHE_FILENAME)
+        return dict(
+            files=files,
+            cache=cache,
+            on_file=progress_reporter(self.get_specification_root(), lambda line: log(f"\t{line}")),
+            fail_fast=args.fail_fast,
+        )
+
     def iso_clause_lint(self, args):
         from doc_build.iso_clause_lint import check_spec, format_report
 
         spec_root = self.get_specification_root()
+        scope = self._iso_lint_scope(args)
         log(f"Checking ISO clause structure in {spec_root} ...")
-        violations = check_spec(spec_root)
+        violations = check_spec(spec_root, **scope)
+        if scope["cache"] is not None:
+            scope["cache"].save()
         report = format_report(
             violations,
             context=args.context,
@@ -1076,6 +1483,8 @@ class DocBuilder:
         )
         if report:
             log(report)
+            if args.fail_fast:
+                sys.exit(1)
         else:
             log("No ISO clause structure violations found.")
 
@@ -1084,14 +1493,16 @@ class DocBuilder:
 
         spec_root = self.get_specification_root()
         proper_nouns = args.proper_nouns or self.get_heading_proper_nouns()
+        scope = self._iso_lint_scope(args)
         log(f"Checking heading sentence case in {spec_root} ...")
-        violations = check_spec(
-            spec_root,
-            proper_nouns_path=proper_nouns,
-        )
+        violations = check_spec(spec_root, proper_nouns_path=proper_nouns, **scope)
+        if scope["cache"] is not None:
+            scope["cache"].save()
         report = format_report(violations, spec_root=spec_root)
         if report:
             log(report)
+            if args.fail_fast:
+                sys.exit(1)
         else:
             log("No heading case violations found.")
 
@@ -1120,11 +1531,16 @@ class DocBuilder:
         from doc_build.iso_bold_table_lint import check_spec, format_report
 
         spec_root = self.get_specification_root()
+        scope = self._iso_lint_scope(args)
         log(f"Checking bold table headers in {spec_root} ...")
-        violations = check_spec(spec_root)
+        violations = check_spec(spec_root, **scope)
+        if scope["cache"] is not None:
+            scope["cache"].save()
         report = format_report(violations, spec_root=spec_root)
         if report:
             log(report)
+            if args.fail_fast:
+                sys.exit(1)
         else:
             log("No bold-table-header violations found.")
 
@@ -1145,79 +1561,118 @@ class DocBuilder:
         log(f"Fixed {rows_fixed} header row(s) in {files_fixed} file(s).")
 
     def iso_lint_all(self, args):
-        """Run all three ISO linters: clause structure, heading case, bold table headers."""
+        """Run all three ISO linters: clause structure, heading case, bold table headers.
+
+        The linters run together, one task per file, so that they share one
+        parse of it (iso_lint_utils.run_parallel_checks).
+        """
         from doc_build.iso_clause_lint import (
-            check_spec as clause_check, format_report as clause_report,
+            format_report as clause_report, lint_check as clause_check,
         )
         from doc_build.iso_heading_case_lint import (
-            check_spec as heading_check, format_report as heading_report,
+            format_report as heading_report, lint_check as heading_check,
         )
         from doc_build.iso_bold_table_lint import (
-            check_spec as bold_check, format_report as bold_report,
+            format_report as bold_report, lint_check as bold_check,
         )
+        from doc_build.iso_lint_utils import collect_md_files, run_parallel_checks
 
         spec_root = self.get_specification_root()
         proper_nouns = args.proper_nouns or self.get_heading_proper_nouns()
+        scope = self._iso_lint_scope(args)
+        cache = scope["cache"]
 
         linters = [
             ("ISO clause structure", "No ISO clause structure violations found.",
-             lambda: clause_report(clause_check(spec_root), context=args.context, spec_root=spec_root)),
+             clause_check(cache),
+             lambda vs: clause_report(vs, context=args.context, spec_root=spec_root)),
             ("heading sentence case", "No heading case violations found.",
-             lambda: heading_report(heading_check(spec_root, proper_nouns_path=proper_nouns), spec_root=spec_root)),
+             heading_check(proper_nouns, cache),
+             lambda vs: heading_report(vs, spec_root=spec_root)),
             ("bold table headers", "No bold-table-header violations found.",
-             lambda: bold_report(bold_check(spec_root), spec_root=spec_root)),
+             bold_check(cache),
+             lambda vs: bold_report(vs, spec_root=spec_root)),
         ]
 
+        log(f"Checking {', '.join(label for label, *_ in linters)} in {spec_root} ...")
+        results = run_parallel_checks(
+            collect_md_files(spec_root, only=scope["files"]),
+            [check for _, _, check, _ in linters],
+            on_file=scope["on_file"],
+            fail_fast=scope["fail_fast"],
+        )
+        if cache is not None:
+            cache.save()
+
         failed = False
-        for label, ok_msg, run in linters:
-            log(f"\nChecking {label} in {spec_root} ...")
-            report = run()
+        for (label, ok_msg, _, report_fn), violations in zip(linters, results):
+            log(f"\n{label}:")
+            report = report_fn(violations)
             if report:
                 log(report)
                 failed = True
             else:
                 log(ok_msg)
-
         if failed:
             sys.exit(1)
 
     def iso_fix_all(self, args):
-        """Auto-fix heading case and bold table headers across the spec."""
+        """Auto-fix heading case and bold table headers across the spec.
+
+        Both linters check the unmodified sources together, one task per
+        file sharing one parse of it (iso_lint_utils.run_parallel_checks),
+        then all their fixes are applied together, each file being
+        rewritten once (iso_lint_utils.apply_line_fixes).
+        """
         from doc_build.iso_heading_case_lint import (
-            check_spec as heading_check, fix_spec as heading_fix,
-            format_report as heading_report,
+            format_report as heading_report, lint_check as heading_check,
+            line_fixer as heading_fixer, load_proper_nouns,
         )
         from doc_build.iso_bold_table_lint import (
-            check_spec as bold_check, fix_spec as bold_fix,
-            format_report as bold_report,
+            format_report as bold_report, lint_check as bold_check,
+            line_fixer as bold_fixer,
+        )
+        from doc_build.iso_lint_utils import (
+            apply_line_fixes, collect_md_files, run_parallel_checks,
         )
 
         spec_root = self.get_specification_root()
         proper_nouns = args.proper_nouns or self.get_heading_proper_nouns()
+        extra_nouns = load_proper_nouns(proper_nouns)
 
         fixers = [
             ("heading sentence case", "No heading case violations found.",
-             lambda: heading_check(spec_root, proper_nouns_path=proper_nouns),
+             heading_check(proper_nouns),
              lambda vs: heading_report(vs, spec_root=spec_root),
-             lambda vs: heading_fix(spec_root, proper_nouns_path=proper_nouns, violations=vs),
+             lambda vs: heading_fixer(vs, extra_nouns),
              lambda f, n: f"Fixed {n} heading(s) in {f} file(s)."),
             ("bold table headers", "No bold-table-header violations found.",
-             lambda: bold_check(spec_root),
+             bold_check(),
              lambda vs: bold_report(vs, spec_root=spec_root),
-             lambda vs: bold_fix(spec_root, violations=vs),
+             bold_fixer,
              lambda f, n: f"Fixed {n} header row(s) in {f} file(s)."),
         ]
 
-        for label, ok_msg, check, report_fn, fix, summary_fn in fixers:
+        log(f"Checking {', '.join(label for label, *_ in fixers)} in {spec_root} ...")
+        results = run_parallel_checks(
+            collect_md_files(spec_root), [check for _, _, check, *_ in fixers],
+        )
+
+        found = []
+        for (label, ok_msg, _, report_fn, fixer, summary_fn), violations in zip(fixers, results):
             log(f"\nFixing {label} in {spec_root} ...")
-            violations = check()
             if violations:
                 log(report_fn(violations))
-                files_fixed, items_fixed = fix(violations)
-                log(summary_fn(files_fixed, items_fixed))
+                found.append((fixer(violations), summary_fn))
             else:
                 log(ok_msg)
 
+        if found:
+            log("")
+            results = apply_line_fixes([fixer for fixer, _ in found])
+            for (_, summary_fn), (files_fixed, items_fixed) in zip(found, results):
+                log(summary_fn(files_fixed, items_fixed))
+
     def export_git_archive(self, args):
         timestr = time.strftime("%Y%m%d-%H%M%S")
         filename = f"aousd_core_spec_{args.branch}_{timestr}.zip"
@@ -1296,14 +1751,35 @@ class DocBuilder:
         assert combined.exists(), f"Could not find {combined}"
 
         fixed = args.output / "spellings_corrected.md"
-        pandoc(["-F", self.get_filter("spellcheck"), combined, "-o", fixed])
+        pandoc(
+            [
+                "-F", self.get_filter("spellcheck"),
+                "-M", f"AOUSD_CACHE_DIR={self.get_cache_dir(args.output)}",
+                "-M", f"AOUSD_SPELLING_WORDS={self.get_spelling_words()}",
+                combined,
+                "-o", fixed,
+            ]
+        )
 
         return fixed
 
     def display_style_issues(self, args):
-        combined = self.get_combined_file_name(args.output)
-        log(f"Checking styles in {combined}...")
-        assert combined.exists(), f"Could not find {combined}"
+        """Report weasel words, passive voice and repeated words (see style_check).
+
+        Checks the section files of the last build, per its source map, or
+        every file of the specification if there is none, and reports each
+        issue at its source file:line.
+        """
+        from doc_build import style_check
+
+        spec_root = self.get_specification_root()
+        source_map = SourceMap.load(self.get_artifacts_dir(args.output) / SOURCE_MAP_FILENAME)
+        sources = dict.fromkeys(source for _, source, _, _ in source_map.segments)
+        files = [Path(os.path.normpath(spec_root / source)) for source in sources] or None
+        if files is None:
+            log(f"Checking styles in {spec_root} (no build in {args.output})...")
+        else:
+            log(f"Checking styles in the {len(files)} section file(s) of {args.output}...")
 
         log(
             (
@@ -1315,67 +1791,9 @@ class DocBuilder:
             )
         )
 
-        # Define the default list of weasel words
-        weasels = (
-            "many|various|very|fairly|several|extremely|exceedingly|quite|remarkably|few|"
-            "surprisingly|mostly|largely|huge|tiny|((are|is) a number)|excellent|"
-            "interestingly|significantly|substantially|clearly|vast|relatively|completely"
-        )
-        weasel_pattern = re.compile(f"\\b({weasels})\\b", re.IGNORECASE)
-
-        irregulars = (
-            "awoken|been|born|beat|become|begun|bent|beset|bet|bid|bidden|bound|bitten|"
-            "bled|blown|broken|bred|brought|broadcast|built|burnt|burst|bought|cast|"
-            "caught|chosen|clung|come|cost|crept|cut|dealt|dug|dived|done|drawn|dreamt|"
-            "driven|drunk|eaten|fallen|fed|felt|fought|found|fit|fled|flung|flown|"
-            "forbidden|forgotten|foregone|forgiven|forsaken|frozen|gotten|given|gone|"
-            "ground|grown|hung|heard|hidden|hit|held|hurt|kept|knelt|knit|known|laid|"
-            "led|leapt|learnt|left|lent|let|lain|lighted|lost|made|meant|met|misspelt|"
-            "mistaken|mown|overcome|overdone|overtaken|overthrown|paid|pled|proven|"
-            "put|quit|read|rid|ridden|rung|risen|run|sawn|said|seen|sought|sold|sent|"
-            "set|sewn|shaken|shaven|shorn|shed|shone|shod|shot|shown|shrunk|shut|sung|"
-            "sunk|sat|slept|slain|slid|slung|slit|smitten|sown|spoken|sped|spent|spilt|"
-            "spun|spit|split|spread|sprung|stood|stolen|stuck|stung|stunk|stridden|"
-            "struck|strung|striven|sworn|swept|swollen|swum|swung|taken|taught|torn|"
-            "told|thought|thrived|thrown|thrust|trodden|understood|upheld|upset|woken|"
-            "worn|woven|wed|wept|wound|won|withheld|withstood|wrung|written"
-        )
-        irregular_pattern = re.compile(
-            f"\\b(am|are|were|being|is|been|was|be)\\b[ ]*(\\w+ed|({irregulars}))\\b",
-            re.IGNORECASE,
-        )
-        with open(combined, "r") as f:
-            for lineno, line in enumerate(f.readlines(), start=1):
-                if weasel_pattern.search(line):
-                    highlighted_line = weasel_pattern.sub(
-                        lambda m: f"\033[91m{m.group(0)}\033[0m", line
-                    )
-                    log(f"{lineno}: {highlighted_line.strip()}")
-                if irregular_pattern.search(line):
-                    highlighted_line = irregular_pattern.sub(
-                        lambda m: f"\033[95m{m.group(0)}\033[0m", line
-                    )
-                    log(f"{lineno}: {highlighted_line.strip()}")
-
-                last_word = ""
-                words = re.split(r"(\W+)", line)
-
-                for word in words:
-                    # Skip spaces or empty strings
-                    if not word.strip():
-                        continue
-
-                    # Skip punctuation
-                    if re.match(r"^\W+$", word):
-                        last_word = ""
-                        continue
-
-                    # Found a duplicate word?
-                    if word.lower() == last_word.lower():
-                        log(f"{lineno} \n\t\033[93m{word}\033[0m")
-
-                    # Mark this as the last word
-                    last_word = word
+        issues = style_check.check_spec(spec_root, files=files)
+        report = style_check.format_report(issues, spec_root=spec_root)
+        log(report if report else "No style issues found.")
 
     # MARK: Path constants
 
@@ -1402,6 +1820,17 @@ class DocBuilder:
                 raise TypeError("Output Path should be a Path object")
         return output_path / "artifacts"
 
+    def get_cache_dir(self, output_path: Path) -> Path:
+        return output_path / "cache"
+
+    def get_image_hash_cache(self, output_path: Path) -> Path:
+        return self.get_cache_dir(output_path) / IMAGE_HASH_CACHE_FILENAME
+
+    def get_known_words_store(self, output_path: Path) -> Path:
+        from doc_build.filters.spelling import KNOWN_WORDS_FILENAME
+
+        return self.get_cache_dir(output_path) / KNOWN_WORDS_FILENAME
+
     def get_entry_point(self, args) -> Path:
         return self.get_artifacts_dir(args.output) / "README.md"
 
@@ -1417,6 +1846,59 @@ class DocBuilder:
     def get_combined_file_name(self, output_path: Path) -> Path:
         return self.get_artifacts_dir(output_path) / COMBINED_SPEC_FILENAME
 
+    def get_markdown_ast(self, path: Path) -> dict:
+        """Return the Pandoc JSON AST of the Markdown file at *path*.
+
+        The file is parsed with MARKDOWN_FORMAT, as the renders do, and the
+        result is memoised by content hash so every analysis pass of a build
+        shares a single parse.
+        """
+        path = Path(path)
+        key = hashlib.sha256(path.read_bytes()).hexdigest()
+        if key not in self._ast_cache:
+            self._ast_cache[key] = json.loads(
+                pandoc.convert(path.read_text(encoding="utf-8-sig"), MARKDOWN_FORMAT, "json")
+            )
+        return self._ast_cache[key]
+
+    def write_iso_clause_maps(self, artifacts_dir: Path, combined: Path) -> Path:
+        """Compute the ISO clause maps for *combined* and return the JSON path.
+
+        The maps are written to ISO_CLAUSE_MAPS_FILENAME in *artifacts_dir*,
+        keyed by the contents of iso_clause_map.yaml, README.md and the
+        combined markdown. An artifact whose key still matches is reused, so
+        the specification is parsed at most once per build rather than in
+        every render. Without a README.md (e.g. diff builds) the maps are
+        empty and filter_iso_xrefs leaves links unchanged.
+        """
+        from doc_build.filters.iso_clause_maps import ClauseMaps, build_clause_maps
+
+        output = artifacts_dir / ISO_CLAUSE_MAPS_FILENAME
+        yaml_path = self.get_iso_clause_map()
+        readme = artifacts_dir / "README.md"
+
+        digest = hashlib.sha256()
+        for path in (yaml_path, readme, Path(combined)):
+            digest.update(path.read_bytes() if path.exists() else b"")
+            digest.update(b"\0")
+        key = digest.hexdigest()
+
+        if output.exists() and ClauseMaps.load(output, key) is not None:
+            return output
+
+        if yaml_path.exists() and readme.exists():
+            with open(yaml_path, encoding="utf-8") as f:
+                clause_map = yaml.safe_load(f) or {}
+            maps = build_clause_maps(
+                clause_map,
+                self.get_markdown_ast(readme)["blocks"],
+                self.get_markdown_ast(combined)["blocks"],
+            )
+        else:
+            maps = ClauseMaps()
+        maps.dump(output, key)
+        return output
+
     def get_filter(self, name: str) -> Path:
         path = self.get_scripts_root() / "filters" / f"filter_{name}.py"
         assert path.exists(), f"Could not find {path}"
@@ -1456,6 +1938,17 @@ class DocBuilder:
             return spec_specific
         return self.get_scripts_root() / "iso_heading_proper_nouns.yaml"
 
+    def get_spelling_words(self) -> Path:
+        """Return the project word list for the spell checks.
+
+        Checks for a specification-specific file first, then falls back
+        to the builder-bundled default.
+        """
+        spec_specific = self.get_specification_root() / "spelling_words.txt"
+        if spec_specific.exists():
+            return spec_specific
+        return self.get_scripts_root() / "spelling_words.txt"
+
     def get_iso_clause_map(self) -> Path:
         """Return the ISO clause map YAML path.
 
@@ -1481,8 +1974,23 @@ class DocBuilder:
             default=self.get_default_build_output_root(),
         )
 
+        parser.add_argument(
+            "--pandoc-server",
+            action="store_true",
+            help="Run plain conversions (parsing Markdown for the linters and "
+                 "analysis passes) through one pandoc server process instead "
+                 "of a pandoc process each; falls back to the latter if the "
+                 "server cannot be started",
+        )
+
         args = parser.parse_args()
-        args.func(args)
+        if not args.pandoc_server:
+            args.func(args)
+            return
+        with pandoc_server.PandocServer(pandoc.binary) as server:
+            if server.url is None:
+                log("Could not start a pandoc server, running pandoc per conversion.")
+            args.func(args)
 
     def construct_subparsers(self, parser):
         subparsers = parser.add_subparsers(dest="command", required=True)
@@ -1538,10 +2046,16 @@ class DocBuilder:
                  "citation expansion). Uses a specification-specific iso_clause_map.yaml "
                  "if present, otherwise falls back to the builder default.",
         )
+        build_parser.add_argument(
+            "--railroad-css-classes",
+            help="Style railroad diagrams through stylesheet classes instead of "
+                 "inline attributes on every element (smaller SVGs).",
+            action="store_true",
+        )
         build_parser.add_argument(
             "--keep-pdf-latex",
-            help="Capture the intermediate LaTeX when building PDF, alongside a "
-            "script to recreate the PDF from the .tex (implies tectonic wrapper)",
+            help="Keep a copy of the intermediate LaTeX next to the PDF, alongside a "
+            "script to recreate the PDF from the .tex",
             action="store_true",
         )
         # PDF quality gate (aousd/doc_build#100).
@@ -1559,6 +2073,26 @@ class DocBuilder:
             action="store_true",
             default=GATE_DEFAULT_CHECK_OVERFLOW,
         )
+        build_parser.add_argument(
+            "--no-glyph-precheck",
+            help="Skip the check, before the PDF is typeset, for characters the "
+                 "bundled fonts have no glyph for.",
+            action="store_true",
+        )
+        build_parser.add_argument(
+            "--no-overflow-precheck",
+            help="Skip the check, before the PDF is typeset, for code lines and "
+                 "railroad diagrams wider than the text.",
+            action="store_true",
+        )
+        build_parser.add_argument(
+            "--strict-precheck",
+            help="Fail the build before the PDF is typeset, and before any other "
+                 "output is written, when the pre-checks predict a defect the PDF "
+                 "quality gate fails on. Default: report the predictions only.",
+            action="store_true",
+            default=GATE_DEFAULT_STRICT_PRECHECK,
+        )
         build_parser.add_argument(
             "--overflow-threshold-pt",
             type=float,
@@ -1569,10 +2103,24 @@ class DocBuilder:
         )
         build_parser.add_argument(
             "--heading-case-lint",
-            help="Run the ISO heading sentence-case linter before building and "
+            help="Run the ISO heading sentence-case linter on the built spec and "
                  "print violations (does not block the build).",
             action="store_true",
         )
+        build_parser.add_argument(
+            "--iso-lint",
+            help="Run all ISO linters (clause structure, heading case, bold table "
+                 "headers) on the built spec and print violations (does not block "
+                 "the build).",
+            action="store_true",
+        )
+        build_parser.add_argument(
+            "--spellcheck",
+            help="Spell check the built spec and print misspelled words at "
+                 "their source file:line (does not block the build). Words "
+                 "checked by earlier builds are not checked again.",
+            action="store_true",
+        )
         build_parser.add_argument(
             "--heading-proper-nouns",
             type=Path,
@@ -1639,6 +2187,31 @@ class DocBuilder:
         style_parser.set_defaults(func=self.display_style_issues)
         return style_parser
 
+    def _add_iso_lint_scope_arguments(self, p):
+        p.add_argument(
+            "--changed-since",
+            default=None,
+            metavar="REF",
+            help="Only check files changed since the git REF (including uncommitted "
+                 "and untracked files)",
+        )
+        p.add_argument(
+            "--staged",
+            action="store_true",
+            help="Only check files with staged changes (for pre-commit hooks)",
+        )
+        p.add_argument(
+            "--no-lint-cache",
+            action="store_true",
+            help="Re-check every file instead of reusing results cached in the "
+                 "build cache directory for unchanged files",
+        )
+        p.add_argument(
+            "--fail-fast",
+            action="store_true",
+            help="Stop at the first file with violations and exit non-zero (for CI)",
+        )
+
     def make_iso_clause_lint_parser(self, subparsers):
         p = subparsers.add_parser(
             "iso_clause_lint",
@@ -1651,6 +2224,7 @@ class DocBuilder:
             metavar="N",
             help="Number of body lines to show per violation (default: 5)",
         )
+        self._add_iso_lint_scope_arguments(p)
         p.set_defaults(func=self.iso_clause_lint)
         return p
 
@@ -1667,6 +2241,7 @@ class DocBuilder:
             help="Path to a YAML file listing additional proper nouns "
                  "(default: iso_heading_proper_nouns.yaml in the builder or spec root)",
         )
+        self._add_iso_lint_scope_arguments(p)
         p.set_defaults(func=self.heading_case_lint)
         return p
 
@@ -1691,6 +2266,7 @@ class DocBuilder:
             "bold_table_lint",
             help="Check that table header cells in specification sources are bold",
         )
+        self._add_iso_lint_scope_arguments(p)
         p.set_defaults(func=self.bold_table_lint)
         return p
 
@@ -1722,6 +2298,7 @@ class DocBuilder:
             metavar="N",
             help="Number of body lines to show per clause-structure violation (default: 5)",
         )
+        self._add_iso_lint_scope_arguments(p)
         p.set_defaults(func=self.iso_lint_all)
         return p
 
@@ -4,7 +4,7 @@
 For each image path (assumed to be under AOUSD_IMAGES_ROOT):
   1. Compute the path relative to AOUSD_IMAGES_ROOT.
   2. Remove any path components named "images".
-  3. Copy the image to AOUSD_OUTPUT_DIR/images/<relative>.
+  3. Place the image at AOUSD_OUTPUT_DIR/images/<relative> (see below).
   4. Rewrite the AST image path to images/<relative> (relative from output/ to output/images/).
 
 Both absolute and relative image paths are processed. Relative paths are
@@ -14,18 +14,47 @@ Required pandoc metadata:
   AOUSD_IMAGES_ROOT: absolute path to the images root directory
   AOUSD_OUTPUT_DIR: absolute path to the output directory
 
+Optional pandoc metadata:
+  AOUSD_HASH_CACHE: path of the persistent ImageHashCache index
+
 An in-process dict tracks which source files have been copied to each destination,
-detecting collisions where two different sources map to the same destination path.
+detecting collisions where two different sources with different content map to
+the same destination path.
+
+Images are placed by an ImageBundler: a destination that already holds the
+same content is left untouched, files are reflinked or hard-linked where the
+filesystem allows, identical content is stored once, and the remaining copies
+run in the background while the AST is walked.  The filter waits for them
+before exiting.
 """
 
-import shutil
 from pathlib import Path
 
+from image_hash_cache import ImageBundler, ImageHashCache
 from pandocfilters import toJSONFilter, Image
 from shared_filter_utils import get_image_rel, get_metadata_str
 
 # Maps rel_key -> str(src_abs) for collision detection within a single pandoc run.
 _seen: dict[str, str] = {}
+_cache: ImageHashCache | None = None
+_bundler: ImageBundler | None = None
+
+
+def _get_cache(metadata) -> ImageHashCache:
+    global _cache
+    if _cache is None:
+        try:
+            _cache = ImageHashCache(get_metadata_str(metadata, "AOUSD_HASH_CACHE"))
+        except KeyError:
+            _cache = ImageHashCache()
+    return _cache
+
+
+def _get_bundler(metadata) -> ImageBundler:
+    global _bundler
+    if _bundler is None:
+        _bundler = ImageBundler(_get_cache(metadata))
+    return _bundler
 
 
 def bundle_image(key, value, _format, metadata):
@@ -48,15 +77,14 @@ def bundle_image(key, value, _format, metadata):
     rel_key = image_rel.as_posix()
 
     if rel_key in _seen:
-        if _seen[rel_key] != str(src):
+        if _seen[rel_key] != str(src) and not _get_cache(metadata).same_content(_seen[rel_key], src):
             raise RuntimeError(
                 f"Image name collision at {rel_key!r}: already mapped from "
                 f"{_seen[rel_key]!r}, cannot also map from {str(src)!r}"
             )
         # Already copied earlier in this run; skip
     else:
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dest)
+        _get_bundler(metadata).add(src, dest)
         _seen[rel_key] = str(src)
 
     # Relative from output/ (where the .md output file lives) to output/images/.
@@ -66,5 +94,13 @@ def bundle_image(key, value, _format, metadata):
     return Image(value[0], value[1], value[2])
 
 
-if __name__ == "__main__":
+def main():
     toJSONFilter(bundle_image)
+    if _bundler is not None:
+        _bundler.close()
+    if _cache is not None:
+        _cache.save()
+
+
+if __name__ == "__main__":
+    main()
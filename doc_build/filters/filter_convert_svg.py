@@ -1,33 +1,24 @@
 #!/usr/bin/env python3
-import os
-from pandocfilters import toJSONFilter, Image
-import shutil
-import subprocess
+"""Pandoc filter that replaces SVG images with PNG renderings (for DOCX).
 
-rsvg_convert = shutil.which("rsvg-convert")
-if not rsvg_convert:
-    raise RuntimeError("rsvg-convert not found")
+The SVGs are rasterised together, in parallel, by
+svg_convert_cache.replace_svg_images.
 
+Optional pandoc metadata:
+  AOUSD_CACHE_DIR: build cache directory.  PNGs are cached there by SVG
+                   content hash and DPI and reused across builds.  Without
+                   it, each PNG is written next to its SVG.
+"""
 
-def convert_svg(key, value, format, metadata):
-    if key != "Image":
-        return
+from shared_filter_utils import get_metadata_str, run_document_filter
+from svg_convert_cache import replace_svg_images
 
-    image_path = value[2][0]
-    base, ext = os.path.splitext(image_path)
-    if ext != ".svg":
-        return
+DPI = 192
 
-    png_path = base + ".png"
-    dpi = str(192)
-    subprocess.check_call(
-        [rsvg_convert, image_path, "-o", png_path, "-d", dpi, "-p", dpi]
-    )
 
-    value[2][0] = png_path
-
-    return Image(value[0], value[1], value[2])
+def convert_svg(doc, format, meta):
+    return replace_svg_images(doc, "png", DPI, get_metadata_str(meta, "AOUSD_CACHE_DIR", None))
 
 
 if __name__ == "__main__":
-    toJSONFilter(convert_svg)
+    run_document_filter(convert_svg)
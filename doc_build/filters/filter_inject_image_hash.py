@@ -6,34 +6,25 @@ attribute key-value list (c[0][2]).  Relative image paths are resolved against
 AOUSD_ARTIFACTS_DIR metadata (the artifacts directory).  If the metadata is not
 present, paths are resolved against the current working directory.
 
+Digests come from the persistent ImageHashCache named by the AOUSD_HASH_CACHE
+metadata (in-memory only if absent): all images of the document are collected
+first and any that changed since the last build are hashed in parallel.
+
 When pandoc later diffs before/after AST files, a hash change causes the image
 node to be treated as a substitution even if the filename is identical, enabling
 binary-level image change detection.
 """
 
-import hashlib
 from pathlib import Path
 
-from pandocfilters import toJSONFilter, Image
-from shared_filter_utils import HASH_ATTR_KEY, get_metadata_str
-
-
-def _sha256(path: Path) -> str:
-    """Return the hex-encoded SHA-256 digest of the file at path."""
-    h = hashlib.sha256()
-    with path.open("rb") as fh:
-        for chunk in iter(lambda: fh.read(65536), b""):
-            h.update(chunk)
-    return h.hexdigest()
+from image_hash_cache import ImageHashCache
+from pandocfilters import Image, walk
+from shared_filter_utils import HASH_ATTR_KEY, get_metadata_str, run_document_filter
 
+_cache = ImageHashCache()
 
-def inject_image_hash(key, value, _format, meta):
-    if key != "Image":
-        return
-
-    attr, caption, target = value
-    image_path = target[0]
 
+def _resolve_src(image_path: str, meta) -> Path:
     try:
         artifacts_dir = Path(get_metadata_str(meta, "AOUSD_ARTIFACTS_DIR"))
     except KeyError:
@@ -42,12 +33,21 @@ def inject_image_hash(key, value, _format, meta):
     src = Path(image_path)
     if not src.is_absolute():
         src = artifacts_dir / src
+    return src
+
+
+def inject_image_hash(key, value, _format, meta):
+    if key != "Image":
+        return
+
+    attr, caption, target = value
+    src = _resolve_src(target[0], meta)
 
     if not src.exists():
         # Skip images that cannot be found (e.g. generated at a later stage).
         return
 
-    digest = _sha256(src)
+    digest = _cache.sha256(src)
 
     id_, classes, kv_pairs = attr
     # Remove any existing hash entry, then append the fresh one.
@@ -58,5 +58,26 @@ def inject_image_hash(key, value, _format, meta):
     return Image(new_attr, caption, target)
 
 
+def inject_image_hashes(doc, fmt, meta):
+    global _cache
+
+    index_path = get_metadata_str(meta, "AOUSD_HASH_CACHE", None)
+    if index_path is not None:
+        _cache = ImageHashCache(index_path)
+
+    sources = []
+
+    def collect(key, value, _format, meta):
+        if key == "Image":
+            sources.append(_resolve_src(value[2][0], meta))
+
+    walk(doc, collect, fmt, meta)
+    _cache.hash_many(src for src in sources if src.exists())
+
+    doc = walk(doc, inject_image_hash, fmt, meta)
+    _cache.save()
+    return doc
+
+
 if __name__ == "__main__":
-    toJSONFilter(inject_image_hash)
+    run_document_filter(inject_image_hashes)
@@ -1,31 +1,110 @@
 #!/usr/bin/env python3
+"""Pandoc filter that renders ``peg`` code blocks as railroad diagrams.
+
+Each block is followed by an SVG of its rule, written to the AOUSD_BUILD
+directory as ``{PART}_{key}.svg``, where the key hashes the normalised PEG
+text and the renderer version (shared_filter_utils.get_railroad_key).  An
+existing file for the key is reused, so unchanged diagrams are rendered
+once for all output formats and across builds.
+
+Missing diagrams are rendered up front, before the document is rewritten:
+all peg blocks are parsed together in one pass (the rules are cached per
+block in ``{PART}_grammar.pickle``, together with the version of the parser
+that produced them) and the diagrams are drawn in a process pool.
+
+The rules of all blocks also form one RuleModel, by rule name, which
+resolves the nonterminals of each rule against the rules of every other
+block.  Several blocks may define the same rule (variants of it are shown
+side by side), so a name maps to all of its distinct definitions rather
+than to one, as pegen.grammar.Grammar would require.
+
+``filter_railroad.py --measure AOUSD_BUILD PART [--css-classes]`` reads
+a JSON list of peg block codes on stdin and writes the width in points of
+each block's diagram (null if it has none), as measure_diagrams() does:
+diagrams not yet rendered are laid out from their rules, so the PDF
+overflow pre-check knows every width before the first render.
+
+Optional pandoc metadata:
+  RAILROAD_CSS_CLASSES: if true, style diagram elements through the embedded
+                        stylesheet's classes instead of repeating inline
+                        stroke/fill/font attributes on every element.
+  RAILROAD_CHECK_GRAMMAR: if true, report on stderr the nonterminals no peg
+                          block defines and the rules that blocks define
+                          differently.
+"""
 import copy
-import sys
-
-from pandocfilters import toJSONFilter, Para, Image, CodeBlock, get_caption
-from shared_filter_utils import get_metadata_str
-
+import hashlib
 import io
+import json
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from pandocfilters import Para, Image, CodeBlock, get_caption, walk
+from shared_filter_utils import (
+    RAILROAD_RENDERER_VERSION,
+    get_metadata_str,
+    get_railroad_key,
+    get_railroad_peg,
+    railroad_pixels_to_points,
+    read_svg_size,
+    run_document_filter,
+)
 
 from peg_to_peg import convert_standard_peg_to_pegen
-from gen_svg import convert_node, Nothing, Container
+from gen_svg import convert_node, Nothing
 import railroad as railroad
 
+import token
 import tokenize
+import peg_to_peg
+import pegen.grammar
+import pegen.grammar_parser
+import pegen.tokenizer
 from pegen.tokenizer import Tokenizer
 from pegen.grammar_parser import GeneratedParser as GrammarParser
 
-counter = 0
 LINE_BREAK_MARKER = "↵"
 
 
-def split_for_stack(container):
-    if LINE_BREAK_MARKER not in str(container):
+def has_line_break(item, memo):
+    """True if LINE_BREAK_MARKER occurs in *item*'s text or anywhere below it.
+
+    Matches ``LINE_BREAK_MARKER in str(item)`` but is computed bottom-up, once
+    per item; *memo* maps id(item) to the result.
+    """
+    key = id(item)
+    if key not in memo:
+        if isinstance(item, (railroad.Terminal, railroad.NonTerminal, railroad.Comment)):
+            found = any(
+                LINE_BREAK_MARKER in value
+                for value in (item.text, item.href, item.title, item.cls)
+                if isinstance(value, str)
+            )
+        elif hasattr(item, "items"):
+            found = any(has_line_break(child, memo) for child in item.items)
+        elif isinstance(item, railroad.OneOrMore):
+            found = has_line_break(item.item, memo) or has_line_break(item.rep, memo)
+        elif isinstance(item, railroad.Group):
+            found = has_line_break(item.item, memo) or (
+                item.label is not None and has_line_break(item.label, memo)
+            )
+        else:
+            found = LINE_BREAK_MARKER in str(item)
+        memo[key] = found
+    return memo[key]
+
+
+def split_for_stack(container, memo=None):
+    if memo is None:
+        memo = {}
+    if not has_line_break(container, memo):
         return container
 
     # Handle multi-item containers (Sequence, Choice, Stack)
     if hasattr(container, "items"):
-        processed_items = [split_for_stack(item) for item in container.items]
+        processed_items = [split_for_stack(item, memo) for item in container.items]
 
         if isinstance(container, railroad.Sequence):
             stack_parts = []
@@ -55,81 +134,380 @@ def split_for_stack(container):
 
     # Handle single-item containers (ZeroOrMore, OneOrMore, Optional)
     elif hasattr(container, "item"):
-        processed_item = split_for_stack(container.item)
+        processed_item = split_for_stack(container.item, memo)
         return type(container)(processed_item)
 
     # Terminal or unknown container — return as is
     return container
 
 
+def _make_parser(pegen_text):
+    tokenizer = Tokenizer(tokenize.generate_tokens(io.StringIO(pegen_text).readline), verbose=False)
+    return GrammarParser(tokenizer, verbose=False)
+
+
+def parse_peg(peg):
+    """Parse the PEG text of one block and return its pegen rules."""
+    new_peg = convert_standard_peg_to_pegen(peg)
+
+    try:
+        ss = list(tokenize.generate_tokens(io.StringIO(new_peg).readline))
+    except:
+        raise Exception(f"Rule not tokenizable after conversion: {new_peg}")
+
+    parser = _make_parser(new_peg)
+    grammar = parser.start()
+
+    if not grammar:
+        # sys.stderr.write("No grammar:"+repr(new_peg))
+        raise parser.make_syntax_error(io.StringIO(new_peg))
+
+    return list(grammar)
+
+
+def parse_peg_blocks(pegs):
+    """Parse the PEG text of several blocks in one pass.
+
+    The converted blocks are joined into a single grammar source and read by
+    one tokenizer and GrammarParser, sharing its packrat cache.  Each block
+    holds one rule, so rules are mapped back to blocks by order; their names
+    are checked against the blocks to make sure no block was mis-split.
+    Returns one rule list per block, or None if the batch cannot be parsed
+    that way (the caller then parses block by block for precise errors).
+    """
+    pegen_texts = [convert_standard_peg_to_pegen(peg) for peg in pegs]
+    if any("\n" in text for text in pegen_texts):
+        return None
+    expected_names = [text.split(":", 1)[0].strip() for text in pegen_texts]
+
+    try:
+        parser = _make_parser("\n".join(pegen_texts) + "\n")
+        # Grammar() rejects repeated rule names, which distinct blocks may
+        # well share, so collect the rules one at a time instead of start().
+        rules = []
+        while (rule := parser.rule()) is not None:
+            rules.append(rule)
+        if not parser.expect("ENDMARKER"):
+            return None
+    except (SyntaxError, tokenize.TokenError):
+        return None
+
+    if [rule.name for rule in rules] != expected_names:
+        return None
+    return [[rule] for rule in rules]
+
+
+_grammar_cache_version = None
+
+
+def get_grammar_cache_version():
+    """Return the version of the rules pickled by load_block_rules.
+
+    It changes with RAILROAD_RENDERER_VERSION and with the source of the
+    modules that produce the pickled rules (the PEG conversion and pegen),
+    so an upgrade never loads Rule objects pickled by an older version.
+    """
+    global _grammar_cache_version
+    if _grammar_cache_version is None:
+        h = hashlib.sha256(RAILROAD_RENDERER_VERSION.encode("utf-8"))
+        for module in (peg_to_peg, pegen.grammar, pegen.grammar_parser, pegen.tokenizer):
+            with open(module.__file__, "rb") as f:
+                h.update(f.read())
+        _grammar_cache_version = h.hexdigest()[:20]
+    return _grammar_cache_version
+
+
+def load_block_rules(pegs, cache_path=None):
+    """Return the pegen rules of each block in *pegs* (``{key: peg}``).
+
+    Rules are kept in a pickle at *cache_path*, keyed by block and tagged
+    with get_grammar_cache_version(); only blocks missing from it are
+    parsed, in a single batch (parse_peg_blocks).  The pickle is rewritten
+    to hold exactly the blocks of *pegs*.
+    """
+    cached = {}
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                version, cached = pickle.load(f)
+            if version != get_grammar_cache_version():
+                cached = {}
+        except Exception:
+            # A stale or corrupt cache only costs a reparse.
+            cached = {}
+
+    missing = [key for key in pegs if key not in cached]
+    if missing:
+        parsed = parse_peg_blocks([pegs[key] for key in missing])
+        if parsed is None:
+            parsed = [parse_peg(pegs[key]) for key in missing]
+        cached.update(zip(missing, parsed))
+
+    block_rules = {key: cached[key] for key in pegs}
+    if missing and cache_path is not None:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump((get_grammar_cache_version(), block_rules), f)
+            os.replace(tmp_path, cache_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return block_rules
+
+
+# Token names pegen knows (NAME, NEWLINE, ...); references to them are not
+# rules of the grammar.
+_TOKEN_NAMES = frozenset(token.tok_name.values())
+
+
+def _references(node, names):
+    """Add the rule names *node* refers to to *names*.
+
+    convert_standard_peg_to_pegen turns literals into NameLeafs too, quoted
+    with lookalike characters, so only identifiers name rules.
+    """
+    if isinstance(node, pegen.grammar.NameLeaf):
+        if node.value.isidentifier():
+            names.add(node.value)
+    elif isinstance(node, (list, tuple)):
+        for child in node:
+            _references(child, names)
+    elif not isinstance(node, (str, pegen.grammar.Leaf)) and hasattr(node, "__iter__"):
+        for child in node:
+            _references(child, names)
+    return names
+
+
+class RuleModel:
+    """The rules of several peg blocks, by name.
+
+    *block_rules* is a list of rule lists, one per block, in document order.
+    ``definitions[name]`` lists the distinct definitions of rule *name*
+    (by their text), in the order the blocks give them; a rule repeated
+    verbatim by a later block is only listed once.
+    """
+
+    def __init__(self, block_rules):
+        self.definitions = {}
+        for rules in block_rules:
+            for rule in rules:
+                known = self.definitions.setdefault(rule.name, [])
+                if all(str(rule.rhs) != str(other.rhs) for other in known):
+                    known.append(rule)
+
+    def resolve(self, name):
+        """Return the definitions of the rule *name* ([] if no block defines it)."""
+        return self.definitions.get(name, [])
+
+    def undefined(self):
+        """Return ``{name: referring rule names}`` for the nonterminals no block defines."""
+        missing = {}
+        for name, rules in self.definitions.items():
+            for rule in rules:
+                for ref in _references(rule.rhs, set()):
+                    if ref not in self.definitions and ref not in _TOKEN_NAMES:
+                        missing.setdefault(ref, set()).add(name)
+        return missing
+
+    def conflicts(self):
+        """Return the names of the rules that blocks define differently."""
+        return [name for name, rules in self.definitions.items() if len(rules) > 1]
+
+
+def report_grammar(model, write=sys.stderr.write):
+    """Write the unresolved references and conflicting rules of *model*."""
+    for ref, users in sorted(model.undefined().items()):
+        write(f"peg: {ref} is used by {', '.join(sorted(users))} but defined by no peg block\n")
+    for name in model.conflicts():
+        write(f"peg: {name} is defined differently by {len(model.resolve(name))} peg blocks\n")
+
+
+def rules_to_diagram(rules):
+    """Return the railroad.Diagram of the first of *rules* to draw, or None."""
+    for node in rules:
+        name = node.name
+        if name.startswith("invalid_"):
+            continue
+        rule = convert_node(node).simplify()
+        if not isinstance(rule, Nothing):
+            structured = split_for_stack(rule.as_railroad())
+            return railroad.Diagram(structured)
+    return None
+
+
+def diagram_width(rules):
+    """Return the width in pixels of the SVG render_diagram writes for *rules*, or None."""
+    diagram = rules_to_diagram(rules)
+    if diagram is None:
+        return None
+    return float(diagram.format().attrs["width"])
+
+
+def render_diagram(rules, filename, css_classes=False):
+    """Write the diagram of *rules* to *filename*; return False if there is none."""
+    railroad.INLINE_STYLES = not css_classes
+    diagram = rules_to_diagram(rules)
+    if diagram is None:
+        return False
+    # Write under a temporary name so a failed render never leaves a partial
+    # file behind that later builds would take for a cached diagram.
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_filename, "w") as f:
+            diagram.writeStandalone(f.write)
+        os.replace(tmp_filename, filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+    return True
+
+
+def get_grammar_cache_path(metadata):
+    build_directory = get_metadata_str(metadata, "AOUSD_BUILD")
+    part_name = get_metadata_str(metadata, "PART")
+    return _grammar_cache_path(build_directory, part_name)
+
+
+def _grammar_cache_path(build_directory, part_name):
+    return f"{build_directory}/{part_name}_grammar.pickle"
+
+
+def _diagram_path(build_directory, part_name, code, css_classes):
+    return f"{build_directory}/{part_name}_{get_railroad_key(code, css_classes=css_classes)}.svg"
+
+
+def _metadata_flag(metadata, key):
+    entry = metadata.get(key)
+    if entry is None:
+        return False
+    if entry.get("t") == "MetaBool":
+        return entry["c"]
+    return get_metadata_str(metadata, key).lower() in ("1", "true", "yes")
+
+
+def use_css_classes(metadata):
+    return _metadata_flag(metadata, "RAILROAD_CSS_CLASSES")
+
+
+def get_diagram_filename(code, metadata):
+    build_directory = get_metadata_str(metadata, "AOUSD_BUILD")
+    part_name = get_metadata_str(metadata, "PART")
+    return _diagram_path(build_directory, part_name, code, use_css_classes(metadata))
+
+
+def measure_diagrams(codes, build_directory, part_name, css_classes=False):
+    """Return the width in points of the diagram of each ``peg`` block in *codes*.
+
+    A diagram already rendered is measured from its SVG; the others are
+    laid out from their rules, which are loaded like the filter loads them
+    (load_block_rules, with all of *codes*), without writing an SVG.  The
+    width is None for blocks that have no diagram.
+    """
+    pegs = {get_railroad_key(code): get_railroad_peg(code) for code in codes}
+    block_rules = None
+    widths = []
+    for code in codes:
+        filename = _diagram_path(build_directory, part_name, code, css_classes)
+        if os.path.exists(filename):
+            pixels = read_svg_size(filename)[0]
+        else:
+            if block_rules is None:
+                block_rules = load_block_rules(pegs, _grammar_cache_path(build_directory, part_name))
+            pixels = diagram_width(block_rules[get_railroad_key(code)])
+        widths.append(None if pixels is None else railroad_pixels_to_points(pixels))
+    return widths
+
+
+# Diagrams found empty by the pre-pass, so the walk does not render them again.
+_no_diagram = set()
+
+
+def render_missing_diagrams(jobs, css_classes=False):
+    """Render each ``{filename: rules}`` in *jobs*, in parallel when there are several."""
+    if len(jobs) > 1:
+        with ProcessPoolExecutor() as pool:
+            results = list(pool.map(
+                render_diagram, jobs.values(), jobs.keys(), [css_classes] * len(jobs)
+            ))
+    else:
+        results = [render_diagram(rules, filename, css_classes) for filename, rules in jobs.items()]
+    for filename, rendered in zip(jobs, results):
+        if not rendered:
+            _no_diagram.add(filename)
+
+
 def create_diagram(key, value, format, metadata):
-    global counter
     if key == "CodeBlock":
         [[ident, classes, keyvals], code] = value
 
         if classes == ["peg"]:
-            build_directory = get_metadata_str(metadata, "AOUSD_BUILD")
-            part_name = get_metadata_str(metadata, "PART")
+            abs_filename = get_diagram_filename(code, metadata)
+            if abs_filename in _no_diagram:
+                return
+            if not os.path.exists(abs_filename):
+                rules = parse_peg(get_railroad_peg(code))
+                if not render_diagram(rules, abs_filename, use_css_classes(metadata)):
+                    _no_diagram.add(abs_filename)
+                    return
+
+            caption, typef, keyvals = get_caption(keyvals)
 
-            old_peg = "".join(code.split("\n"))
-            # sys.stderr.write("Old:"+old_peg+"\n")
-            new_peg = convert_standard_peg_to_pegen(old_peg)
-            # sys.stderr.write("New:"+new_peg+"\n")
+            svg_width, svg_height = read_svg_size(abs_filename)
+            w = railroad_pixels_to_points(svg_width)
+            h = railroad_pixels_to_points(svg_height)
 
-            try:
-                ss = list(tokenize.generate_tokens(io.StringIO(new_peg).readline))
-            except:
-                raise Exception(f"Rule not tokenizable after conversion: {new_peg}")
+            width = f"{w}pt"
+            height = f"{h}pt"
 
-            tokenizer = Tokenizer(tokenize.generate_tokens(io.StringIO(new_peg).readline), verbose=False)
-            parser = GrammarParser(tokenizer, verbose=False)
-            grammar = parser.start()
+            # centimetres = w * 2.54 / 72
+            # if centimetres > 17:  # hardcoded maximum width, good for debugging; should be 16 for A4 and legal
+            #     sys.stderr.write(f"DIAGRAM OVERFLOW {centimetres}:{old_peg}\n")
 
-            if not grammar:
-                # sys.stderr.write("No grammar:"+repr(new_peg))
-                raise parser.make_syntax_error(io.StringIO(new_peg))
+            keyvals_code = copy.deepcopy(keyvals)
 
-            for node in grammar:
-                name = node.name
-                if name.startswith("invalid_"):
-                    continue
-                rule = convert_node(node)
-                while (new := rule.simplify()) != rule:
-                    rule = new
-                if not isinstance(rule, Nothing):
-                    abs_filename = f"{build_directory}/{part_name}_{counter}.svg"
-                    f = open(abs_filename, "w")
-                    structured = split_for_stack(rule.as_railroad())
-                    diagram = railroad.Diagram(structured)
-                    diagram.writeStandalone(f.write)
-                    f.close()
+            keyvals.append(("width", width))
+            keyvals.append(("height", height))
 
-                    caption, typef, keyvals = get_caption(keyvals)
-                    counter += 1
+            return [
+                CodeBlock([ident, classes, keyvals_code], code),
+                Para([Image([ident, [], keyvals], caption, [abs_filename, typef])]),
+            ]
 
-                    def pixels_to_points(pixels, dpi=96*1.2):  # scaling to fit better with the fonts; yes, the 96 here and 72 next line are there for scaling
-                        return pixels * (72 / dpi)
 
-                    w = pixels_to_points(float(diagram.attrs['width']))
-                    h = pixels_to_points(float(diagram.attrs['height']))
+def railroad_filter(doc, fmt, meta):
+    pegs = {}
+    missing = {}
 
-                    width = f"{w}pt"
-                    height = f"{h}pt"
+    def collect(key, value, _format, metadata):
+        if key == "CodeBlock" and value[0][1] == ["peg"]:
+            block_key = get_railroad_key(value[1])
+            pegs.setdefault(block_key, get_railroad_peg(value[1]))
+            filename = get_diagram_filename(value[1], metadata)
+            if not os.path.exists(filename):
+                missing.setdefault(filename, block_key)
 
-                    # centimetres = w * 2.54 / 72
-                    # if centimetres > 17:  # hardcoded maximum width, good for debugging; should be 16 for A4 and legal
-                    #     sys.stderr.write(f"DIAGRAM OVERFLOW {centimetres}:{old_peg}\n")
+    walk(doc, collect, fmt, meta)
+    check_grammar = _metadata_flag(meta, "RAILROAD_CHECK_GRAMMAR")
+    if missing or (check_grammar and pegs):
+        block_rules = load_block_rules(pegs, get_grammar_cache_path(meta))
+        if check_grammar:
+            report_grammar(RuleModel(block_rules.values()))
+        jobs = {filename: block_rules[block_key] for filename, block_key in missing.items()}
+        render_missing_diagrams(jobs, use_css_classes(meta))
 
-                    keyvals_code = copy.deepcopy(keyvals)
+    return walk(doc, create_diagram, fmt, meta)
 
-                    keyvals.append(("width", width))
-                    keyvals.append(("height", height))
 
-                    return [
-                        CodeBlock([ident, classes, keyvals_code], code),
-                        Para([Image([ident, [], keyvals], caption, [abs_filename, typef])]),
-                    ]
+def measure_main(argv):
+    """Write the measure_diagrams() widths of the JSON list of codes on stdin."""
+    build_directory, part_name = argv[:2]
+    widths = measure_diagrams(json.load(sys.stdin), build_directory, part_name, "--css-classes" in argv[2:])
+    json.dump(widths, sys.stdout)
 
 
 if __name__ == "__main__":
-    toJSONFilter(create_diagram)
+    if sys.argv[1:2] == ["--measure"]:
+        measure_main(sys.argv[2:])
+    else:
+        run_document_filter(railroad_filter)
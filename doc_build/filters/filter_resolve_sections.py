@@ -1,6 +1,21 @@
 #!/usr/bin/env python3
+"""Pandoc filter that rewrites links to section files into in-document anchors.
+
+The builder writes a path -> anchor index for every section it inlines while
+flattening the specification, and passes its location in the
+AOUSD_SECTION_INDEX metadata variable.  Links are resolved through a suffix
+dictionary built from that index, so each lookup is a single dict access.
+
+If the metadata is absent (e.g. the filter is run by hand), the index is
+built by scanning the ``.md`` files under the current working directory.
+"""
+
+import json
 import os
+from pathlib import Path, PurePosixPath
+
 from pandocfilters import toJSONFilter, Link
+from shared_filter_utils import get_metadata_str, get_section_anchor
 
 
 def get_spec_doc_roots():
@@ -13,25 +28,46 @@ def get_spec_doc_roots():
             path = os.path.join(root, f)
 
             with open(path, "r", encoding="utf-8") as md:
-                for line in md.readlines():
-                    line = line.strip()
-                    if line.startswith("#"):
-                        section = line
-                        break
+                anchor = get_section_anchor(md)
+            if anchor is not None:
+                found[Path(path).as_posix()] = anchor
 
-                else:
-                    continue
+    return found
 
-            name = "-".join([t.lower() for t in section.split() if t.isalnum()])
-            found[path] = f"#{name}"
 
-    return found
+def build_suffix_index(roots):
+    """Map every trailing run of path components to its section anchor.
+
+    ``{"a/b/README.md": "#b"}`` yields entries for ``README.md``,
+    ``b/README.md`` and ``a/b/README.md``.  When two paths share a suffix,
+    the one listed first wins.
+    """
+    suffixes = {}
+    for path, anchor in roots.items():
+        parts = PurePosixPath(path).parts
+        for i in range(len(parts)):
+            suffixes.setdefault("/".join(parts[i:]), anchor)
+    return suffixes
+
+
+_suffix_index = None
 
 
-SPEC_DOC_ROOTS = get_spec_doc_roots()
+def _get_suffix_index(metadata):
+    global _suffix_index
+    if _suffix_index is None:
+        try:
+            index_path = get_metadata_str(metadata, "AOUSD_SECTION_INDEX")
+        except KeyError:
+            roots = get_spec_doc_roots()
+        else:
+            with open(index_path, "r", encoding="utf-8") as f:
+                roots = json.load(f)
+        _suffix_index = build_suffix_index(roots)
+    return _suffix_index
 
 
-def resolve_sections(key, value, _format, _metadata):
+def resolve_sections(key, value, _format, metadata):
     if key != "Link":
         return
 
@@ -44,11 +80,10 @@ def resolve_sections(key, value, _format, _metadata):
     if len(tokens) == 2:
         value[2][0] = f"#{tokens[1]}"
     elif len(tokens) == 1:
-        link = tokens[0].replace("../", "")
-        paths = [k for k in SPEC_DOC_ROOTS if k.endswith(link)]
-        if paths:
-            path = paths[0]
-            value[2][0] = SPEC_DOC_ROOTS[path]
+        parts = [p for p in PurePosixPath(tokens[0]).parts if p not in ("..", ".")]
+        anchor = _get_suffix_index(metadata).get("/".join(parts))
+        if anchor is not None:
+            value[2][0] = anchor
     else:
         return
 
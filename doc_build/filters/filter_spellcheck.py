@@ -1,13 +1,26 @@
-#!/usr/bin/env python3.10
+#!/usr/bin/env python3
+"""Pandoc filter that lists the misspelled words of a document on stderr.
 
+The words are checked by spelling.misspelled_words, so only words not seen
+before are sent to the spell checker.
+
+Optional pandoc metadata:
+  AOUSD_CACHE_DIR:       build cache directory.  The known-words store is
+                         kept there, so unchanged words are not checked again.
+  AOUSD_SPELLING_WORDS:  project word list; its words are never reported.
+"""
+
+import subprocess
 import sys
 from collections import defaultdict
+from pathlib import Path
 from pandocfilters import toJSONFilter
-import subprocess
-import platform
+from shared_filter_utils import get_metadata_str
+from spelling import DEFAULT_LANGUAGE, KNOWN_WORDS_FILENAME, load_word_list, misspelled_words
 
 words = defaultdict(int)
-deflang = "en"
+deflang = DEFAULT_LANGUAGE
+metadata = {}
 
 
 # Function to get the default language from the metadata
@@ -18,31 +31,24 @@ def get_default_language(meta):
 # Function to handle results after processing all elements
 def process_results(key, value, format, meta):
     if key == "Pandoc":
-        keys = list(words.keys())
-        inp = "\n".join(keys)
-
-        if platform.system() != "Darwin":
-            try:
-                result = subprocess.run(
-                    ["aspell", "list", "-l", deflang],
-                    input=inp,
-                    text=True,
-                    capture_output=True,
-                    check=True,
-                )
-                outp = result.stdout
-            except subprocess.CalledProcessError as e:
-                sys.stderr.write(f"Error running aspell: {e}\n")
-                sys.exit(1)
-
-            for word in outp.strip().split("\n"):
-                if word:
-                    print(word)
-        else:
-            import mac_spellchecker
-
-            for term in keys:
-                mac_spellchecker.wrapper(term)
+        try:
+            store = Path(get_metadata_str(metadata, "AOUSD_CACHE_DIR")) / KNOWN_WORDS_FILENAME
+        except KeyError:
+            store = None
+        try:
+            project_words = load_word_list(get_metadata_str(metadata, "AOUSD_SPELLING_WORDS"))
+        except KeyError:
+            project_words = frozenset()
+
+        try:
+            found = misspelled_words(words, deflang, store, project_words)
+        except (OSError, subprocess.CalledProcessError) as e:
+            sys.stderr.write(f"Error running the spell checker: {e}\n")
+            sys.exit(1)
+
+        # stdout carries the document back to pandoc.
+        for word in dict.fromkeys(m for misspelled in found.values() for m in misspelled):
+            sys.stderr.write(f"{word}\n")
 
         sys.exit(0)  # Exit to prevent further processing
 
@@ -75,6 +81,8 @@ def check_div(key, value, format, meta):
 
 # Register filters for handling metadata, divs, spans, and strings
 def spellchecking_filter(key, value, format, meta):
+    if not metadata:
+        metadata.update(meta)
     if key == "Meta":
         return get_default_language(value)
     elif key == "Div":
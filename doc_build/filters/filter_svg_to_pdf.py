@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""Pandoc filter that replaces SVG images with vector PDF renderings (for LaTeX).
+
+Run last in the PDF build, after any filter that generates SVGs (e.g. the
+railroad diagrams).  The SVGs are converted together, in parallel, by
+svg_convert_cache.replace_svg_images, with the same rsvg-convert settings
+pandoc itself uses for LaTeX output (``-f pdf -a``, 96 DPI), so neither
+pandoc nor tectonic has to launch a converter while typesetting.
+
+Optional pandoc metadata:
+  AOUSD_CACHE_DIR: build cache directory.  PDFs are cached there by SVG
+                   content hash and reused across builds and renders.
+                   Without it, each PDF is written next to its SVG.
+"""
+
+from shared_filter_utils import get_metadata_str, run_document_filter
+from svg_convert_cache import replace_svg_images
+
+DPI = 96
+
+
+def svg_to_pdf(doc, format, meta):
+    return replace_svg_images(
+        doc, "pdf", DPI, get_metadata_str(meta, "AOUSD_CACHE_DIR", None), extra_args=["-a"]
+    )
+
+
+if __name__ == "__main__":
+    run_document_filter(svg_to_pdf)
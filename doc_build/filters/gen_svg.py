@@ -1,6 +1,6 @@
 import argparse
 import sys
-import dataclasses
+import weakref
 
 import railroad
 
@@ -20,150 +20,142 @@ class SkipChoice(Exception):
 
 
 class Data:
-    simplified = False
+    """Base class of the simplified grammar tree.
+
+    Nodes are hash-consed: constructing a node whose class and fields match a
+    live node returns that node, so structurally equal trees are identical
+    and ``==`` is an identity check.  Nodes must therefore never be mutated.
+
+    simplify() returns the normal form of a node, i.e. the fixed point of the
+    rewrite rules below.  Children are normalised first and every result is
+    memoised on the node, so a whole rule is simplified in a single
+    bottom-up pass.
+    """
+
+    __slots__ = ("_normal", "__weakref__")
+    __match_args__ = ()
+
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, *fields):
+        key = (cls, *fields)
+        node = Data._interned.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            for name, value in zip(cls.__match_args__, fields):
+                object.__setattr__(node, name, value)
+            node._normal = None
+            Data._interned[key] = node
+        return node
 
     def simplify(self):
+        normal = self._normal
+        if normal is None:
+            normal = self._normalize()
+            self._normal = normal
+            normal._normal = normal
+        return normal
+
+    def _normalize(self):
         return self
 
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__match_args__)
+        return f"{type(self).__name__}({fields})"
+
 
 class Nothing(Data):
-    pass
+    __slots__ = ()
 
 
-@dataclasses.dataclass
-class LookaheadGroup:
-    item: object
-    label: str
+class LookaheadGroup(Data):
+    __slots__ = ("item", "label")
+    __match_args__ = ("item", "label")
 
     def as_railroad(self):
         return railroad.Group(item=self.item.as_railroad(), label=self.label)
 
-    def simplify(self):
-        return self
-
     def __str__(self):
         return str(self.item)
 
 
-@dataclasses.dataclass
 class Container(Data):
-    items: list
+    __slots__ = ("items",)
+    __match_args__ = ("items",)
+
+    def __new__(cls, items):
+        return super().__new__(cls, tuple(items))
 
     def __iter__(self):
         yield from self.items
 
-    def simplify(self):
-        self.items = [i.simplify() for i in self.items]
-        if len(self.items) == 0:
-            return Nothing()
-        if len(self.items) == 1:
-            return self.items[0]
-        return super().simplify()
-
 
 class Choice(Container):
+    __slots__ = ()
+
     def as_railroad(self):
         return railroad.Choice(0, *(n.as_railroad() for n in self))
 
-    def simplify(self):
-        new_items = []
-        optional = False
-        for item in self:
-            item = item.simplify()
-            match item:
-                case Nothing():
-                    # XXX This can reorder the choices
-                    optional = True
-                case Optional(inner):
-                    # XXX This can reorder the choices
-                    optional = True
-                    new_items.append(inner)
-                case Choice():
-                    new_items.extend(item)
-                case _:
-                    if new_items:
-                        adj = simplify_adjacent_choices(new_items[-1], item)
-                        if adj is not None:
-                            new_items[-1:] = adj
-                            continue
-                    new_items.append(item)
-        if new_items != self.items:
+    def _normalize(self):
+        items = [item.simplify() for item in self]
+        while True:
+            new_items = []
+            optional = False
+            for item in items:
+                match item:
+                    case Nothing():
+                        # XXX This can reorder the choices
+                        optional = True
+                    case Optional(inner):
+                        # XXX This can reorder the choices
+                        optional = True
+                        new_items.append(inner)
+                    case Choice():
+                        new_items.extend(item)
+                    case _:
+                        if new_items:
+                            adj = simplify_adjacent_choices(new_items[-1], item)
+                            if adj is not None:
+                                new_items[-1:] = [a.simplify() for a in adj]
+                                continue
+                        new_items.append(item)
             if optional:
-                return Optional(Choice(new_items)).simplify()
-            return Choice(new_items).simplify()
-        return super().simplify()
+                return Optional(Choice(new_items).simplify()).simplify()
+            if new_items == items:
+                break
+            items = new_items
+        if len(items) == 0:
+            return Nothing()
+        if len(items) == 1:
+            return items[0]
+        return Choice(items)
 
     def __str__(self):
         return "(" + " | ".join(str(x) for x in self) + ")"
 
 
 def simplify_adjacent_choices(*choices):
-
-    pass
-
     match choices:
         case a, b if a == b:
             return [a]
         case Sequence([*p, a]), Sequence([*q, b]) if a == b:
             # Common tail element
-            return [
-                Sequence(
-                    [
-                        Choice([Sequence(p), Sequence(q)]).simplify(),
-                        a,
-                    ]
-                )
-            ]
+            return [Sequence([Choice([Sequence(p), Sequence(q)]), a])]
         case a, Sequence([*q, b]) if a == b:
             # Common tail element
-            return [
-                Sequence(
-                    [
-                        Choice([Nothing(), Sequence(q)]).simplify(),
-                        a,
-                    ]
-                )
-            ]
+            return [Sequence([Choice([Nothing(), Sequence(q)]), a])]
         case Sequence([*p, a]), b if a == b:
             # Common tail element
-            return [
-                Sequence(
-                    [
-                        Choice([Sequence(p), Nothing()]).simplify(),
-                        a,
-                    ]
-                )
-            ]
+            return [Sequence([Choice([Sequence(p), Nothing()]), a])]
         case Sequence([a, *p]), Sequence([b, *q]) if a == b:
             # Common head element
-            return [
-                Sequence(
-                    [
-                        a,
-                        Choice([Sequence(p), Sequence(q)]).simplify(),
-                    ]
-                )
-            ]
+            return [Sequence([a, Choice([Sequence(p), Sequence(q)])])]
         case Sequence([a, *p]), b if a == b:
             # Common head element
-            return [
-                Sequence(
-                    [
-                        a,
-                        Choice([Sequence(p), Nothing()]).simplify(),
-                    ]
-                )
-            ]
+            return [Sequence([a, Choice([Sequence(p), Nothing()])])]
         case a, Sequence([b, *q]) if a == b:
             # Common head element
-            return [
-                Sequence(
-                    [
-                        a,
-                        Choice([Nothing(), Sequence(q)]).simplify(),
-                    ]
-                )
-            ]
+            return [Sequence([a, Choice([Nothing(), Sequence(q)])])]
         case a, Sequence([Gather(b, _), Optional()]) as x if a == b:
             # First arm is redundant
             # XXX This can reorder the choices
@@ -177,99 +169,96 @@ def simplify_adjacent_choices(*choices):
 
 
 class Sequence(Container):
+    __slots__ = ()
+
     def as_railroad(self):
         return railroad.Sequence(*(n.as_railroad() for n in self))
 
-    def simplify(self):
-        new_items = []
+    def _normalize(self):
+        items = []
         for item in self:
+            item = item.simplify()
             match item:
                 case Nothing():
                     pass
                 case Sequence():
-                    new_items.extend(item)
+                    items.extend(item)
                 case _:
-                    if new_items:
-                        adj = simplify_adjacent_items(new_items[-1], item)
-                        if adj:
-                            new_items[-1:] = adj
-                            continue
-                    new_items.append(item.simplify())
-        if new_items != self.items:
-            return Sequence(new_items).simplify()
-        return super().simplify()
+                    items.append(item)
+        if len(items) == 0:
+            return Nothing()
+        if len(items) == 1:
+            return items[0]
+        return Sequence(items)
 
     def __str__(self):
         return "(" + " ".join(str(x) for x in self) + ")"
 
 
-def simplify_adjacent_items(*items):
-    pass
-
-
-@dataclasses.dataclass
 class Decorated(Data):
-    child: object
-
-    def simplify(self):
-        match self.child:
-            case Nothing():
-                return self.child
-        new = self.child.simplify()
-        if new != self.child:
-            return type(self)(new)
-        return super().simplify()
+    __slots__ = ("child",)
+    __match_args__ = ("child",)
 
 
 class Optional(Decorated):
+    __slots__ = ()
+
     def as_railroad(self):
         return railroad.Optional(self.child.as_railroad())
 
-    def simplify(self):
-        match self.child:
-            case Optional():
-                return self.child
-        return super().simplify()
+    def _normalize(self):
+        child = self.child.simplify()
+        match child:
+            case Nothing() | Optional():
+                return child
+        return Optional(child)
 
     def __str__(self):
         return f"{self.child}?"
 
 
 class Repeated(Decorated):
+    __slots__ = ()
+
     def as_railroad(self):
         return railroad.OneOrMore(self.child.as_railroad())
 
-    def simplify(self):
-        match self.child:
-            case Optional():
-                return Optional(Repeated(self.child))
-            case Repeated():
-                return self.child
-        return super().simplify()
+    def _normalize(self):
+        child = self.child.simplify()
+        match child:
+            case Optional(inner):
+                return Optional(Repeated(inner)).simplify()
+            case Nothing() | Repeated():
+                return child
+        return Repeated(child)
 
     def __str__(self):
         return f"{self.child}+"
 
 
-@dataclasses.dataclass
 class Leaf(Data):
-    value: str
+    __slots__ = ("value",)
+    __match_args__ = ("value",)
 
 
 class Nonterminal(Leaf):
+    __slots__ = ()
+
     def as_railroad(self):
         return railroad.NonTerminal(self.value)
 
     def __str__(self):
         return self.value
 
-    def simplify(self):
+    def _normalize(self):
         if self.value == "TYPE_COMMENT":
             return Nothing()
-        return super().simplify()
+        return self
 
 
 class Terminal(Leaf):
+    __slots__ = ()
+
     def as_railroad(self):
         return railroad.Terminal(self.value)
 
@@ -277,10 +266,9 @@ class Terminal(Leaf):
         return self.value
 
 
-@dataclasses.dataclass
 class Gather(Data):
-    item: object
-    separator: object
+    __slots__ = ("item", "separator")
+    __match_args__ = ("item", "separator")
 
     def as_railroad(self):
         return railroad.OneOrMore(self.item.as_railroad(), self.separator.as_railroad())
@@ -288,20 +276,17 @@ class Gather(Data):
     def __str__(self):
         return f"{self.separator}.{self.item}"
 
-    def simplify(self):
+    def _normalize(self):
         new_item = self.item.simplify()
         new_separator = self.separator.simplify()
         match new_item, new_separator:
             case Nothing(), Nothing():
                 return Nothing()
             case _, Nothing():
-                return Repeated(new_item)
+                return Repeated(new_item).simplify()
             case Nothing(), _:
-                return Optional(Repeated(new_separator))
-            case _:
-                if new_item != self.item or new_separator != self.separator:
-                    return Gather(new_item, new_separator)
-        return self
+                return Optional(Repeated(new_separator)).simplify()
+        return Gather(new_item, new_separator)
 
 
 def make_choice(nodes):
@@ -369,9 +354,8 @@ def generate_html(grammar):
             print("-", repr(node))
             rule = convert_node(node)
             print("Got", rule)
-            while (new := rule.simplify()) != rule:
-                print("Simplified to", repr(new))
-                rule = new
+            rule = rule.simplify()
+            print("Simplified to", repr(rule))
             if not isinstance(rule, Nothing):
                 railroad.Diagram(rule.as_railroad()).writeSvg(file.write)
             # if name == 'import_from':
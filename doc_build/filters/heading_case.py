@@ -4,15 +4,18 @@ ISO/IEC Directives, Part 2, 11.4: clause titles shall be in sentence case
 (only the first word and proper nouns capitalised).
 
 This module provides:
-- Proper-noun detection via heuristics and an optional YAML allowlist.
+- Proper-noun detection via heuristics and an optional YAML allowlist,
+  which may also list nouns of several words.
 - A function to convert heading inline elements to sentence case.
 - A function to check whether a heading is already in sentence case.
 """
 
-import copy
+import functools
+import os
 import re
+import threading
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 from pandocfilters import stringify
 
@@ -36,6 +39,16 @@ _MIXED_CASE_RE = re.compile(
 # Fully uppercase with optional underscores/digits (USD, AOUSD, API, UTF-8).
 _ALL_CAPS_RE = re.compile(r'^[A-Z][A-Z0-9_-]+$')
 
+# Letters and digits in one word (UTF-8, H264).
+_LETTER_RE = re.compile(r'[A-Za-z]')
+_DIGIT_RE = re.compile(r'\d')
+
+# Punctuation stripped from a word before it is classified.
+_PUNCTUATION = ".,;:!?()[]{}\"'`"
+
+# Key marking the end of a noun in the ProperNouns token trie.
+_END = ""
+
 # Common technical acronyms that should always stay uppercase.
 BUILTIN_ACRONYMS = frozenset({
     "API", "APIs", "ASCII", "AOUSD", "CPU", "CSS", "DPI", "GPU", "GFM",
@@ -47,21 +60,99 @@ BUILTIN_ACRONYMS = frozenset({
 })
 
 
-def load_proper_nouns(yaml_path: Optional[Path] = None) -> Set[str]:
+class ProperNouns(frozenset):
+    """The proper nouns of a YAML allowlist, compiled for matching.
+
+    The set holds the single-word nouns, so it can be used wherever a set
+    of extra nouns is expected.  Nouns of several words (``Universal
+    Scene Description``) are kept in a trie of their tokens instead; see
+    phrase_words().  Instances are immutable, so one can be shared by all
+    threads, and they pickle for worker processes.
+    """
+
+    def __new__(cls, nouns: Iterable[str] = ()):
+        single = set()
+        phrases: dict = {}
+        for noun in nouns:
+            tokens = str(noun).split()
+            if len(tokens) == 1:
+                single.add(tokens[0])
+            elif tokens:
+                node = phrases
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node[_END] = True
+        self = super().__new__(cls, single)
+        self.phrases = phrases
+        return self
+
+    def phrase_words(self, words: Sequence[Optional[str]]) -> Set[int]:
+        """Return the indexes of *words* that belong to a multi-word noun.
+
+        A noun matches a run of consecutive *words* (punctuation around
+        them is ignored); None stands for something no noun spans, such
+        as a code span.
+        """
+        covered: Set[int] = set()
+        if not self.phrases:
+            return covered
+        for start in range(len(words)):
+            node, end = self.phrases, None
+            for index in range(start, len(words)):
+                if words[index] is None:
+                    break
+                node = node.get(words[index].strip(_PUNCTUATION))
+                if node is None:
+                    break
+                if _END in node:
+                    end = index + 1
+            if end is not None:
+                covered.update(range(start, end))
+        return covered
+
+
+# ProperNouns loaded by load_proper_nouns, keyed by file and its state.
+_loaded_nouns: Dict[Tuple[str, int, int], ProperNouns] = {}
+_loaded_nouns_lock = threading.Lock()
+
+
+def load_proper_nouns(yaml_path: Optional[Path] = None) -> ProperNouns:
     """Load proper nouns from a YAML allowlist file.
 
     The YAML file is expected to have a top-level list under the key
     ``proper_nouns``.  Returns an empty set if the file does not exist
-    or yaml is unavailable.
+    or yaml is unavailable.  A file is only read again once it changes.
     """
     if yaml_path is None or yaml is None:
-        return set()
+        return ProperNouns()
     try:
-        with open(yaml_path, encoding='utf-8') as fh:
-            data = yaml.safe_load(fh) or {}
-        return set(data.get('proper_nouns', []))
+        st = os.stat(yaml_path)
+        key = (os.path.abspath(yaml_path), st.st_mtime_ns, st.st_size)
+        with _loaded_nouns_lock:
+            nouns = _loaded_nouns.get(key)
+        if nouns is None:
+            with open(yaml_path, encoding='utf-8') as fh:
+                data = yaml.safe_load(fh) or {}
+            nouns = ProperNouns(data.get('proper_nouns', []))
+            with _loaded_nouns_lock:
+                _loaded_nouns[key] = nouns
+        return nouns
     except (FileNotFoundError, OSError):
-        return set()
+        return ProperNouns()
+
+
+@functools.lru_cache(maxsize=8192)
+def _looks_like_proper_noun(stripped: str) -> bool:
+    """The built-in rules of is_proper_noun, which need no allowlist."""
+    if stripped in BUILTIN_ACRONYMS:
+        return True
+    if _ALL_CAPS_RE.match(stripped) and len(stripped) >= 2:
+        return True
+    if _MIXED_CASE_RE.match(stripped):
+        return True
+    if _LETTER_RE.search(stripped) and _DIGIT_RE.search(stripped):
+        return True
+    return False
 
 
 def is_proper_noun(word: str, extra_nouns: Set[str] = frozenset()) -> bool:
@@ -73,34 +164,75 @@ def is_proper_noun(word: str, extra_nouns: Set[str] = frozenset()) -> bool:
     - It matches the mixed-case heuristic (camelCase / PascalCase).
     - It is fully uppercase with length >= 2.
     - It contains digits mixed with letters (e.g. "UTF-8", "H264").
+
+    Words of multi-word nouns are only known in context; see
+    ProperNouns.phrase_words().
     """
-    stripped = word.strip(".,;:!?()[]{}\"'`")
+    stripped = word.strip(_PUNCTUATION)
     if not stripped:
         return False
-    if stripped in extra_nouns:
-        return True
-    if stripped in BUILTIN_ACRONYMS:
-        return True
-    if _ALL_CAPS_RE.match(stripped) and len(stripped) >= 2:
-        return True
-    if _MIXED_CASE_RE.match(stripped):
-        return True
-    if re.search(r'[A-Za-z]', stripped) and re.search(r'\d', stripped):
-        return True
-    return False
+    return stripped in extra_nouns or _looks_like_proper_noun(stripped)
+
+
+def phrase_words(words: Sequence[Optional[str]], extra_nouns: Set[str]) -> Set[int]:
+    """Return the indexes of *words* in multi-word nouns of *extra_nouns*.
+
+    Only a ProperNouns has multi-word nouns; for any other set this is empty.
+    """
+    if isinstance(extra_nouns, ProperNouns):
+        return extra_nouns.phrase_words(words)
+    return set()
 
 
 # ---------------------------------------------------------------------------
 # Sentence-case conversion for Pandoc inlines
 # ---------------------------------------------------------------------------
 
+_CONTAINER_TYPES = ('Emph', 'Strong', 'Strikeout', 'Superscript', 'Subscript', 'SmallCaps')
+
+
+def _inline_words(inlines: list) -> List[Optional[str]]:
+    """Internal: the words _sentence_case_track visits, in order (None for code and math)."""
+    words: List[Optional[str]] = []
+    for node in inlines:
+        if not isinstance(node, dict):
+            continue
+        t = node.get('t')
+        if t == 'Str':
+            words.extend(word for word in node['c'].split(' ') if word)
+        elif t in ('Code', 'Math', 'RawInline'):
+            words.append(None)
+        elif t in ('Span', 'Quoted'):
+            words.extend(_inline_words(node['c'][1]))
+        elif t in _CONTAINER_TYPES:
+            words.extend(_inline_words(node['c'] if isinstance(node['c'], list) else [node['c']]))
+    return words
+
+
+def _copy_json(value):
+    """Internal: copy a Pandoc JSON value, far cheaper than copy.deepcopy."""
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+    return value
+
+
 def _sentence_case_track(
     inlines: list,
     extra_nouns: Set[str],
     first_word_seen: bool,
+    kept: Set[int] = frozenset(),
+    counter: Optional[List[int]] = None,
 ) -> tuple:
-    """Internal: convert inlines to sentence case, returning (new_inlines, first_word_seen)."""
-    result = copy.deepcopy(inlines)
+    """Internal: convert inlines to sentence case, returning (new_inlines, first_word_seen).
+
+    *kept* holds the positions, in _inline_words() order, of words in
+    multi-word proper nouns; *counter* tracks the position across calls.
+    """
+    if counter is None:
+        counter = [0]
+    result = _copy_json(inlines)
 
     for node in result:
         if not isinstance(node, dict):
@@ -114,11 +246,13 @@ def _sentence_case_track(
                 if not word:
                     new_words.append(word)
                     continue
+                position = counter[0]
+                counter[0] += 1
                 has_alpha = any(c.isalpha() for c in word)
                 if not first_word_seen and has_alpha:
                     first_word_seen = True
                     new_words.append(word)
-                elif is_proper_noun(word, extra_nouns):
+                elif position in kept or is_proper_noun(word, extra_nouns):
                     new_words.append(word)
                 elif has_alpha:
                     new_words.append(word.lower())
@@ -127,23 +261,23 @@ def _sentence_case_track(
             node['c'] = ' '.join(new_words)
         elif t in ('Code', 'Math', 'RawInline'):
             first_word_seen = True
+            counter[0] += 1
         elif t == 'Space':
             pass
         elif t == 'Span':
             # Span: node['c'] = [attr, inlines_list]
             children = node['c'][1]
             node['c'][1], first_word_seen = _sentence_case_track(
-                children, extra_nouns, first_word_seen,
+                children, extra_nouns, first_word_seen, kept, counter,
             )
-        elif t in ('Emph', 'Strong', 'Strikeout', 'Superscript',
-                    'Subscript', 'SmallCaps'):
+        elif t in _CONTAINER_TYPES:
             children = node['c'] if isinstance(node['c'], list) else [node['c']]
             node['c'], first_word_seen = _sentence_case_track(
-                children, extra_nouns, first_word_seen,
+                children, extra_nouns, first_word_seen, kept, counter,
             )
         elif t == 'Quoted':
             node['c'][1], first_word_seen = _sentence_case_track(
-                node['c'][1], extra_nouns, first_word_seen,
+                node['c'][1], extra_nouns, first_word_seen, kept, counter,
             )
 
     return result, first_word_seen
@@ -161,7 +295,8 @@ def sentence_case_inlines(
     The first alphabetic word in the heading is always capitalised.
     Subsequent words are lowercased unless they are proper nouns.
     """
-    result, _ = _sentence_case_track(inlines, extra_nouns, False)
+    kept = phrase_words(_inline_words(inlines), extra_nouns)
+    result, _ = _sentence_case_track(inlines, extra_nouns, False, kept)
     return result
 
 
@@ -188,9 +323,10 @@ def heading_needs_conversion(
     if len(words) <= 1:
         return False
 
-    for word in words[1:]:
-        stripped = word.strip(".,;:!?()[]{}\"'`")
-        if not stripped or not stripped[0].isalpha():
+    kept = phrase_words(words, extra_nouns)
+    for index, word in enumerate(words[1:], 1):
+        stripped = word.strip(_PUNCTUATION)
+        if not stripped or not stripped[0].isalpha() or index in kept:
             continue
         if stripped[0].isupper() and not is_proper_noun(word, extra_nouns):
             return True
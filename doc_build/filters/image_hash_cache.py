@@ -0,0 +1,304 @@
+"""Persistent SHA-256 cache for image files, and image bundling built on it.
+
+Hashing every image on every build is wasteful: most images do not change
+between builds.  ImageHashCache remembers the digest of each file together
+with its (size, mtime_ns, inode) stat signature and only re-reads files whose
+signature changed.  The index is a small JSON file, written atomically, so it
+can be shared by the filters (inject_image_hash, bundle_images) and the
+builder (DocBuilder._copy_diff_images), which all run as separate processes.
+
+ImageBundler places images into a bundle directory (Markdown output, diff
+artifacts) using those digests: destinations that already hold the same
+content are left alone, identical content is stored once and hard-linked
+under its other names, and the remaining copies run on a thread pool.
+Bundled files may be hard links to their sources, so those sources must
+only ever be replaced, never rewritten in place (copy_replacing).
+
+Like shared_filter_utils, this module imports nothing from its siblings so it
+can be loaded both by the filters and as ``doc_build.filters.image_hash_cache``.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Files at least this large are hashed through an mmap of the whole file
+# rather than chunked reads.
+MMAP_THRESHOLD = 1 << 20
+
+# ioctl request for a copy-on-write clone of a whole file (linux/fs.h).
+FICLONE = 0x40049409
+
+
+def sha256_file(path) -> str:
+    """Return the hex-encoded SHA-256 digest of the file at *path*."""
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.sha256(mm).hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: fh.read(65536), b""):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+class ImageHashCache:
+    """Content hashes of files, keyed by (path, size, mtime_ns, inode).
+
+    *index_path* is the JSON file backing the cache.  When it is None the
+    cache lives in memory only.  Call save() (or use the instance as a
+    context manager) to persist new entries.  Several processes (the
+    filters of concurrent renders) may share one index: save() merges the
+    entries this process hashed into the index as it is on disk, under a
+    file lock, so no process drops what another one saved.
+    """
+
+    def __init__(self, index_path=None):
+        self.index_path = Path(index_path) if index_path else None
+        # abs path -> [size, mtime_ns, inode, digest]
+        self._entries: dict[str, list] = {}
+        # Keys hashed by this process since the last save().
+        self._updated: set[str] = set()
+        self._lock = threading.Lock()
+        if self.index_path is not None:
+            self._entries = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            # A missing, corrupt or unreadable index only costs a rehash.
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+    def sha256(self, path) -> str:
+        """Return the SHA-256 of *path*, rehashing only if the file changed."""
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        signature = [st.st_size, st.st_mtime_ns, st.st_ino]
+        entry = self._entries.get(key)
+        if entry is not None and entry[:3] == signature:
+            return entry[3]
+        digest = sha256_file(key)
+        with self._lock:
+            self._entries[key] = signature + [digest]
+            self._updated.add(key)
+        return digest
+
+    def hash_many(self, paths, workers=None) -> dict:
+        """Hash *paths* concurrently and return ``{path: digest}``.
+
+        hashlib releases the GIL while digesting, so a thread pool hashes
+        several large files in parallel.
+        """
+        unique = list(dict.fromkeys(Path(p) for p in paths))
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(unique, pool.map(self.sha256, unique)))
+
+    def same_content(self, a, b) -> bool:
+        """True if the files at *a* and *b* have identical content."""
+        if os.path.abspath(a) == os.path.abspath(b):
+            return True
+        if os.path.getsize(a) != os.path.getsize(b):
+            return False
+        return self.sha256(a) == self.sha256(b)
+
+    def save(self) -> None:
+        """Merge the entries added or refreshed here into the index, atomically.
+
+        The index is read again under an exclusive lock on
+        ``<index>.lock`` and this process's entries are written over it, so
+        entries saved meanwhile by other processes are kept.
+        """
+        with self._lock:
+            updated = {key: self._entries[key] for key in self._updated}
+        if self.index_path is None or not updated:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path.with_name(self.index_path.name + ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            entries = self._load()
+            entries.update(updated)
+            fd, tmp = tempfile.mkstemp(dir=self.index_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(entries, f)
+                os.replace(tmp, self.index_path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        with self._lock:
+            # Entries hashed here while the index was written stay pending.
+            pending = {key for key in self._updated if self._entries[key] is not updated.get(key)}
+            for key in pending:
+                entries[key] = self._entries[key]
+            self._entries = entries
+            self._updated = pending
+
+
+def _temp_name(dest: Path) -> Path:
+    return dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _reflink(src, dest) -> None:
+    """Clone *src* into *dest* sharing its data blocks (btrfs, XFS, ...)."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise OSError("reflink is not supported on this platform")
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+        fcntl.ioctl(fdest.fileno(), FICLONE, fsrc.fileno())
+    shutil.copystat(src, dest)
+
+
+def link_or_copy(src, dest) -> None:
+    """Place the content of *src* at *dest* as cheaply as the filesystem allows.
+
+    Tries a reflink, then a hard link, then falls back to shutil.copy2.  The
+    file is created under a temporary name and renamed over *dest*, so an
+    existing *dest* is replaced atomically and never written through (which
+    would alter any file it is hard-linked to).
+    """
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_name(dest)
+    try:
+        try:
+            _reflink(src, tmp)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            try:
+                os.link(src, tmp)
+            except OSError:
+                shutil.copy2(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def copy_replacing(src, dest):
+    """Copy *src* to *dest* like shutil.copy2, replacing *dest* rather than writing through it.
+
+    A copy_function for shutil.copytree into a tree whose files may be
+    hard-linked from a bundle (link_or_copy, ImageBundler): copying over
+    such a file in place would change the bundle's file too.
+    """
+    dest = Path(dest)
+    tmp = _temp_name(dest)
+    try:
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return str(dest)
+
+
+def _hard_link(target: Path, dest: Path) -> None:
+    """Atomically replace *dest* with a hard link to *target*."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_name(dest)
+    try:
+        os.link(target, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class ImageBundler:
+    """Place image files into a bundle, de-duplicated and in parallel.
+
+    add() queues a copy of *src* to *dest* and returns immediately; close()
+    waits for all queued copies and re-raises the first failure.  A copy is
+    skipped when *dest* already has the content of *src*.  The first
+    destination seen for a given digest receives the data (link_or_copy);
+    later destinations with the same digest are hard links to it.
+    """
+
+    def __init__(self, cache: ImageHashCache, workers=None):
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._futures = []
+        # digest -> (first destination, event set once it is in place)
+        self._stored: dict[str, tuple[Path, threading.Event]] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def add(self, src, dest) -> None:
+        """Queue placing the content of *src* at *dest*."""
+        self._futures.append(self._pool.submit(self._place, Path(src), Path(dest)))
+
+    def close(self) -> None:
+        """Wait for all queued copies; raise the first error encountered."""
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._futures = []
+
+    def _has_digest(self, path: Path, digest: str) -> bool:
+        return path.exists() and self.cache.sha256(path) == digest
+
+    def _place(self, src: Path, dest: Path) -> None:
+        digest = self.cache.sha256(src)
+        with self._lock:
+            stored = self._stored.get(digest)
+            is_first = stored is None
+            if is_first:
+                stored = self._stored[digest] = (dest, threading.Event())
+        first, placed = stored
+
+        if is_first:
+            try:
+                if not self._has_digest(dest, digest):
+                    link_or_copy(src, dest)
+            finally:
+                placed.set()
+            return
+
+        # Same content as an earlier destination: link to the stored copy
+        # once it exists.  That task was dequeued before this one, so it is
+        # already running and waiting on it cannot starve the pool.
+        placed.wait()
+        if dest == first or self._has_digest(dest, digest):
+            return
+        if self._has_digest(first, digest):
+            try:
+                _hard_link(first, dest)
+                return
+            except OSError:
+                pass
+        link_or_copy(src, dest)
+
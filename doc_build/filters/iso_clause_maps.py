@@ -0,0 +1,261 @@
+"""ISO clause-number maps shared by the builder and filter_iso_xrefs.
+
+The builder computes the maps once per build with build_clause_maps() and
+serialises them to a small JSON artifact; filter_iso_xrefs loads that
+artifact through metadata instead of re-parsing the specification in every
+render.
+
+Clause numbering is driven by iso_clause_map.yaml (an exceptions list):
+sections absent from the map are auto-numbered sequentially; sections listed
+as null are left unnumbered; sections listed as {annex: "A"} become annexes.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from urllib.parse import urlparse
+
+
+def _derive_section_key(url_path):
+    """Extract the section key from a relative URL path.
+
+    Returns the folder name (for README.md-based sections) or the lowercased
+    file stem (for flat .md files), or None if the path is unrecognisable.
+
+    Uses PurePosixPath because link targets are always POSIX-style paths
+    regardless of the host OS.  urlparse strips any #fragment before handing
+    the path component to PurePosixPath.
+
+    Examples:
+      ../path_grammar/README.md           -> 'path_grammar'
+      ../foundational_data_types/README.md#anchor -> 'foundational_data_types'
+      Foreword.md                         -> 'foreword'
+      glossary/README.md                  -> 'glossary'
+    """
+    path = PurePosixPath(urlparse(url_path).path)  # strip #fragment; keep path component only
+
+    if path.suffix.lower() != '.md':               # ignore non-Markdown links (images, URLs…)
+        return None
+
+    if path.name.lower() == 'readme.md':           # folder-based section: key is the directory name
+        parent = path.parent.name                  # e.g. '../path_grammar/README.md' -> 'path_grammar'
+        return parent.lower() if parent not in ('', '.', '..') else None  # guard against bare README.md at root
+
+    return path.stem.lower() or None               # flat file: key is the filename without extension
+
+
+def _links_from_ast(node):
+    """Yield Link URLs in document order from a Pandoc AST fragment.
+
+    Recursively walks dicts and lists; stops descending into a Link node once
+    its URL has been yielded (avoids double-counting if link text is itself a
+    link, which is unusual but valid Markdown).
+    """
+    if isinstance(node, dict):
+        if node.get('t') == 'Link':
+            yield node['c'][2][0]
+            return
+        yield from _links_from_ast(node.get('c'))
+    elif isinstance(node, list):
+        for item in node:
+            yield from _links_from_ast(item)
+
+
+@dataclass
+class TopSection:
+    """State for the level-1 heading currently being processed in build_clause_maps.
+
+    Recreated each time a new level-1 heading is encountered; subcounters are
+    mutated in-place as subclause headings accumulate beneath it.
+    """
+    key: str | None                             # section key from the source file path
+    clause: str | None                          # clause number string, or None if unnumbered
+    is_annex: bool = False                      # True when clause is an annex letter (A, B, …)
+    subcounters: list = field(                  # per-level subclause counters; index 0 unused
+        default_factory=lambda: [0] * 7
+    )
+
+
+@dataclass
+class ClauseMaps:
+    """Section-number maps consumed by filter_iso_xrefs.
+
+    anchor_info     dict: anchor -> (number_str, level, is_annex)
+    root_anchors    dict: section_key -> root anchor (numbered sections only)
+    anchor_section  dict: anchor -> section_key it belongs to
+    """
+    anchor_info: dict = field(default_factory=dict)
+    root_anchors: dict = field(default_factory=dict)
+    anchor_section: dict = field(default_factory=dict)
+
+    def dump(self, path, key=None):
+        """Write the maps to *path* as JSON, tagged with the cache *key*."""
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump({
+                'key': key,
+                'anchor_info': self.anchor_info,
+                'root_anchors': self.root_anchors,
+                'anchor_section': self.anchor_section,
+            }, fh, indent=2)
+
+    @classmethod
+    def load(cls, path, key=None):
+        """Read maps written by dump().
+
+        If *key* is given and does not match the stored key, returns None so
+        the caller can rebuild.
+        """
+        with open(path, encoding='utf-8') as fh:
+            data = json.load(fh)
+        if key is not None and data.get('key') != key:
+            return None
+        return cls(
+            anchor_info={a: tuple(info) for a, info in data['anchor_info'].items()},
+            root_anchors=data['root_anchors'],
+            anchor_section=data['anchor_section'],
+        )
+
+
+def build_clause_maps(clause_map, readme_blocks, combined_blocks):
+    """Build the section-number maps from the README and combined spec ASTs.
+
+    *clause_map* is the parsed iso_clause_map.yaml exceptions list.
+    *readme_blocks* and *combined_blocks* are the ``blocks`` of the Pandoc
+    JSON ASTs of README.md and combined_spec.md.
+
+    Anchor IDs are taken directly from Pandoc's JSON AST — the first element
+    of each Header node's Attr — so they are guaranteed to match the IDs
+    Pandoc assigns in the rendered output, including deduplication.
+    """
+    maps = ClauseMaps()
+
+    # ---- Determine the ordered list of spec sections ----
+    # README.md contains one link per spec section in document order.
+    # Walking all its Link nodes gives the sequence of section keys
+    # (e.g. ['foreword', 'glossary', 'path_grammar', ...]).
+    # This list is later used to associate each level-1 heading in
+    # combined_spec.md with the section file it came from, which in turn
+    # determines which clause-map entry (if any) applies to it.
+    # Note: this relies on the assumption that each source file contributes
+    # exactly one level-1 heading to the combined document.
+    section_order = [
+        k for k in (
+            _derive_section_key(url)
+            for url in _links_from_ast(readme_blocks)
+        )
+        if k is not None
+    ]
+
+    # Build a lookup for sections that are null in the YAML but absent from
+    # section_order — i.e., injected into combined_spec.md by the build script
+    # (e.g. copyright notices) outside the README.md link flow.  Their anchors
+    # are derived by Pandoc from the heading text: hyphens where the section key
+    # has underscores, but otherwise the same words.  Storing the mapping as
+    # anchor → section_key lets us detect them cheaply during the heading walk
+    # without consuming a section_order slot.
+    section_order_set = set(section_order)
+    anchor_to_extra = {
+        key.replace('_', '-'): key          # e.g. 'copyright_license_...' → 'copyright-license-...'
+        for key, val in clause_map.items()
+        if val is None and key not in section_order_set  # null YAML entry not reachable from README.md
+    }
+
+    # ---- Walk the combined spec ----
+    # combined_spec.md is the flat concatenation of all source files produced
+    # by flatten().  Pandoc parses it as a single document, which means anchor
+    # IDs are deduplicated globally (e.g. two sections both titled "References"
+    # get anchors "references" and "references-1").  Those final IDs are what
+    # the rendered HTML/PDF uses, so we must read them from Pandoc rather than
+    # computing them ourselves.
+    current_section: TopSection | None = None  # state for the active level-1 heading
+    section_idx = 0             # position in section_order; advances on each level-1 heading
+    auto_clause_counter = 0     # increments for each level-1 heading not listed in clause_map
+
+    for block in combined_blocks:
+        if block['t'] != 'Header':
+            continue
+
+        level = block['c'][0]
+        # Pandoc's Attr is [id, classes, kv-pairs]; the id field is the
+        # auto-generated, globally-deduplicated anchor for this heading.
+        anchor = block['c'][1][0]
+
+        if level == 1:
+            # ---- Level-1 heading: start of a new top-level section ----
+
+            # Check first whether this heading was injected by the build script
+            # outside the README.md link flow (e.g. copyright notices).  These
+            # sections are in the YAML as null but have no entry in section_order,
+            # so they must not consume a section_order slot.
+            if anchor in anchor_to_extra:
+                current_section = TopSection(key=anchor_to_extra[anchor], clause=None)
+                continue  # do not advance section_idx
+
+            # Map this heading to its source file by consuming the next entry
+            # in section_order.  If section_order is exhausted (e.g. a partial
+            # build with --only), section_key is None and the heading is treated
+            # as auto-numbered with no clause-map lookup.
+            section_key = section_order[section_idx] if section_idx < len(section_order) else None
+            section_idx += 1
+
+            if section_key is not None and section_key in clause_map:
+                val = clause_map[section_key]
+                if val is None:
+                    # Explicitly suppressed (Foreword, Introduction, etc.).
+                    # No entry is added to anchor_info or root_anchors, so
+                    # links to this section are left for filter_resolve_sections.
+                    current_section = TopSection(key=section_key, clause=None)
+                elif isinstance(val, dict) and 'annex' in val:
+                    # Annex: numbered independently with a letter (A, B, …).
+                    # Subclauses will be A.1, A.1.1, etc.
+                    current_section = TopSection(key=section_key, clause=str(val['annex']), is_annex=True)
+                    maps.root_anchors[current_section.key] = anchor
+                    maps.anchor_info[anchor] = (current_section.clause, 1, current_section.is_annex)
+                    maps.anchor_section[anchor] = current_section.key
+                else:
+                    # Explicit clause number override supplied directly in YAML.
+                    current_section = TopSection(key=section_key, clause=str(val))
+                    maps.root_anchors[current_section.key] = anchor
+                    maps.anchor_info[anchor] = (current_section.clause, 1, current_section.is_annex)
+                    maps.anchor_section[anchor] = current_section.key
+            else:
+                # Section absent from clause_map: assign the next sequential
+                # clause number.  The counter is shared across all auto-numbered
+                # sections so that explicitly-numbered sections (YAML overrides)
+                # do not consume a slot in the sequence.
+                auto_clause_counter += 1
+                current_section = TopSection(key=section_key, clause=str(auto_clause_counter))
+                if current_section.key is not None:
+                    maps.root_anchors[current_section.key] = anchor
+                maps.anchor_info[anchor] = (current_section.clause, 1, current_section.is_annex)
+                if current_section.key is not None:
+                    maps.anchor_section[anchor] = current_section.key
+
+        else:  # level >= 2
+            # ---- Subclause heading ----
+
+            if current_section is None or current_section.clause is None:
+                # Outside any numbered section — either before the first heading
+                # or inside an unnumbered section (null in clause_map); skip so
+                # these anchors are left for filter_resolve_sections.
+                continue
+
+            # Increment the counter for this level and reset all deeper levels,
+            # mirroring the standard hierarchical numbering convention:
+            # e.g. entering a new level-3 heading resets level-4, 5, 6.
+            current_section.subcounters[level] += 1
+            for d in range(level + 1, 7):
+                current_section.subcounters[d] = 0
+
+            # Build the dotted number string: clause + each active sublevel.
+            # For a level-3 heading inside Clause 7: "7.2.1" where
+            # subcounters[2] and subcounters[3] are the active level-2 and
+            # level-3 counts.
+            number_str = '.'.join(
+                [current_section.clause] + [str(current_section.subcounters[i]) for i in range(2, level + 1)]
+            )
+            maps.anchor_info[anchor] = (number_str, level, current_section.is_annex)
+            if current_section.key is not None:
+                maps.anchor_section[anchor] = current_section.key
+
+    return maps
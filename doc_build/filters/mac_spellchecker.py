@@ -115,6 +115,29 @@ def wrapper(term):
                 )
 
 
+def misspellings(terms):
+    """Return {term: [misspelled words in it]} for each of *terms*.
+
+    Like wrapper(), words whose guesses are only a US/UK spelling of them,
+    and domain names, are not misspellings.
+    """
+    checker = NSSpellChecker.sharedSpellChecker()
+    found = {}
+    for term in terms:
+        words = []
+        start = 0
+        while start < len(term):
+            ok, _count, _range, word = check_spelling(checker, term, start)
+            if ok or _range.location < start:
+                break
+            _, suggestions = guesses(checker, term, _range)
+            if not compare_us_uk_words(word, suggestions) and not is_valid_url(word):
+                words.append(word)
+            start = _range.location + _range.length
+        found[term] = words
+    return found
+
+
 if __name__ == "__main__":
     for line in sys.stdin:
         words = line.split()
@@ -41,6 +41,7 @@ INTERNAL_ALIGNMENT = (
 CHAR_WIDTH = 6.2  # width of each monospace character. play until you find the right value for your font
 COMMENT_CHAR_WIDTH = 7  # comments are in smaller text by default
 ESCAPE_HTML = True  # Should Diagram.writeText() produce HTML-escaped text, or raw?
+INLINE_STYLES = True  # repeat stroke/fill/font attributes on every element? If false, the stylesheet (DEFAULT_STYLE) styles them by class
 
 
 def escapeAttr(val: Union[str, float]) -> str:
@@ -129,28 +130,13 @@ class DiagramItem:
         return self
 
     def writeSvg(self, write: WriterF) -> None:
-        write("<{0}".format(self.name))
-        for name, value in sorted(self.attrs.items()):
-            write(' {0}="{1}"'.format(name, escapeAttr(value)))
-        # EMBEDDING THE STYLE
-        if self.name == "path":
-            write(' stroke="black" stroke-width="2" fill="none"')
-        elif self.name == "rect":
-            if "group-box-" in self.attrs.get("class", ""):
-                if self.attrs.get("class", "") == "group-box-orange":
-                    write(' stroke="rgb(255,165,0)" stroke-width="2" fill="rgba(255, 179, 102, 0.3)"')
-                else:
-                    write(' stroke="rgb(104,255,104)" stroke-width="2" fill="rgba(204,255,204, 0.5)"')
-            else:
-                write(' stroke="black" stroke-width="2" fill="rgb(204,255,204)"')
-        elif self.name == "text":
-            if self.attrs.get("class", "") == "comment":
-                write(' font-family="monospace" font-size="7pt" text-anchor="middle" fill="black"')
-            else:
-                write(' font-family="monospace" font-size="8pt" font-weight="bold" text-anchor="middle" fill="black"')
-        write(">")
-        if self.name in ["g", "svg"]:
-            write("\n")
+        attrs = "".join(
+            ' {0}="{1}"'.format(name, escapeAttr(value))
+            for name, value in sorted(self.attrs.items())
+        )
+        style = inlineStyle(self.name, self.attrs.get("class", "")) if INLINE_STYLES else ""
+        newline = "\n" if self.name in ["g", "svg"] else ""
+        write("<{0}{1}{2}>{3}".format(self.name, attrs, style, newline))
         for child in self.children:
             if isinstance(child, (DiagramItem, Path, Style)):
                 child.writeSvg(write)
@@ -165,6 +151,26 @@ class DiagramItem:
         return f"DiagramItem({self.name}, {self.attrs}, {self.children})"
 
 
+def inlineStyle(name: str, cls: str) -> str:
+    # EMBEDDING THE STYLE
+    if name == "path":
+        return ' stroke="black" stroke-width="2" fill="none"'
+    elif name == "rect":
+        if "group-box-" in cls:
+            if cls == "group-box-orange":
+                return ' stroke="rgb(255,165,0)" stroke-width="2" fill="rgba(255, 179, 102, 0.3)"'
+            else:
+                return ' stroke="rgb(104,255,104)" stroke-width="2" fill="rgba(204,255,204, 0.5)"'
+        else:
+            return ' stroke="black" stroke-width="2" fill="rgb(204,255,204)"'
+    elif name == "text":
+        if cls == "comment":
+            return ' font-family="monospace" font-size="7pt" text-anchor="middle" fill="black"'
+        else:
+            return ' font-family="monospace" font-size="8pt" font-weight="bold" text-anchor="middle" fill="black"'
+    return ""
+
+
 class DiagramMultiContainer(DiagramItem):
     def __init__(
         self,
@@ -284,11 +290,11 @@ class Path:
         return self
 
     def writeSvg(self, write: WriterF) -> None:
-        write("<path")
-        for name, value in sorted(self.attrs.items()):
-            write(f' {name}="{escapeAttr(value)}"')
-        write('  stroke="black" stroke-width="2" fill="none"')
-        write(" />")
+        attrs = "".join(
+            f' {name}="{escapeAttr(value)}"' for name, value in sorted(self.attrs.items())
+        )
+        style = '  stroke="black" stroke-width="2" fill="none"' if INLINE_STYLES else ""
+        write(f"<path{attrs}{style} />")
 
     def format(self) -> Path:
         self.attrs["d"] += "h.5"
@@ -453,7 +459,10 @@ class Diagram(DiagramMultiContainer):
     def writeSvg(self, write: WriterF) -> None:
         if not self.formatted:
             self.format()
-        return DiagramItem.writeSvg(self, write)
+        # Serialise into one buffer and hand it to write() in a single call.
+        parts: List[str] = []
+        DiagramItem.writeSvg(self, parts.append)
+        write("".join(parts))
 
     def writeText(self, write: WriterF) -> None:
         output = self.textDiagram()
@@ -476,10 +485,11 @@ class Diagram(DiagramMultiContainer):
         if css is None:
             css = DEFAULT_STYLE
         Style(css).addTo(self)
-        write('<?xml version="1.0" encoding="ISO-8859-1"?>')
+        parts: List[str] = ['<?xml version="1.0" encoding="ISO-8859-1"?>']
         self.attrs["xmlns"] = "http://www.w3.org/2000/svg"
         self.attrs["xmlns:xlink"] = "http://www.w3.org/1999/xlink"
-        DiagramItem.writeSvg(self, write)
+        DiagramItem.writeSvg(self, parts.append)
+        write("".join(parts))
         self.children.pop()
         del self.attrs["xmlns"]
         del self.attrs["xmlns:xlink"]
@@ -1,7 +1,76 @@
+import hashlib
+import io
+import json
+import re
+import sys
 from pathlib import Path
 
 HASH_ATTR_KEY = "data-image-hash"
 
+# Bump whenever a change to the railroad pipeline (peg_to_peg, gen_svg,
+# railroad, filter_railroad) alters the generated SVGs, so that diagrams
+# cached by earlier builds are regenerated.
+RAILROAD_RENDERER_VERSION = "1"
+
+_SVG_ROOT_RE = re.compile(r"<svg\b[^>]*>")
+_SVG_SIZE_ATTR_RE = re.compile(r'\s(width|height)="([^"]*)"')
+
+
+def get_section_anchor(lines) -> str | None:
+    """Return the ``#anchor`` link target for a section file's first heading.
+
+    *lines* is an iterable of the file's lines.  The anchor is derived from
+    the first line starting with ``#`` by lowercasing its alphanumeric words
+    and joining them with hyphens.  Returns None if the file has no heading.
+    """
+    for line in lines:
+        line = line.strip()
+        if line.startswith("#"):
+            name = "-".join([t.lower() for t in line.split() if t.isalnum()])
+            return f"#{name}"
+    return None
+
+
+def get_railroad_peg(code: str) -> str:
+    """Return the PEG text of a ``peg`` code block as the railroad filter parses it.
+
+    Lines are joined without a separator (a rule may be wrapped across lines)
+    and surrounding whitespace is dropped.
+    """
+    return "".join(code.split("\n")).strip()
+
+
+def get_railroad_key(code: str, css_classes: bool = False) -> str:
+    """Return the cache key of the railroad diagram for a ``peg`` code block.
+
+    The key is a hash of the normalised PEG text, RAILROAD_RENDERER_VERSION
+    and the styling mode, so it is stable when blocks move and changes only
+    with the rule itself or the renderer.
+    """
+    version = f"{RAILROAD_RENDERER_VERSION}-css" if css_classes else RAILROAD_RENDERER_VERSION
+    text = f"{version}\n{get_railroad_peg(code)}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:20]
+
+
+def read_svg_size(path) -> tuple[float, float]:
+    """Return the (width, height) attributes of the root element of an SVG file."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        head = f.read(4096)
+    root = _SVG_ROOT_RE.search(head)
+    if root is None:
+        raise ValueError(f"No <svg> element found in {path}")
+    attrs = dict(_SVG_SIZE_ATTR_RE.findall(root.group(0)))
+    return float(attrs["width"]), float(attrs["height"])
+
+
+def railroad_pixels_to_points(pixels, dpi=96*1.2):
+    """Convert a railroad SVG size to the points its image is typeset at.
+
+    The 96 here and the 72 below are there for scaling; the extra 1.2
+    shrinks diagrams to fit better with the fonts.
+    """
+    return pixels * (72 / dpi)
+
 
 def get_image_rel(src_abs: Path, images_root: Path) -> Path:
     """Compute destination relative path under images/, stripping 'images' components.
@@ -20,11 +89,15 @@ def get_image_rel(src_abs: Path, images_root: Path) -> Path:
     return Path(*parts)
 
 
-def get_metadata_str(metadata: dict, key: str) -> str:
+_REQUIRED = object()
+
+
+def get_metadata_str(metadata: dict, key: str, default=_REQUIRED) -> str:
     """Extract a string value from pandoc filter metadata.
 
     Handles both MetaString (produced by -M on the command line) and
-    MetaInlines (produced by --metadata-file YAML).
+    MetaInlines (produced by --metadata-file YAML).  A missing or
+    malformed key raises KeyError, or returns *default* if one is given.
     """
     try:
         entry = metadata[key]
@@ -32,4 +105,21 @@ def get_metadata_str(metadata: dict, key: str) -> str:
             return entry["c"]
         return entry["c"][0]["c"]
     except (KeyError, IndexError, TypeError) as e:
+        if default is not _REQUIRED:
+            return default
         raise KeyError(f"Missing or malformed metadata key {key!r}: {e}") from e
+
+
+def run_document_filter(process) -> None:
+    """Run a pandoc JSON filter that works on the whole document at once.
+
+    pandocfilters.toJSONFilter calls its action node by node; *process* is
+    instead called once, as ``process(doc, format, meta)``, with the
+    document read from stdin, and the document it returns is written to
+    stdout.  Filters that gather work from the whole document first (images
+    to convert or hash, diagrams to render) are built on it.
+    """
+    doc = json.loads(io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8").read())
+    fmt = sys.argv[1] if len(sys.argv) > 1 else ""
+    doc = process(doc, fmt, doc.get("meta", {}))
+    sys.stdout.write(json.dumps(doc))
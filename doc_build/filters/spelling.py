@@ -0,0 +1,235 @@
+"""Incremental spell checking with a persistent store of known words.
+
+Specifications change a little between builds, but filter_spellcheck used
+to send every unique word of the combined document to the spell checker on
+every run.  misspelled_words() looks each word up in a KnownWords store
+first and sends only the words it has never seen, in a single batch, so a
+check of an unchanged spec starts no spell checker at all.
+
+KnownWords is a small JSON file, written atomically, holding the verdict on
+each word: ``good``, or ``bad`` with the misspellings the spell checker
+found in it.  Verdicts are kept per language and dictionary version, so an
+upgraded aspell or dictionary starts afresh.  The project word list
+(load_word_list) is applied on top of the stored verdicts, so editing it
+never invalidates the store.
+
+Words are the Str values of the document, punctuation included; the spell
+checker splits them further (``OpenUSD's,`` -> ``OpenUSD``).  Aspell is
+used everywhere but macOS, where the system spell checker is
+(mac_spellchecker).
+
+Like shared_filter_utils, this module imports nothing from its siblings at
+load time so it can be loaded both by the filters and as
+``doc_build.filters.spelling``.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_LANGUAGE = "en"
+
+# Name of the KnownWords store in the build cache directory.
+KNOWN_WORDS_FILENAME = "known_words.json"
+
+
+def load_word_list(path) -> frozenset:
+    """Return the words of the project word list at *path*.
+
+    One word per line; blank lines and lines starting with ``#`` are
+    ignored.  Returns an empty set if *path* is None or cannot be read.
+    """
+    if path is None:
+        return frozenset()
+    try:
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return frozenset()
+    return frozenset(
+        line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")
+    )
+
+
+class Aspell:
+    """Spell checks words with one ``aspell -a`` (ispell pipe mode) process."""
+
+    def __init__(self, binary: Optional[str] = None):
+        self.binary = binary or shutil.which("aspell") or "aspell"
+
+    def _run(self, *args, **kwargs) -> str:
+        return subprocess.run(
+            [self.binary, *args], text=True, capture_output=True, check=True, **kwargs
+        ).stdout
+
+    def dictionary(self, language: str) -> str:
+        """Return the version of aspell and of its *language* dictionary files."""
+        version = self._run("--version").strip()
+        dict_dir = Path(self._run("config", "dict-dir").strip())
+        files = sorted(
+            (p.name, p.stat().st_size, p.stat().st_mtime_ns)
+            for p in dict_dir.glob(f"{language}*")
+        )
+        digest = hashlib.sha256(repr(files).encode("utf-8")).hexdigest()[:16]
+        return f"{version} {digest}"
+
+    def check(self, words: List[str], language: str) -> Dict[str, List[str]]:
+        """Return ``{word: [misspellings in it]}`` for each of *words*."""
+        # "^" makes aspell treat each line as text, never as a command.
+        output = self._run(
+            "-a", "-l", language, input="".join(f"^{word}\n" for word in words)
+        )
+        return parse_pipe_output(words, output)
+
+
+def parse_pipe_output(words: List[str], output: str) -> Dict[str, List[str]]:
+    """Map each of *words* to its misspellings in aspell ``-a`` *output*.
+
+    The output is a version banner, then for each input line its result
+    lines (``&`` and ``#`` for misspellings) followed by a blank line.
+    """
+    results = output.split("\n")[1:]
+    found: Dict[str, List[str]] = {}
+    index = 0
+    for word in words:
+        misspelled = []
+        while index < len(results) and results[index]:
+            line = results[index]
+            if line[0] in "&#":
+                misspelled.append(line.split()[1])
+            index += 1
+        index += 1
+        found[word] = misspelled
+    return found
+
+
+class MacSpellChecker:
+    """Spell checks words with the macOS system spell checker."""
+
+    @staticmethod
+    def _module():
+        try:
+            import mac_spellchecker
+        except ImportError:
+            from doc_build.filters import mac_spellchecker
+        return mac_spellchecker
+
+    def dictionary(self, language: str) -> str:
+        return f"macOS {platform.mac_ver()[0]}"
+
+    def check(self, words: List[str], language: str) -> Dict[str, List[str]]:
+        return self._module().misspellings(words)
+
+
+def default_spellchecker():
+    """Return the spell checker of this platform."""
+    return MacSpellChecker() if platform.system() == "Darwin" else Aspell()
+
+
+class KnownWords:
+    """Spell checker verdicts on words, for one language and dictionary.
+
+    *path* is the JSON file backing the store; it may hold the verdicts of
+    several languages, and those of other dictionary versions of
+    *language* are dropped on save().  When *path* is None the store lives
+    in memory only.
+    """
+
+    def __init__(self, path, language: str, dictionary: str):
+        self.path = Path(path) if path is not None else None
+        self.language = language
+        self.key = f"{language} | {dictionary}"
+        self._data: dict = {}
+        self._good: set = set()
+        self._bad: Dict[str, List[str]] = {}
+        self._dirty = False
+        if self.path is not None:
+            try:
+                with open(self.path, encoding="utf-8") as fh:
+                    self._data = json.load(fh)
+            except (OSError, ValueError):
+                self._data = {}
+            if not isinstance(self._data, dict):
+                self._data = {}
+            entry = self._data.get(self.key) or {}
+            self._good = set(entry.get("good", ()))
+            self._bad = dict(entry.get("bad", {}))
+
+    def get(self, word: str) -> Optional[List[str]]:
+        """Return the misspellings in *word* ([] if none), or None if unknown."""
+        if word in self._good:
+            return []
+        return self._bad.get(word)
+
+    def update(self, verdicts: Dict[str, List[str]]) -> None:
+        """Record ``{word: [misspellings in it]}``."""
+        for word, misspelled in verdicts.items():
+            if misspelled:
+                self._good.discard(word)
+                self._bad[word] = list(misspelled)
+            else:
+                self._bad.pop(word, None)
+                self._good.add(word)
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the store back to its file if it changed."""
+        if self.path is None or not self._dirty:
+            return
+        data = {
+            key: entry for key, entry in self._data.items()
+            if key.split(" | ", 1)[0] != self.language
+        }
+        data[self.key] = {"good": sorted(self._good), "bad": dict(sorted(self._bad.items()))}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self._data = data
+        self._dirty = False
+
+
+def misspelled_words(
+    words: Iterable[str],
+    language: str = DEFAULT_LANGUAGE,
+    store_path=None,
+    project_words: Iterable[str] = (),
+    spellchecker=None,
+) -> Dict[str, List[str]]:
+    """Return ``{word: [misspellings in it]}`` for the misspelled *words*.
+
+    Only the words not in the KnownWords store at *store_path* are sent to
+    *spellchecker* (default_spellchecker() if None), in one batch, and
+    their verdicts are added to the store.  Misspellings in
+    *project_words* are not reported.  Words are returned in the order
+    given.
+    """
+    spellchecker = spellchecker or default_spellchecker()
+    words = list(dict.fromkeys(word for word in words if word))
+    known = KnownWords(store_path, language, spellchecker.dictionary(language))
+
+    unknown = [word for word in words if known.get(word) is None]
+    if unknown:
+        known.update(spellchecker.check(unknown, language))
+        known.save()
+
+    project_words = frozenset(project_words)
+    found: Dict[str, List[str]] = {}
+    for word in words:
+        misspelled = [m for m in known.get(word) or () if m not in project_words]
+        if misspelled:
+            found[word] = misspelled
+    return found
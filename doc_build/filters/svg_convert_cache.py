@@ -0,0 +1,116 @@
+"""Parallel, cached SVG conversion with rsvg-convert.
+
+convert_svgs() converts a batch of SVG files concurrently and returns the
+path of each result.  With a cache directory, results are stored as
+``<cache_dir>/svg/<sha256 of the SVG>-<dpi>.<format>`` and reused for as long
+as the SVG content and resolution are unchanged, so a rebuild only launches
+rsvg-convert for SVGs that were added or edited.  Without one, each result is
+written next to its SVG (``diagram.svg`` -> ``diagram.png``), as the filters
+did before the cache existed.
+
+replace_svg_images() is the whole of the SVG filters (filter_convert_svg,
+filter_svg_to_pdf): it converts every SVG image of a document in one batch
+and points the images at the results.
+
+Like shared_filter_utils, this module imports nothing from its siblings so it
+can be loaded both by the filters and as ``doc_build.filters.svg_convert_cache``.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def find_rsvg_convert() -> str:
+    rsvg_convert = shutil.which("rsvg-convert")
+    if not rsvg_convert:
+        raise RuntimeError("rsvg-convert not found")
+    return rsvg_convert
+
+
+def cached_output_path(svg, fmt: str, dpi: int, cache_dir) -> Path:
+    """Return where the *fmt* rendering of *svg* at *dpi* is stored."""
+    if cache_dir is None:
+        return Path(svg).with_suffix(f".{fmt}")
+    digest = hashlib.sha256(Path(svg).read_bytes()).hexdigest()
+    return Path(cache_dir) / "svg" / f"{digest}-{dpi}.{fmt}"
+
+
+def _convert(rsvg_convert, svg: Path, output: Path, fmt: str, dpi: int, extra_args) -> None:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    # Render to a temporary name so an interrupted or concurrent build never
+    # leaves a truncated file under the cached name.
+    tmp = output.with_name(f".{output.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        subprocess.check_call(
+            [rsvg_convert, svg, "-f", fmt, "-o", tmp, "-d", str(dpi), "-p", str(dpi), *extra_args]
+        )
+        os.replace(tmp, output)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def convert_svgs(paths, fmt="png", dpi=192, cache_dir=None, workers=None, extra_args=()) -> dict:
+    """Convert the SVG files in *paths* to *fmt* and return ``{path: output}``.
+
+    Conversions run on a thread pool of *workers* threads (the pool default
+    if None); each one is a separate rsvg-convert process.  Cached results
+    are returned without launching rsvg-convert.  *extra_args* are appended
+    to every rsvg-convert command line.
+    """
+    outputs = {}
+    pending = {}
+    for path in dict.fromkeys(paths):
+        output = cached_output_path(path, fmt, dpi, cache_dir)
+        outputs[path] = output
+        if cache_dir is None or not output.exists():
+            pending.setdefault(output, Path(path))
+
+    if pending:
+        rsvg_convert = find_rsvg_convert()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_convert, rsvg_convert, svg, output, fmt, dpi, extra_args)
+                for output, svg in pending.items()
+            ]
+            for future in futures:
+                future.result()
+
+    return outputs
+
+
+def _image_targets(node):
+    """Yield the ``[url, title]`` target of each Image in the pandoc JSON *node*."""
+    if isinstance(node, list):
+        for item in node:
+            yield from _image_targets(item)
+    elif isinstance(node, dict):
+        if node.get("t") == "Image":
+            yield node["c"][2]
+        for value in node.values():
+            yield from _image_targets(value)
+
+
+def replace_svg_images(doc: dict, fmt: str, dpi: int, cache_dir=None, extra_args=()) -> dict:
+    """Replace the SVG images of the pandoc JSON *doc* with *fmt* renderings.
+
+    The existing SVG files among the image targets are converted together
+    by convert_svgs(fmt, dpi, cache_dir, extra_args=extra_args), and each
+    target is rewritten in place to its result, relative to the working
+    directory (the artifacts dir), where pandoc resolves image paths.
+    Returns *doc*.
+    """
+    targets = [
+        target for target in _image_targets(doc)
+        if os.path.splitext(target[0])[1] == ".svg" and os.path.exists(target[0])
+    ]
+    outputs = convert_svgs(
+        [target[0] for target in targets], fmt, dpi, cache_dir, extra_args=extra_args
+    )
+    for target in targets:
+        target[0] = Path(os.path.relpath(outputs[target[0]])).as_posix()
+    return doc
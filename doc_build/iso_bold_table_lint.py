@@ -31,19 +31,25 @@ Usage as a library::
     fix_file(Path("specification/some_file.md"), violations)
 """
 
-import json
-import subprocess
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 from doc_build.iso_lint_utils import (
     DEFAULT_WORKERS,
+    LineFixer,
+    LintCheck,
+    LintResultsCache,
+    apply_line_fixes,
     collect_md_files,
     format_report as _format_report,
     get_sourcepos,
-    run_parallel_check,
+    linter_version,
+    parse_markdown,
+    progress_reporter,
+    run_parallel_checks,
+    scan_markdown,
     stringify,
     unwrap_sourcepos_spans,
 )
@@ -114,23 +120,25 @@ def _cell_text(blocks: list) -> str:
     return stringify(blocks).strip()
 
 
-def check_file(path: Path) -> List[Violation]:
-    """Return all bold-table-header violations in a single Markdown file."""
+def check_file(path: Path, doc: Optional[dict] = None) -> List[Violation]:
+    """Return all bold-table-header violations in a single Markdown file.
+
+    *doc* is the file's AST if already at hand (see parse_markdown).
+    Files whose pre-scan (scan_markdown) finds no table are not parsed.
+    """
     try:
-        raw_lines = path.read_text(encoding='utf-8').splitlines()
+        text = path.read_text(encoding='utf-8')
     except OSError:
         return []
-
-    try:
-        result = subprocess.run(
-            ["pandoc", "-f", "commonmark_x+sourcepos+pipe_tables", "-t", "json",
-             str(path)],
-            capture_output=True, text=True, check=True,
-        )
-    except (FileNotFoundError, subprocess.CalledProcessError):
+    raw_lines = text.splitlines()
+
+    if doc is None:
+        scan = scan_markdown(text)
+        if not scan.ambiguous and not scan.table_rows:
+            return []
+        doc = parse_markdown(path)
+    if doc is None:
         return []
-
-    doc = json.loads(result.stdout)
     violations: List[Violation] = []
 
     for block in doc["blocks"]:
@@ -169,19 +177,38 @@ def check_file(path: Path) -> List[Violation]:
     return violations
 
 
+def lint_check(cache: Optional[LintResultsCache] = None) -> LintCheck:
+    """Return this linter's check for run_parallel_checks, answered from *cache* if given."""
+    check_fn = check_file
+    if cache is not None:
+        check_fn = cache.wrap(check_file, "iso_bold_table_lint", linter_version(Path(__file__)))
+    return LintCheck(check_fn, sort_key=lambda v: (str(v.file), v.lineno))
+
+
 def check_spec(
     spec_root: Path,
     workers: int = DEFAULT_WORKERS,
+    files: Optional[List[Path]] = None,
+    cache: Optional[LintResultsCache] = None,
+    on_file: Optional[Callable[[Path, List[Violation]], None]] = None,
+    fail_fast: bool = False,
 ) -> List[Violation]:
-    """Walk *spec_root* recursively and return all violations in .md files."""
-    md_files = collect_md_files(spec_root)
+    """Walk *spec_root* recursively and return all violations in .md files.
 
-    return run_parallel_check(
-        md_files,
-        check_fn=check_file,
-        sort_key=lambda v: (str(v.file), v.lineno),
+    If *files* is given, only those of the .md files are checked.  With a
+    *cache*, files whose results it holds are not checked again.
+    *on_file* and *fail_fast* are passed to run_parallel_checks: the
+    former is called with each file's violations as soon as it is
+    checked, the latter stops at the first file with violations.
+    """
+    [violations] = run_parallel_checks(
+        collect_md_files(spec_root, only=files),
+        [lint_check(cache)],
         workers=workers,
+        on_file=on_file,
+        fail_fast=fail_fast,
     )
+    return violations
 
 
 # ---------------------------------------------------------------------------
@@ -240,6 +267,11 @@ def _bold_header_row(line: str) -> str:
     return '|'.join(new_parts)
 
 
+def line_fixer(violations: List[Violation]) -> LineFixer:
+    """Return the apply_line_fixes fixer bolding *violations*' header rows."""
+    return violations, _bold_header_row
+
+
 def fix_file(path: Path, violations: Optional[List[Violation]] = None) -> int:
     """Edit *path* in-place, bolding table header rows.
 
@@ -249,27 +281,7 @@ def fix_file(path: Path, violations: Optional[List[Violation]] = None) -> int:
     if violations is None:
         violations = check_file(path)
     file_violations = [v for v in violations if v.file == path]
-    if not file_violations:
-        return 0
-
-    lines = path.read_text(encoding='utf-8').splitlines(keepends=True)
-    violation_lines = {v.lineno for v in file_violations}
-    fixed = 0
-
-    for lineno in sorted(violation_lines):
-        idx = lineno - 1
-        if idx < 0 or idx >= len(lines):
-            continue
-        original = lines[idx].rstrip('\n')
-        trailing = lines[idx][len(original):]
-        bolded = _bold_header_row(original)
-        if bolded != original:
-            lines[idx] = bolded + trailing
-            fixed += 1
-
-    if fixed:
-        path.write_text(''.join(lines), encoding='utf-8')
-
+    [(_, fixed)] = apply_line_fixes([line_fixer(file_violations)], workers=1)
     return fixed
 
 
@@ -282,25 +294,11 @@ def fix_spec(
 
     If *violations* is provided, skips the check pass and fixes those
     directly — useful when the caller already ran ``check_spec()``.
+    Each file is rewritten once, atomically (apply_line_fixes).
     """
     if violations is None:
         violations = check_spec(spec_root, workers=workers)
-    if not violations:
-        return 0, 0
-
-    # Group by file.
-    by_file: dict = {}
-    for v in violations:
-        by_file.setdefault(v.file, []).append(v)
-
-    files_fixed = 0
-    rows_fixed = 0
-    for file_path, file_violations in by_file.items():
-        n = fix_file(file_path, file_violations)
-        if n:
-            files_fixed += 1
-            rows_fixed += n
-
+    [(files_fixed, rows_fixed)] = apply_line_fixes([line_fixer(violations)], workers=workers)
     return files_fixed, rows_fixed
 
 
@@ -340,7 +338,12 @@ def main(argv=None):
         type=int,
         default=DEFAULT_WORKERS,
         metavar='N',
-        help=f'Parallel Pandoc workers (default: {DEFAULT_WORKERS})',
+        help=f'Worker processes (default: the number of CPUs, {DEFAULT_WORKERS})',
+    )
+    parser.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='Stop at the first file with violations (for CI).',
     )
     args = parser.parse_args(argv)
     spec_root = Path(args.path).resolve()
@@ -357,7 +360,12 @@ def main(argv=None):
         files_fixed, rows_fixed = fix_spec(spec_root, workers=args.workers, violations=violations)
         print(f'Fixed {rows_fixed} header row(s) in {files_fixed} file(s).')
     else:
-        violations = check_spec(spec_root, workers=args.workers)
+        violations = check_spec(
+            spec_root,
+            workers=args.workers,
+            on_file=progress_reporter(spec_root, lambda line: print(line, file=sys.stderr)),
+            fail_fast=args.fail_fast,
+        )
         report = format_report(violations, spec_root=spec_root)
         if report:
             print(report)
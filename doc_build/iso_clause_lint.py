@@ -20,20 +20,24 @@ Usage from the command line:
     python3 -m doc_build.iso_clause_lint specification/
 """
 
-import json
 import re
-import subprocess
 import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 from doc_build.iso_lint_utils import (
     DEFAULT_WORKERS,
+    LintCheck,
+    LintResultsCache,
     collect_md_files,
     format_report as _format_report,
     get_sourcepos,
-    run_parallel_check,
+    linter_version,
+    parse_markdown,
+    progress_reporter,
+    run_parallel_checks,
+    scan_markdown,
     stringify,
 )
 
@@ -130,7 +134,7 @@ def _strip_html_comment_lines(
 # Core checker
 # ---------------------------------------------------------------------------
 
-def check_file(path: Path) -> List[Violation]:
+def check_file(path: Path, doc: Optional[dict] = None) -> List[Violation]:
     """Return all ISO clause violations in a single Markdown file.
 
     A violation occurs when a heading at level N is followed by one or more
@@ -138,32 +142,32 @@ def check_file(path: Path) -> List[Violation]:
     direct child subclause).
 
     Pandoc parses the file with the +sourcepos extension so that every block
-    carries its source line number.  Only top-level document blocks are
-    examined; headings or text nested inside block quotes, lists, or other
-    containers are intentionally ignored.
+    carries its source line number (parse_markdown, shared by all linters;
+    pass *doc* to reuse an AST already at hand).  Files whose pre-scan
+    (scan_markdown) shows no candidate are not parsed at all.  Only top-level document
+    blocks are examined; headings or text nested inside block quotes, lists,
+    or other containers are intentionally ignored.
 
-    Returns [] on OSError or if Pandoc is unavailable.
+    Returns [] on OSError or if Pandoc is unavailable or rejects the file.
     """
     try:
-        raw_lines = path.read_text(encoding='utf-8').splitlines()
+        text = path.read_text(encoding='utf-8')
     except OSError:
         return []
-
-    try:
-        result = subprocess.run(
-            ["pandoc", "-f", "commonmark_x+sourcepos", "-t", "json", str(path)],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-    except FileNotFoundError:
-        # Pandoc is not installed — skip silently.
+    raw_lines = text.splitlines()
+
+    if doc is None:
+        scan = scan_markdown(text)
+        if not scan.ambiguous and not any(
+            heading.body_follows and following.level == heading.level + 1
+            for heading, following in zip(scan.headings, scan.headings[1:])
+        ):
+            # No heading has body text before a direct child: no Pandoc
+            # parse needed to know there is nothing to report.
+            return []
+        doc = parse_markdown(path)
+    if doc is None:
         return []
-    except subprocess.CalledProcessError:
-        # Pandoc rejected the file (parse error) — skip.
-        return []
-
-    doc = json.loads(result.stdout)
 
     violations: List[Violation] = []
     # State: the most recently seen top-level heading.
@@ -223,25 +227,43 @@ def check_file(path: Path) -> List[Violation]:
     return violations
 
 
+def lint_check(cache: Optional[LintResultsCache] = None) -> LintCheck:
+    """Return this linter's check for run_parallel_checks, answered from *cache* if given."""
+    check_fn = check_file
+    if cache is not None:
+        check_fn = cache.wrap(check_file, "iso_clause_lint", linter_version(Path(__file__)))
+    return LintCheck(check_fn, sort_key=lambda v: (str(v.file), v.heading_lineno))
+
+
 def check_spec(
     spec_root: Path,
     workers: int = DEFAULT_WORKERS,
+    files: Optional[List[Path]] = None,
+    cache: Optional[LintResultsCache] = None,
+    on_file: Optional[Callable[[Path, List[Violation]], None]] = None,
+    fail_fast: bool = False,
 ) -> List[Violation]:
     """Walk *spec_root* recursively and return all violations in .md files.
 
     *spec_root* may be a single ``.md`` file or a directory.  Files are
-    processed in parallel (up to *workers* simultaneous Pandoc
-    subprocesses) for speed, then results are sorted by (file path, line
-    number) so that output is stable across runs.
+    processed in parallel (in up to *workers* processes) for speed, then
+    results are sorted by (file path, line number) so that output is
+    stable across runs.
+
+    If *files* is given, only those of the .md files are checked.  With a
+    *cache*, files whose results it holds are not checked again.
+    *on_file* and *fail_fast* are passed to run_parallel_checks: the
+    former is called with each file's violations as soon as it is
+    checked, the latter stops at the first file with violations.
     """
-    md_files = collect_md_files(spec_root)
-
-    return run_parallel_check(
-        md_files,
-        check_fn=check_file,
-        sort_key=lambda v: (str(v.file), v.heading_lineno),
+    [violations] = run_parallel_checks(
+        collect_md_files(spec_root, only=files),
+        [lint_check(cache)],
         workers=workers,
+        on_file=on_file,
+        fail_fast=fail_fast,
     )
+    return violations
 
 
 # ---------------------------------------------------------------------------
@@ -291,11 +313,21 @@ def main(argv=None):
         type=int,
         default=DEFAULT_WORKERS,
         metavar='N',
-        help=f'Parallel Pandoc workers (default: {DEFAULT_WORKERS})',
+        help=f'Worker processes (default: the number of CPUs, {DEFAULT_WORKERS})',
+    )
+    parser.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='Stop at the first file with violations (for CI).',
     )
     args = parser.parse_args(argv)
     spec_root = Path(args.path).resolve()
-    violations = check_spec(spec_root, workers=args.workers)
+    violations = check_spec(
+        spec_root,
+        workers=args.workers,
+        on_file=progress_reporter(spec_root, lambda line: print(line, file=sys.stderr)),
+        fail_fast=args.fail_fast,
+    )
     report = format_report(violations, context=args.context, spec_root=spec_root)
     if report:
         print(report)
@@ -33,27 +33,37 @@ Usage as a library::
     fix_file(Path("specification/some_file.md"), violations, extra_nouns)
 """
 
-import json
+import functools
+import inspect
 import re
-import subprocess
 import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Set, Tuple
+from typing import Callable, List, Optional, Set, Tuple
 
 from filters.heading_case import (
     heading_needs_conversion,
     is_proper_noun,
     load_proper_nouns,
+    phrase_words,
     sentence_case_inlines,
 )
 
 from doc_build.iso_lint_utils import (
     DEFAULT_WORKERS,
+    LineFixer,
+    LintCheck,
+    LintResultsCache,
+    apply_line_fixes,
     collect_md_files,
+    file_digest,
     format_report as _format_report,
     get_sourcepos,
-    run_parallel_check,
+    linter_version,
+    parse_markdown,
+    progress_reporter,
+    run_parallel_checks,
+    scan_markdown,
     stringify,
 )
 
@@ -95,9 +105,10 @@ def _find_non_sentence_words(inlines: list, extra_nouns: Set[str]) -> List[str]:
     words = []
     text = stringify(inlines)
     all_words = [w for w in re.split(r'\s+', text) if w]
-    for word in all_words[1:]:
+    kept = phrase_words(all_words, extra_nouns)
+    for index, word in enumerate(all_words[1:], 1):
         stripped = word.strip(".,;:!?()[]{}\"'`")
-        if not stripped or not stripped[0].isalpha():
+        if not stripped or not stripped[0].isalpha() or index in kept:
             continue
         if stripped[0].isupper() and not is_proper_noun(word, extra_nouns):
             words.append(word)
@@ -108,17 +119,59 @@ def _find_non_sentence_words(inlines: list, extra_nouns: Set[str]) -> List[str]:
 # Core checker
 # ---------------------------------------------------------------------------
 
-def check_file(path: Path, extra_nouns: Set[str] = frozenset()) -> List[Violation]:
-    """Return all heading sentence-case violations in a single Markdown file."""
-    try:
-        result = subprocess.run(
-            ["pandoc", "-f", "commonmark_x+sourcepos", "-t", "json", str(path)],
-            capture_output=True, text=True, check=True,
-        )
-    except (FileNotFoundError, subprocess.CalledProcessError):
+def _check_heading(
+    path: Path,
+    lineno: Optional[int],
+    level: int,
+    inlines: list,
+    extra_nouns: Set[str],
+) -> Optional[Violation]:
+    """Return the violation of one heading, or None if it is in sentence case."""
+    if not heading_needs_conversion(inlines, extra_nouns):
+        return None
+
+    heading_text = stringify(inlines).strip()
+    converted = sentence_case_inlines(inlines, extra_nouns)
+    suggested_text = stringify(converted).strip()
+    non_sentence = _find_non_sentence_words(inlines, extra_nouns)
+
+    return Violation(
+        file=path,
+        lineno=lineno or 0,
+        level=level,
+        heading_text=heading_text,
+        suggested_text=suggested_text,
+        non_sentence_words=non_sentence,
+    )
+
+
+def check_file(
+    path: Path,
+    extra_nouns: Set[str] = frozenset(),
+    doc: Optional[dict] = None,
+) -> List[Violation]:
+    """Return all heading sentence-case violations in a single Markdown file.
+
+    *doc* is the file's AST if already at hand (see parse_markdown).
+    Without it, files whose headings are all plain text (see
+    scan_markdown) are checked from the pre-scan, without a Pandoc parse.
+    """
+    if doc is None:
+        try:
+            scan = scan_markdown(path.read_text(encoding='utf-8'))
+        except OSError:
+            return []
+        headings = [(h, h.plain_inlines()) for h in scan.headings]
+        if not scan.ambiguous and all(inlines is not None for _, inlines in headings):
+            violations = [
+                _check_heading(path, h.lineno, h.level, inlines, extra_nouns)
+                for h, inlines in headings
+            ]
+            return [v for v in violations if v is not None]
+        doc = parse_markdown(path)
+    if doc is None:
         return []
 
-    doc = json.loads(result.stdout)
     violations: List[Violation] = []
 
     for block in doc["blocks"]:
@@ -128,43 +181,59 @@ def check_file(path: Path, extra_nouns: Set[str] = frozenset()) -> List[Violatio
         level = block["c"][0]
         attr = block["c"][1]
         inlines = block["c"][2]
-        lineno = get_sourcepos(attr)
+        violation = _check_heading(path, get_sourcepos(attr), level, inlines, extra_nouns)
+        if violation is not None:
+            violations.append(violation)
 
-        if not heading_needs_conversion(inlines, extra_nouns):
-            continue
+    return violations
 
-        heading_text = stringify(inlines).strip()
-        converted = sentence_case_inlines(inlines, extra_nouns)
-        suggested_text = stringify(converted).strip()
-        non_sentence = _find_non_sentence_words(inlines, extra_nouns)
 
-        violations.append(Violation(
-            file=path,
-            lineno=lineno or 0,
-            level=level,
-            heading_text=heading_text,
-            suggested_text=suggested_text,
-            non_sentence_words=non_sentence,
-        ))
+def lint_check(
+    proper_nouns_path: Optional[Path] = None,
+    cache: Optional[LintResultsCache] = None,
+) -> LintCheck:
+    """Return this linter's check for run_parallel_checks, answered from *cache* if given.
 
-    return violations
+    Headings are checked against the proper nouns of *proper_nouns_path*
+    as well as the built-in ones.
+    """
+    check_fn = functools.partial(check_file, extra_nouns=load_proper_nouns(proper_nouns_path))
+    if cache is not None:
+        check_fn = cache.wrap(
+            check_fn,
+            "iso_heading_case_lint",
+            linter_version(Path(__file__), Path(inspect.getfile(is_proper_noun))),
+            inputs=file_digest(proper_nouns_path),
+        )
+    return LintCheck(check_fn, sort_key=lambda v: (str(v.file), v.lineno))
 
 
 def check_spec(
     spec_root: Path,
     workers: int = DEFAULT_WORKERS,
     proper_nouns_path: Optional[Path] = None,
+    files: Optional[List[Path]] = None,
+    cache: Optional[LintResultsCache] = None,
+    on_file: Optional[Callable[[Path, List[Violation]], None]] = None,
+    fail_fast: bool = False,
 ) -> List[Violation]:
-    """Walk *spec_root* recursively and return all violations in .md files."""
-    extra_nouns = load_proper_nouns(proper_nouns_path)
-    md_files = collect_md_files(spec_root)
-
-    return run_parallel_check(
-        md_files,
-        check_fn=lambda p: check_file(p, extra_nouns),
-        sort_key=lambda v: (str(v.file), v.lineno),
+    """Walk *spec_root* recursively and return all violations in .md files.
+
+    If *files* is given, only those of the .md files are checked.  With a
+    *cache*, files whose results it holds for the same proper nouns are
+    not checked again.
+    *on_file* and *fail_fast* are passed to run_parallel_checks: the
+    former is called with each file's violations as soon as it is
+    checked, the latter stops at the first file with violations.
+    """
+    [violations] = run_parallel_checks(
+        collect_md_files(spec_root, only=files),
+        [lint_check(proper_nouns_path, cache)],
         workers=workers,
+        on_file=on_file,
+        fail_fast=fail_fast,
     )
+    return violations
 
 
 # ---------------------------------------------------------------------------
@@ -193,10 +262,15 @@ def _sentence_case_text(text: str, extra_nouns: Set[str]) -> str:
     first_word_seen = False
     result = list(text)
 
-    for m in re.finditer(r"[A-Za-z][A-Za-z0-9'_-]*", text):
-        word_range = range(m.start(), m.end())
+    matches = list(re.finditer(r"[A-Za-z][A-Za-z0-9'_-]*", text))
+    in_protected = [not protected.isdisjoint(range(m.start(), m.end())) for m in matches]
+    kept = phrase_words(
+        [None if skip else m.group() for m, skip in zip(matches, in_protected)], extra_nouns,
+    )
+
+    for index, m in enumerate(matches):
         # Skip words inside protected ranges (code spans, link URLs).
-        if not protected.isdisjoint(word_range):
+        if in_protected[index]:
             first_word_seen = True
             continue
 
@@ -207,7 +281,7 @@ def _sentence_case_text(text: str, extra_nouns: Set[str]) -> str:
             first_word_seen = True
             continue
 
-        if is_proper_noun(word, extra_nouns):
+        if index in kept or is_proper_noun(word, extra_nouns):
             continue
 
         # Lowercase this word in-place.
@@ -233,6 +307,11 @@ def _sentence_case_heading_line(line: str, extra_nouns: Set[str]) -> str:
     return prefix + converted + trailing
 
 
+def line_fixer(violations: List[Violation], extra_nouns: Set[str] = frozenset()) -> LineFixer:
+    """Return the apply_line_fixes fixer converting *violations*' headings to sentence case."""
+    return violations, functools.partial(_sentence_case_heading_line, extra_nouns=extra_nouns)
+
+
 def fix_file(
     path: Path,
     violations: Optional[List[Violation]] = None,
@@ -246,27 +325,7 @@ def fix_file(
     if violations is None:
         violations = check_file(path, extra_nouns)
     file_violations = [v for v in violations if v.file == path]
-    if not file_violations:
-        return 0
-
-    lines = path.read_text(encoding='utf-8').splitlines(keepends=True)
-    violation_lines = {v.lineno for v in file_violations}
-    fixed = 0
-
-    for lineno in sorted(violation_lines):
-        idx = lineno - 1
-        if idx < 0 or idx >= len(lines):
-            continue
-        original = lines[idx].rstrip('\n')
-        trailing = lines[idx][len(original):]
-        converted = _sentence_case_heading_line(original, extra_nouns)
-        if converted != original:
-            lines[idx] = converted + trailing
-            fixed += 1
-
-    if fixed:
-        path.write_text(''.join(lines), encoding='utf-8')
-
+    [(_, fixed)] = apply_line_fixes([line_fixer(file_violations, extra_nouns)], workers=1)
     return fixed
 
 
@@ -280,26 +339,12 @@ def fix_spec(
 
     If *violations* is provided, skips the check pass and fixes those
     directly — useful when the caller already ran ``check_spec()``.
+    Each file is rewritten once, atomically (apply_line_fixes).
     """
     extra_nouns = load_proper_nouns(proper_nouns_path)
     if violations is None:
         violations = check_spec(spec_root, workers=workers, proper_nouns_path=proper_nouns_path)
-    if not violations:
-        return 0, 0
-
-    # Group by file.
-    by_file: dict = {}
-    for v in violations:
-        by_file.setdefault(v.file, []).append(v)
-
-    files_fixed = 0
-    headings_fixed = 0
-    for file_path, file_violations in by_file.items():
-        n = fix_file(file_path, file_violations, extra_nouns)
-        if n:
-            files_fixed += 1
-            headings_fixed += n
-
+    [(files_fixed, headings_fixed)] = apply_line_fixes([line_fixer(violations, extra_nouns)], workers=workers)
     return files_fixed, headings_fixed
 
 
@@ -346,7 +391,12 @@ def main(argv=None):
         type=int,
         default=DEFAULT_WORKERS,
         metavar='N',
-        help=f'Parallel Pandoc workers (default: {DEFAULT_WORKERS})',
+        help=f'Worker processes (default: the number of CPUs, {DEFAULT_WORKERS})',
+    )
+    parser.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='Stop at the first file with violations (for CI).',
     )
     args = parser.parse_args(argv)
     spec_root = Path(args.path).resolve()
@@ -376,6 +426,8 @@ def main(argv=None):
             spec_root,
             workers=args.workers,
             proper_nouns_path=args.proper_nouns,
+            on_file=progress_reporter(spec_root, lambda line: print(line, file=sys.stderr)),
+            fail_fast=args.fail_fast,
         )
         report = format_report(violations, spec_root=spec_root)
         if report:
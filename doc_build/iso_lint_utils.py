@@ -4,10 +4,22 @@ Common helpers used by ``iso_heading_case_lint``, ``iso_bold_table_lint``,
 and ``iso_clause_lint``.
 """
 
+import dataclasses
+import hashlib
+import json
+import multiprocessing
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import pickle
+import re
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from doc_build import pandoc_server
 
 try:
     from doc_build.filters.pandocfilters import stringify
@@ -17,54 +29,696 @@ except ImportError:
 # Re-export so linters can ``from doc_build.iso_lint_utils import stringify``.
 __all__ = [
     "DEFAULT_WORKERS",
+    "LINT_CACHE_FILENAME",
+    "LINT_MARKDOWN_FORMAT",
+    "LineFixer",
+    "LintCheck",
+    "LintResultsCache",
+    "MarkdownScan",
+    "ScannedHeading",
+    "apply_line_fixes",
+    "check_flattened",
     "collect_md_files",
+    "file_digest",
     "format_report",
     "get_sourcepos",
+    "linter_version",
+    "parse_markdown",
+    "progress_reporter",
     "run_parallel_check",
+    "run_parallel_checks",
+    "scan_markdown",
+    "split_doc_by_source",
     "stringify",
     "unwrap_sourcepos_spans",
+    "write_text_atomic",
 ]
 
-# Maximum number of parallel Pandoc subprocesses.
-DEFAULT_WORKERS = 8
+# Number of worker processes checking files (each runs its own Pandoc parses).
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# Pandoc reader every linter parses with: the union of the extensions they
+# need (+sourcepos for line numbers, pipe_tables for the bold-table linter).
+LINT_MARKDOWN_FORMAT = "commonmark_x+sourcepos+pipe_tables"
+
+# Name of the persistent linter results cache in the build cache directory.
+LINT_CACHE_FILENAME = "iso_lint_cache.pickle"
+
+# Pandoc JSON ASTs keyed by the sha256 of the parsed Markdown.
+_ast_cache: Dict[str, dict] = {}
+_ast_cache_lock = threading.Lock()
 
+# A linter's fixes for apply_line_fixes: its violations (each with ``file``
+# and ``lineno``) and the function that turns the source line of a
+# violation, without its line ending, into the fixed line.
+LineFixer = Tuple[List[Any], Callable[[str], str]]
 
-def collect_md_files(path: Path) -> List[Path]:
+
+def collect_md_files(path: Path, only: Optional[Iterable[Path]] = None) -> List[Path]:
     """Return a list of ``.md`` files under *path*.
 
-    *path* may be a single file or a directory (walked recursively).
+    *path* may be a single file or a directory (walked recursively).  If
+    *only* is given, just the files that are also listed in it are
+    returned; entries outside *path* or not ending in ``.md`` are ignored.
     """
     path = Path(path)
     if path.is_file():
-        return [path] if path.suffix == '.md' else []
-    md_files: List[Path] = []
-    for dirpath, dirnames, filenames in os.walk(path):
-        dirnames.sort()
-        for fname in sorted(filenames):
-            if fname.endswith('.md'):
-                md_files.append(Path(dirpath) / fname)
+        md_files = [path] if path.suffix == '.md' else []
+    else:
+        md_files = []
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for fname in sorted(filenames):
+                if fname.endswith('.md'):
+                    md_files.append(Path(dirpath) / fname)
+    if only is not None:
+        wanted = {Path(p).resolve() for p in only}
+        md_files = [p for p in md_files if p.resolve() in wanted]
     return md_files
 
 
+def file_digest(*paths: Optional[Path]) -> str:
+    """Return the sha256 of the contents of *paths* (None or missing files count as empty)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            content = Path(path).read_bytes() if path is not None else b""
+        except OSError:
+            content = b""
+        digest.update(hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+
+def linter_version(*sources: Path) -> str:
+    """Return the LintResultsCache version of a linter made of *sources*.
+
+    A digest of the linter's source files and of this module, so editing
+    any of them invalidates the cached results.
+    """
+    return file_digest(Path(__file__), *sources)
+
+
+class LintResultsCache:
+    """Linter results kept across runs, so unchanged files are not re-checked.
+
+    Each entry holds the violations one linter found in one file, together
+    with the key they were computed for: the file's content hash, the
+    linter version and any other input of the check (the proper-nouns YAML
+    for the heading-case linter).  A file is only checked again when that
+    key changes.  Entries live in a pickle at *path* (see save()); with
+    *path* None the cache only lasts for this process.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else None
+        # (linter, resolved file path) -> (key, violations)
+        self._entries: Dict[Tuple[str, str], Tuple[str, list]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if self.path is not None and self.path.exists():
+            try:
+                with open(self.path, "rb") as f:
+                    self._entries = pickle.load(f)
+            except Exception:
+                # A stale or corrupt cache only costs a full re-check.
+                self._entries = {}
+
+    def wrap(self, check_fn: Callable, linter: str, version: str, inputs: str = "") -> Callable:
+        """Return *check_fn* (``path -> violations``) answered from the cache.
+
+        *version* identifies the linter's logic and *inputs* any other
+        input the results depend on; cached violations are only reused if
+        both match.  Violations must be dataclasses with a ``file`` field.
+        """
+        return _CachedCheck(self, check_fn, linter, version, inputs)
+
+    def save(self) -> None:
+        """Write the cache to its path if anything changed."""
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with self._lock:
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(self._entries, f)
+                self._dirty = False
+            os.replace(tmp_path, self.path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+
+class _CachedCheck:
+    """A check function answered from a LintResultsCache (see LintResultsCache.wrap).
+
+    Calling it checks a file like the wrapped function.  run_parallel_check
+    instead uses key(), lookup() and store() itself, so that only the files
+    not in the cache are sent to its worker processes.
+    """
+
+    def __init__(self, cache: LintResultsCache, check_fn: Callable, linter: str, version: str, inputs: str):
+        self.cache = cache
+        self.check_fn = check_fn
+        self.linter = linter
+        self.version = version
+        self.inputs = inputs
+
+    def key(self, path: Path) -> Optional[str]:
+        """Return the cache key of *path*'s current content, or None if it cannot be read."""
+        try:
+            content = Path(path).read_bytes()
+        except OSError:
+            return None
+        return hashlib.sha256(
+            "\0".join((self.linter, self.version, self.inputs)).encode() + b"\0" + content
+        ).hexdigest()
+
+    def lookup(self, path: Path, key: str) -> Optional[list]:
+        """Return the cached violations of *path* if they were found for *key*."""
+        with self.cache._lock:
+            entry = self.cache._entries.get((self.linter, str(Path(path).resolve())))
+        if entry is None or entry[0] != key:
+            return None
+        return [dataclasses.replace(v, file=path) for v in entry[1]]
+
+    def store(self, path: Path, key: str, violations: list) -> None:
+        """Record *violations* as the results of *path* for *key*."""
+        with self.cache._lock:
+            self.cache._entries[(self.linter, str(Path(path).resolve()))] = (key, violations)
+            self.cache._dirty = True
+
+    def __call__(self, path: Path) -> list:
+        key = self.key(path)
+        if key is None:
+            return self.check_fn(path)
+        violations = self.lookup(path, key)
+        if violations is None:
+            violations = self.check_fn(path)
+            self.store(path, key, violations)
+        return violations
+
+
+def parse_markdown(path: Path) -> Optional[dict]:
+    """Return the Pandoc JSON AST of the Markdown file at *path*.
+
+    The file is parsed with LINT_MARKDOWN_FORMAT and the result memoised by
+    content hash, so every linter run on the same content in this process
+    (the checks run_parallel_checks runs on a file) shares a single Pandoc
+    conversion, done by the pandoc server when one is running (see
+    pandoc_server).  The AST is shared, not copied: callers must not
+    modify it.
+
+    Returns None if the file cannot be read, Pandoc is not installed, or
+    Pandoc rejects the file.
+    """
+    try:
+        content = Path(path).read_bytes()
+    except OSError:
+        return None
+
+    key = hashlib.sha256(content).hexdigest()
+    with _ast_cache_lock:
+        doc = _ast_cache.get(key)
+    if doc is not None:
+        return doc
+
+    try:
+        output = pandoc_server.convert(content.decode("utf-8-sig"), LINT_MARKDOWN_FORMAT, "json")
+    except UnicodeDecodeError:
+        output = None
+    if output is None:
+        try:
+            # Read from stdin so the AST depends on the content alone (data-pos
+            # then carries no file name; get_sourcepos handles both forms).
+            result = subprocess.run(
+                ["pandoc", "-f", LINT_MARKDOWN_FORMAT, "-t", "json"],
+                input=content,
+                capture_output=True,
+                check=True,
+            )
+        except (FileNotFoundError, subprocess.CalledProcessError):
+            return None
+        output = result.stdout
+
+    doc = json.loads(output)
+    with _ast_cache_lock:
+        return _ast_cache.setdefault(key, doc)
+
+
+# ---------------------------------------------------------------------------
+# In-process pre-scan
+# ---------------------------------------------------------------------------
+
+_FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})(.*)$')
+_ATX_RE = re.compile(r'^#{1,6}(?=[ \t]|$)')
+_ATX_CLOSING_RE = re.compile(r'(?:^|[ \t])#+$')
+_SETEXT_UNDERLINE_RE = re.compile(r'^ {0,3}(?:=+|-+)[ \t]*$')
+_TABLE_DELIMITER_RE = re.compile(r'^[ \t>]*\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-*:?[ \t]*)*$')
+
+# Heading text that LINT_MARKDOWN_FORMAT reads as nothing but words: ASCII
+# letters and digits with a few punctuation marks that no extension turns
+# into markup (no quotes, dashes or ellipses for +smart, no ':' for +emoji).
+_PLAIN_HEADING_RE = re.compile(r'^(?!.*(?:--|\.\.))[A-Za-z0-9 \t,.;()/?!-]*$')
+# Pandoc's commonmark reader makes a Str of each run of letters and digits
+# and of each punctuation character.
+_PLAIN_TOKEN_RE = re.compile(r'[A-Za-z0-9]+|\S')
+
+
+@dataclass
+class ScannedHeading:
+    """A top-level ATX heading found by scan_markdown()."""
+    lineno: int                  # 1-based line number
+    level: int
+    text: str                    # content without the #s and surrounding blanks
+    body_follows: bool = False   # non-blank, non-comment lines before the next heading
+
+    def plain_inlines(self) -> Optional[list]:
+        """Return the Pandoc inlines of the heading text, or None unless it is plain.
+
+        Plain text parses to Str and Space nodes only, so these equal
+        the heading's inlines in a LINT_MARKDOWN_FORMAT AST once the
+        +sourcepos wrappers are removed.
+        """
+        if not _PLAIN_HEADING_RE.match(self.text):
+            return None
+        inlines: list = []
+        for word in self.text.split():
+            if inlines:
+                inlines.append({"t": "Space"})
+            inlines.extend({"t": "Str", "c": token} for token in _PLAIN_TOKEN_RE.findall(word))
+        return inlines
+
+
+@dataclass
+class MarkdownScan:
+    """What scan_markdown() found in a Markdown file."""
+    headings: List[ScannedHeading] = field(default_factory=list)
+    table_rows: List[int] = field(default_factory=list)  # lines that may be pipe-table delimiter rows
+    # True if the file has constructs the scan does not model (setext
+    # headings, HTML blocks, fenced divs, indented ATX headings, front
+    # matter, unclosed fences or comments); only a Pandoc parse is reliable.
+    ambiguous: bool = False
+
+
+def scan_markdown(text: str) -> MarkdownScan:
+    """Scan Markdown *text* for top-level headings and table candidates.
+
+    A line-based pass that skips fenced code blocks and HTML comments and
+    is much cheaper than a Pandoc parse, so the linters can tell which
+    files need one at all.  The result is exact for files it does not
+    mark as ambiguous: their top-level ATX headings are the Header blocks
+    of the Pandoc AST, and a file without ``table_rows`` has no tables.
+    """
+    scan = MarkdownScan()
+    lines = text.lstrip('\ufeff').splitlines()
+    if lines and lines[0].rstrip() == '---' and len(lines) > 1 and lines[1].strip():
+        scan.ambiguous = True   # YAML front matter
+
+    fence: Optional[str] = None     # closing fence prefix while in fenced code
+    comment_start: Optional[int] = None
+    previous_blank = True
+
+    for lineno, line in enumerate(lines, start=1):
+        if fence is not None:
+            if line.lstrip(' ').startswith(fence) and len(line) - len(line.lstrip(' ')) <= 3 \
+                    and not line.strip().lstrip(fence[0]):
+                fence = None
+            continue
+        if comment_start is not None:
+            if '-->' in line:
+                # A comment block followed by text on its last line is body.
+                if not line.rstrip().endswith('-->') and scan.headings:
+                    scan.headings[-1].body_follows = True
+                comment_start = None
+            previous_blank = False
+            continue
+
+        if not line.strip():
+            previous_blank = True
+            continue
+
+        expanded = line.expandtabs(4)
+        indent = len(expanded) - len(expanded.lstrip(' '))
+        stripped = expanded.lstrip(' ')
+        is_body = True
+
+        if _TABLE_DELIMITER_RE.match(line) and '|' in line:
+            scan.table_rows.append(lineno)
+
+        if indent <= 3:
+            fence_match = _FENCE_RE.match(expanded)
+            if fence_match and not (fence_match.group(1)[0] == '`' and '`' in fence_match.group(2)):
+                fence = fence_match.group(1)
+            elif stripped.startswith('<!--'):
+                if '-->' in stripped[4:]:
+                    is_body = not stripped.rstrip().endswith('-->')
+                else:
+                    comment_start = lineno
+                    is_body = False
+            elif stripped.startswith(('<', ':::')):
+                scan.ambiguous = True
+            elif _ATX_RE.match(stripped):
+                if indent:
+                    scan.ambiguous = True
+                else:
+                    atx = _ATX_RE.match(stripped).group(0)
+                    content = stripped[len(atx):].strip(' \t')
+                    closing = _ATX_CLOSING_RE.search(content)
+                    if closing:
+                        content = content[:closing.start()].rstrip(' \t')
+                    scan.headings.append(ScannedHeading(lineno, len(atx), content))
+                    is_body = False
+            elif _SETEXT_UNDERLINE_RE.match(expanded) and not previous_blank:
+                scan.ambiguous = True
+
+        if is_body and scan.headings:
+            scan.headings[-1].body_follows = True
+        previous_blank = False
+
+    if fence is not None or comment_start is not None:
+        scan.ambiguous = True
+    return scan
+
+
+def _mp_context():
+    # Not "fork": the parent may hold threads and pandoc server connections.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+@dataclass(frozen=True)
+class LintCheck:
+    """A linter's check of a file, as run by run_parallel_checks.
+
+    *check_fn* is called with a single ``Path`` argument and returns a list
+    of violation objects; *sort_key* orders the violations of a run.
+    """
+    check_fn: Callable
+    sort_key: Callable
+
+
+def _check_file(path: Path, check_fns: List[Callable]) -> List[list]:
+    """Return the violations each of *check_fns* finds in *path*.
+
+    The checks run one after another in this process, so those that need
+    the file's AST share one parse of it (see parse_markdown).
+    """
+    return [check_fn(path) for check_fn in check_fns]
+
+
+def _checked_files(tasks: List[Tuple[Path, List[Callable]]], workers: int):
+    """Yield ``(path, violations per check)`` for *tasks* in the order they finish.
+
+    Each task is a file and the check functions to run on it.  The tasks
+    share one pool of up to *workers* processes, each taking the next
+    queued file when it is done, and the pool is shut down when the caller
+    stops iterating; files still queued are then cancelled.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        for path, check_fns in tasks:
+            yield path, _check_file(path, check_fns)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=_mp_context())
+    try:
+        futures = {pool.submit(_check_file, path, check_fns): path for path, check_fns in tasks}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run_parallel_checks(
+    md_files: List[Path],
+    checks: List[LintCheck],
+    workers: int = DEFAULT_WORKERS,
+    on_file: Optional[Callable[[Path, list], None]] = None,
+    fail_fast: bool = False,
+) -> List[list]:
+    """Run several linters' *checks* on each file in parallel.
+
+    A file is one task, running every check on it in the same worker
+    process, so the linters share one Pandoc parse of the file.  Files are
+    checked in up to *workers* worker processes, so that the JSON decoding
+    and tree walking after each parse run in parallel too; the check
+    functions and the violations must therefore be picklable (module-level
+    functions or functools.partial of them).  The workers live for this
+    call only and take files from one queue, so a slow file holds up a
+    single worker.  With a single file or worker, the checks run in this
+    process.  Checks from LintResultsCache.wrap are answered here for the
+    files they have cached, which are only sent to a worker for the other
+    checks, if any.
+
+    *on_file* is called with each file and the violations of all checks
+    as soon as the file is done (fully cached files first).  With
+    *fail_fast*, no more files are checked once one has violations.
+    Returns the violations of each check, sorted by its sort_key.
+    """
+    results: List[list] = [[] for _ in checks]
+
+    def finish(path: Path, found: Dict[int, list]) -> bool:
+        for index, violations in found.items():
+            results[index].extend(violations)
+        violations = [v for index in sorted(found) for v in found[index]]
+        if on_file is not None:
+            on_file(path, violations)
+        return fail_fast and bool(violations)
+
+    # path -> (violations found so far, cache key of each check still to run)
+    pending: Dict[Path, Tuple[Dict[int, list], Dict[int, Optional[str]]]] = {}
+    stopped = False
+    for path in md_files:
+        found: Dict[int, list] = {}
+        keys: Dict[int, Optional[str]] = {}
+        for index, check in enumerate(checks):
+            cached = check.check_fn if isinstance(check.check_fn, _CachedCheck) else None
+            key = cached.key(path) if cached is not None else None
+            violations = cached.lookup(path, key) if key is not None else None
+            if violations is None:
+                keys[index] = key
+            else:
+                found[index] = violations
+        if keys:
+            pending[path] = (found, keys)
+        elif finish(path, found):
+            stopped = True
+            break
+
+    if not stopped:
+        def check_fn(index: int) -> Callable:
+            fn = checks[index].check_fn
+            return fn.check_fn if isinstance(fn, _CachedCheck) else fn
+
+        tasks = [(path, [check_fn(index) for index in keys]) for path, (_, keys) in pending.items()]
+        checked = _checked_files(tasks, workers)
+        try:
+            for path, violations_per_check in checked:
+                found, keys = pending[path]
+                for (index, key), violations in zip(keys.items(), violations_per_check):
+                    if key is not None:
+                        checks[index].check_fn.store(path, key, violations)
+                    found[index] = violations
+                if finish(path, found):
+                    break
+        finally:
+            checked.close()
+
+    for check, violations in zip(checks, results):
+        violations.sort(key=check.sort_key)
+    return results
+
+
 def run_parallel_check(
     md_files: List[Path],
     check_fn: Callable,
     sort_key: Callable,
     workers: int = DEFAULT_WORKERS,
+    on_file: Optional[Callable[[Path, list], None]] = None,
+    fail_fast: bool = False,
 ) -> list:
     """Run *check_fn* on each file in parallel and return sorted results.
 
-    *check_fn* is called with a single ``Path`` argument and must return
-    a list of violation objects.  Results are concatenated, sorted by
-    *sort_key*, and returned.
+    The single-linter form of run_parallel_checks: *check_fn* is called
+    with a single ``Path`` argument and must return a list of violation
+    objects, which are concatenated, sorted by *sort_key*, and returned.
+    *workers*, *on_file* and *fail_fast* are as for run_parallel_checks.
+    """
+    [violations] = run_parallel_checks(
+        md_files, [LintCheck(check_fn, sort_key)], workers, on_file, fail_fast,
+    )
+    return violations
+
+
+def progress_reporter(spec_root: Path, write: Callable[[str], None]) -> Callable[[Path, list], None]:
+    """Return an ``on_file`` callback for run_parallel_check that reports as it goes.
+
+    The callback passes ``<file>: <n> violation(s)`` to *write* for every
+    file with violations, the file shown relative to *spec_root*, so that
+    long runs show their findings before the final, sorted report.
+    """
+    def report(path: Path, violations: list) -> None:
+        if violations:
+            shown = os.path.relpath(path, spec_root) if Path(spec_root).is_dir() else path
+            write(f"{shown}: {len(violations)} violation(s)")
+
+    return report
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """Replace the file at *path* with *text*, keeping its permissions.
+
+    The text is written to a temporary file that is then renamed over
+    *path*, so an interrupted write never leaves a truncated file.
     """
-    all_violations: list = []
-    with ThreadPoolExecutor(max_workers=workers) as pool:
-        futures = {pool.submit(check_fn, p): p for p in md_files}
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_text(text, encoding="utf-8")
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _fix_file_lines(path: Path, edits: List[Tuple[int, int, Callable[[str], str]]], fixer_count: int) -> List[int]:
+    """Apply *edits* ``(lineno, fixer index, fix_line)`` to *path* in one write.
+
+    Returns the number of lines each fixer changed.
+    """
+    lines = Path(path).read_text(encoding="utf-8").splitlines(keepends=True)
+    fixed = [0] * fixer_count
+    done = set()
+    for lineno, index, fix_line in sorted(edits, key=lambda edit: edit[:2]):
+        idx = lineno - 1
+        if (lineno, index) in done or idx < 0 or idx >= len(lines):
+            continue
+        done.add((lineno, index))
+        original = lines[idx].rstrip('\n')
+        trailing = lines[idx][len(original):]
+        converted = fix_line(original)
+        if converted != original:
+            lines[idx] = converted + trailing
+            fixed[index] += 1
+
+    if any(fixed):
+        write_text_atomic(path, ''.join(lines))
+    return fixed
+
+
+def apply_line_fixes(fixers: List[LineFixer], workers: int = DEFAULT_WORKERS) -> List[Tuple[int, int]]:
+    """Fix the violations of several linters, reading and writing each file once.
+
+    Every fix edits a single line in place, so the line numbers of all
+    *fixers*' violations stay valid whichever fixes are applied first:
+    violations found by several linters on the same content (one parse per
+    file, see parse_markdown) are fixed together, without checking the
+    file again between linters.  Each file is written atomically
+    (write_text_atomic), and files are fixed in up to *workers* threads.
+
+    Returns ``(files_fixed, lines_fixed)`` for each of *fixers*.
+    """
+    by_file: Dict[Path, List[Tuple[int, int, Callable[[str], str]]]] = {}
+    for index, (violations, fix_line) in enumerate(fixers):
+        for v in violations:
+            by_file.setdefault(v.file, []).append((v.lineno, index, fix_line))
+
+    totals = [(0, 0)] * len(fixers)
+    if not by_file:
+        return totals
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(by_file)))) as pool:
+        futures = [pool.submit(_fix_file_lines, path, edits, len(fixers)) for path, edits in by_file.items()]
         for future in as_completed(futures):
-            all_violations.extend(future.result())
-    all_violations.sort(key=sort_key)
-    return all_violations
+            totals = [
+                (files + bool(n), lines + n)
+                for (files, lines), n in zip(totals, future.result())
+            ]
+    return totals
+
+
+def _block_attr(block: dict) -> Optional[list]:
+    """Return the Attr of a top-level block of a +sourcepos AST, if it has one."""
+    if block.get("t") == "Header":
+        return block["c"][1]
+    if block.get("t") in ("Div", "CodeBlock", "Table", "Figure"):
+        return block["c"][0]
+    return None
+
+
+def _shift_sourcepos(attr: list, delta: int) -> list:
+    """Return a copy of *attr* with the lines of its ``data-pos`` moved by *delta*."""
+    def shift(point: str) -> str:
+        line, _, column = point.partition(":")
+        return f"{int(line) + delta}:{column}"
+
+    pairs = []
+    for key, val in attr[2]:
+        if key == "data-pos":
+            prefix, _, pos = val.rpartition("@")
+            val = ";".join(
+                "-".join(shift(point) for point in span.split("-"))
+                for span in pos.split(";")
+            )
+            val = f"{prefix}@{val}" if prefix else val
+        pairs.append([key, val])
+    return [attr[0], attr[1], pairs]
+
+
+def split_doc_by_source(doc: dict, source_map) -> Dict[str, dict]:
+    """Split a flattened document into the documents of its source files.
+
+    *doc* is the LINT_MARKDOWN_FORMAT AST of a file flattened from several
+    Markdown files, and *source_map* its doc_build.source_map.SourceMap.
+    Returns ``{source: doc}`` with the top-level blocks of each source, in
+    order, their ``data-pos`` translated to lines of that source.  Where
+    other sources were inlined between two blocks of a source (in place of
+    its link to them), an empty Para stands for the link paragraph.
+    Generated blocks (legal intro and outro) belong to no source.
+    """
+    docs: Dict[str, dict] = {}
+    previous: Optional[str] = None
+    for block in doc["blocks"]:
+        attr = _block_attr(block)
+        line = get_sourcepos(attr) if attr is not None else None
+        location = source_map.locate(line) if line is not None else None
+        if location is None:
+            previous = None
+            continue
+        source, source_line = location
+        blocks = docs.setdefault(source, {**doc, "blocks": []})["blocks"]
+        if blocks and previous != source:
+            blocks.append({"t": "Para", "c": []})
+        block = dict(block)
+        block["c"] = list(block["c"])
+        block["c"][1 if block["t"] == "Header" else 0] = _shift_sourcepos(attr, source_line - line)
+        blocks.append(block)
+        previous = source
+    return docs
+
+
+def check_flattened(
+    doc: dict,
+    source_map,
+    check_fn: Callable,
+    sort_key: Callable,
+    artifacts_dir: Path,
+    spec_root: Path,
+) -> list:
+    """Run a linter's *check_fn* on the sources of a flattened document.
+
+    *doc* and *source_map* are as for split_doc_by_source; the sources are
+    files in *artifacts_dir*, copied from *spec_root*.  *check_fn* is called
+    as ``check_fn(path, doc=...)`` with the part of *doc* each source
+    contributed, so no source is parsed again, and the violations are
+    reported against the file in *spec_root*, sorted by *sort_key*.
+    """
+    violations: list = []
+    for source, source_doc in split_doc_by_source(doc, source_map).items():
+        spec_file = Path(os.path.normpath(Path(spec_root) / source))
+        for v in check_fn(Path(artifacts_dir) / source, doc=source_doc):
+            violations.append(dataclasses.replace(v, file=spec_file))
+    violations.sort(key=sort_key)
+    return violations
 
 
 def get_sourcepos(attr: list) -> Optional[int]:
@@ -121,7 +775,7 @@ def format_report(
 
     by_file: dict = {}
     for v in violations:
-        rel = v.file.relative_to(spec_root) if spec_root else v.file
+        rel = v.file.relative_to(spec_root) if spec_root and v.file.is_relative_to(spec_root) else v.file
         by_file.setdefault(rel, []).append(v)
 
     sections: List[str] = []
@@ -0,0 +1,192 @@
+"""Optional ``pandoc server`` backend for filter-free conversions.
+
+Every pandoc subprocess pays the startup of the Haskell runtime, which adds
+up when the ISO linters parse each specification file and the builder
+parses the combined spec several times.  ``pandoc server`` converts text
+sent as JSON over HTTP instead, with a single process for the whole build.
+
+PandocServer starts the server on a free localhost port and publishes its
+URL in the PANDOC_SERVER_ENV environment variable for the duration of a
+``with`` block.  convert() sends a conversion to that server over a
+per-thread keep-alive connection and returns None whenever it cannot (no
+server running, server gone, conversion rejected), so every caller keeps
+its subprocess call as the fallback.  A request that fails on a kept-alive
+connection is retried once on a fresh one, since the server may have
+closed the connection while it was idle; only a server that fails that
+too is given up on for the rest of the process.
+
+The server neither runs filters nor reads or writes files, so only plain
+text-to-text conversions (e.g. Markdown to the JSON AST) can use it.
+"""
+
+import contextlib
+import http.client
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Environment variable holding the URL of the running server, if any.
+PANDOC_SERVER_ENV = "AOUSD_PANDOC_SERVER"
+
+# Seconds a single conversion may take on the server (pandoc's default is 2,
+# too short for the combined spec).
+CONVERSION_TIMEOUT = 120
+
+# Seconds to wait for a freshly started server to answer.
+STARTUP_TIMEOUT = 10
+
+_local = threading.local()
+# Server URLs that failed a request on a fresh connection; they are not
+# tried again.
+_dead_urls = set()
+
+
+def _connection(url: str) -> http.client.HTTPConnection:
+    """Return this thread's keep-alive connection to the server at *url*."""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    if url not in connections:
+        parts = urlsplit(url)
+        connections[url] = http.client.HTTPConnection(
+            parts.hostname, parts.port, timeout=CONVERSION_TIMEOUT + 10
+        )
+    return connections[url]
+
+
+def _request(url: str, method: str, path: str, body: Optional[bytes] = None):
+    """Send one request to *url* and return ``(status, body)``."""
+    connection = _connection(url)
+    headers = {"Accept": "application/json"}
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+    try:
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.read()
+    except (OSError, http.client.HTTPException):
+        connection.close()
+        raise
+
+
+def convert(text: str, from_format: str, to_format: str, **options) -> Optional[str]:
+    """Convert *text* with the server named in PANDOC_SERVER_ENV.
+
+    *options* are further fields of the server's JSON request (``wrap``,
+    ``standalone``, ...).  Returns the converted text, or None if there is
+    no usable server or it did not convert the text; the caller then runs
+    pandoc as a subprocess.
+    """
+    url = os.environ.get(PANDOC_SERVER_ENV)
+    if not url or url in _dead_urls:
+        return None
+
+    request = json.dumps(dict(options, text=text, **{"from": from_format, "to": to_format}))
+    for attempt in range(2):
+        try:
+            status, body = _request(url, "POST", "/", request.encode("utf-8"))
+            break
+        except (OSError, http.client.HTTPException):
+            # _request closed the connection, so a retry opens a fresh one.
+            if attempt:
+                _dead_urls.add(url)
+                return None
+    if status != 200:
+        return None
+
+    try:
+        result = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(result, dict) or result.get("base64") or "output" not in result:
+        return None
+    return result["output"]
+
+
+def _free_port() -> int:
+    with contextlib.closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class PandocServer:
+    """A ``pandoc server`` process for the duration of a ``with`` block.
+
+    If the server cannot be started or does not answer, the block runs
+    anyway and every conversion falls back to a pandoc subprocess.
+    """
+
+    def __init__(self, binary: str = "pandoc"):
+        self.binary = binary
+        self.url: Optional[str] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._previous_env: Optional[str] = None
+
+    def start(self) -> bool:
+        """Start the server and wait until it answers; returns whether it did."""
+        port = _free_port()
+        try:
+            self._process = subprocess.Popen(
+                [
+                    self.binary, "server",
+                    "--port", str(port),
+                    "--timeout", str(CONVERSION_TIMEOUT),
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            return False
+
+        url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline and self._process.poll() is None:
+            try:
+                # A real conversion, not just /version: some pandoc builds
+                # accept connections but fail every conversion.
+                status, body = _request(
+                    url, "POST", "/", json.dumps({"text": "x", "from": "markdown", "to": "plain"}).encode()
+                )
+                if status == 200 and json.loads(body).get("output", "").strip() == "x":
+                    self.url = url
+                    self._previous_env = os.environ.get(PANDOC_SERVER_ENV)
+                    os.environ[PANDOC_SERVER_ENV] = url
+                    return True
+                break
+            except (OSError, http.client.HTTPException, ValueError, AttributeError):
+                time.sleep(0.05)
+
+        self.stop()
+        return False
+
+    def stop(self) -> None:
+        """Stop the server and withdraw its URL from the environment."""
+        if self.url is not None:
+            if self._previous_env is None:
+                os.environ.pop(PANDOC_SERVER_ENV, None)
+            else:
+                os.environ[PANDOC_SERVER_ENV] = self._previous_env
+            connections = getattr(_local, "connections", {})
+            if self.url in connections:
+                connections.pop(self.url).close()
+            self.url = None
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+
+    def __enter__(self) -> "PandocServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,442 @@
+"""Static pre-checks for the PDF build: glyph coverage and monospace overflow.
+
+XeTeX silently drops any character the selected font has no glyph for; the
+PDF quality gate only learns about it from tectonic's "Missing character"
+warnings, after the whole document has been typeset.  This module predicts
+those warnings before any PDF work starts: it reads the cmap tables of the
+bundled fonts (formats 4 and 12, enough for the DejaVu TrueType files),
+walks the Pandoc AST of the combined spec assigning each piece of text the
+font face the LaTeX template typesets it in, and reports every character
+that face cannot render, with the source ``file:line`` of each occurrence.
+
+Font roles mirror doc_build/template/after-header-includes.latex:
+  serif  body text (DejaVuSerif, with its bold/italic faces)
+  mono   inline code and code blocks (DejaVuSansMono)
+  math   inline and display math (DejaVuMathTeXGyre)
+
+Code-point sets are cached in a JSON file keyed by font path, size and
+mtime, so a build only parses a font again after it changed.
+
+predict_overflows() does the same for right-margin overflow, the other
+defect the gate checks: code block lines are measured with the advance
+width of DejaVu Sans Mono at the size and scale the template sets it in,
+and railroad diagrams with the width filter_railroad gives their images.
+"""
+
+import json
+import os
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# (bold, italic) -> font file, per role.
+FONT_ROLES = {
+    "serif": {
+        (False, False): "DejaVuSerif.ttf",
+        (True, False): "DejaVuSerif-Bold.ttf",
+        (False, True): "DejaVuSerif-Italic.ttf",
+        (True, True): "DejaVuSerif-BoldItalic.ttf",
+    },
+    "mono": {
+        (False, False): "DejaVuSansMono.ttf",
+        (True, False): "DejaVuSansMono-Bold.ttf",
+        (False, True): "DejaVuSansMono-Oblique.ttf",
+        (True, True): "DejaVuSansMono-BoldOblique.ttf",
+    },
+    "math": {
+        (False, False): "DejaVuMathTeXGyre.ttf",
+        (True, False): "DejaVuMathTeXGyre.ttf",
+        (False, True): "DejaVuMathTeXGyre.ttf",
+        (True, True): "DejaVuMathTeXGyre.ttf",
+    },
+}
+
+# Page geometry of the LaTeX build, in TeX points: US letter (the article
+# class default) less the 1in margins DocBuilder sets (geometry:margin=1in).
+TEXT_WIDTH_PT = (8.5 - 2 * 1.0) * 72.27
+# Code blocks are wrapped in \small by filter_smaller_listings: 9pt at the
+# 10pt document size.
+CODE_FONT_SIZE_PT = 9.0
+# Indent each enclosing list or block quote adds (\leftmargini, 2.5em).
+NESTING_INDENT_PT = 25.0
+
+# Unicode cmap subtables, in (platformID, encodingID) terms.
+_UNICODE_ENCODINGS = {(0, 3), (0, 4), (0, 6), (3, 1), (3, 10)}
+
+
+def _cmap_format_4(data: bytes, offset: int) -> Dict[int, int]:
+    seg_count = struct.unpack_from(">H", data, offset + 6)[0] // 2
+    ends_at = offset + 14
+    starts_at = ends_at + 2 * seg_count + 2
+    deltas_at = starts_at + 2 * seg_count
+    range_offsets_at = deltas_at + 2 * seg_count
+
+    ends = struct.unpack_from(f">{seg_count}H", data, ends_at)
+    starts = struct.unpack_from(f">{seg_count}H", data, starts_at)
+    deltas = struct.unpack_from(f">{seg_count}h", data, deltas_at)
+    range_offsets = struct.unpack_from(f">{seg_count}H", data, range_offsets_at)
+
+    glyphs = {}
+    for i, (start, end, delta, range_offset) in enumerate(zip(starts, ends, deltas, range_offsets)):
+        if start == 0xFFFF:
+            continue
+        for c in range(start, end + 1):
+            if range_offset == 0:
+                glyph = (c + delta) & 0xFFFF
+            else:
+                # idRangeOffset is relative to its own slot in the array.
+                glyph_at = range_offsets_at + 2 * i + range_offset + 2 * (c - start)
+                if glyph_at + 2 > len(data):
+                    continue
+                glyph = struct.unpack_from(">H", data, glyph_at)[0]
+                if glyph:
+                    glyph = (glyph + delta) & 0xFFFF
+            if glyph:
+                glyphs[c] = glyph
+    return glyphs
+
+
+def _cmap_format_12(data: bytes, offset: int) -> Dict[int, int]:
+    group_count = struct.unpack_from(">I", data, offset + 12)[0]
+    glyphs = {}
+    for group in range(group_count):
+        start, end, start_glyph = struct.unpack_from(">3I", data, offset + 16 + 12 * group)
+        for c in range(start, end + 1):
+            if start_glyph + c - start:
+                glyphs[c] = start_glyph + c - start
+    return glyphs
+
+
+def _table_offsets(data: bytes) -> Dict[bytes, int]:
+    table_count = struct.unpack_from(">H", data, 4)[0]
+    offsets = {}
+    for i in range(table_count):
+        tag, _checksum, offset, _length = struct.unpack_from(">4sIII", data, 12 + 16 * i)
+        offsets[tag] = offset
+    return offsets
+
+
+def _read_cmap_glyphs(data: bytes, tables: Dict[bytes, int]) -> Dict[int, int]:
+    cmap_offset = tables.get(b"cmap")
+    if cmap_offset is None:
+        raise ValueError("font has no cmap table")
+
+    subtable_count = struct.unpack_from(">H", data, cmap_offset + 2)[0]
+    glyphs = {}
+    for i in range(subtable_count):
+        platform, encoding, offset = struct.unpack_from(">HHI", data, cmap_offset + 4 + 8 * i)
+        if (platform, encoding) not in _UNICODE_ENCODINGS:
+            continue
+        subtable = cmap_offset + offset
+        fmt = struct.unpack_from(">H", data, subtable)[0]
+        if fmt == 4:
+            glyphs.update(_cmap_format_4(data, subtable))
+        elif fmt == 12:
+            glyphs.update(_cmap_format_12(data, subtable))
+    return glyphs
+
+
+def read_cmap(path) -> Set[int]:
+    """Return the code points the TrueType/OpenType font at *path* has glyphs for."""
+    data = Path(path).read_bytes()
+    return set(_read_cmap_glyphs(data, _table_offsets(data)))
+
+
+@lru_cache(maxsize=None)
+def read_font_metrics(path) -> Tuple[float, float]:
+    """Return ``(advance, x_height)`` of the TrueType font at *path*, in ems.
+
+    *advance* is the advance width of "0" (that of every glyph of a
+    monospaced font) and *x_height* the height of "x", which fontspec's
+    ``Scale=MatchLowercase`` matches between fonts.
+    """
+    data = Path(path).read_bytes()
+    tables = _table_offsets(data)
+    glyphs = _read_cmap_glyphs(data, tables)
+    units_per_em = struct.unpack_from(">H", data, tables[b"head"] + 18)[0]
+    long_loca = struct.unpack_from(">h", data, tables[b"head"] + 50)[0]
+    metric_count = struct.unpack_from(">H", data, tables[b"hhea"] + 34)[0]
+
+    zero = glyphs[ord("0")]
+    advance = struct.unpack_from(">H", data, tables[b"hmtx"] + 4 * min(zero, metric_count - 1))[0]
+
+    x = glyphs[ord("x")]
+    if long_loca:
+        glyph_offset = struct.unpack_from(">I", data, tables[b"loca"] + 4 * x)[0]
+    else:
+        glyph_offset = 2 * struct.unpack_from(">H", data, tables[b"loca"] + 2 * x)[0]
+    y_max = struct.unpack_from(">h", data, tables[b"glyf"] + glyph_offset + 8)[0]
+    return advance / units_per_em, y_max / units_per_em
+
+
+def _to_ranges(codepoints: Iterable[int]) -> List[List[int]]:
+    ranges = []
+    for c in sorted(codepoints):
+        if ranges and ranges[-1][1] == c - 1:
+            ranges[-1][1] = c
+        else:
+            ranges.append([c, c])
+    return ranges
+
+
+def _from_ranges(ranges) -> frozenset:
+    return frozenset(c for start, end in ranges for c in range(start, end + 1))
+
+
+@lru_cache(maxsize=None)
+def _font_coverage(path: str, size: int, mtime_ns: int) -> frozenset:
+    return frozenset(read_cmap(path))
+
+
+def load_font_coverage(font_files: Iterable[Path], cache_path: Optional[Path] = None) -> Dict[str, frozenset]:
+    """Return ``{file name: code points}`` for *font_files*.
+
+    Sets are memoised per process and, with *cache_path*, kept in a JSON
+    cache so unchanged fonts are not parsed again by later builds.
+    """
+    cached = {}
+    if cache_path is not None:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+
+    coverage = {}
+    changed = False
+    for font_file in font_files:
+        font_file = Path(font_file)
+        st = font_file.stat()
+        key = str(font_file.resolve())
+        signature = [st.st_size, st.st_mtime_ns]
+        entry = cached.get(key)
+        if entry is not None and entry["signature"] == signature:
+            coverage[font_file.name] = _from_ranges(entry["ranges"])
+            continue
+        codepoints = _font_coverage(key, st.st_size, st.st_mtime_ns)
+        coverage[font_file.name] = codepoints
+        cached[key] = {"signature": signature, "ranges": _to_ranges(codepoints)}
+        changed = True
+
+    if changed and cache_path is not None:
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(cached), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    return coverage
+
+
+def collect_text_by_font(ast: dict) -> Dict[str, Set[str]]:
+    """Return ``{font file: characters}`` for the text of a Pandoc JSON *ast*.
+
+    Each piece of text is attributed to the face its role and the enclosing
+    Strong/Emph nodes select.  Raw LaTeX/HTML and metadata are not scanned;
+    in math only non-ASCII characters count, as ASCII is TeX markup.
+    """
+    chars: Dict[str, Set[str]] = {}
+
+    def add(text: str, role: str, bold: bool, italic: bool) -> None:
+        if role == "math":
+            text = "".join(c for c in text if ord(c) > 0x7F)
+        if text:
+            chars.setdefault(FONT_ROLES[role][(bold, italic)], set()).update(text)
+
+    def visit(node, bold: bool, italic: bool) -> None:
+        if isinstance(node, list):
+            for item in node:
+                visit(item, bold, italic)
+            return
+        if not isinstance(node, dict):
+            return
+
+        node_type = node.get("t")
+        content = node.get("c")
+        if node_type == "Str":
+            add(content, "serif", bold, italic)
+        elif node_type == "Code":
+            add(content[1], "mono", bold, italic)
+        elif node_type == "CodeBlock":
+            # filter_convert_mathblocks typesets ```math blocks as display math.
+            role = "math" if content[0][1][:1] == ["math"] else "mono"
+            add(content[1], role, False, False)
+        elif node_type == "Math":
+            add(content[1], "math", False, False)
+        elif node_type in ("RawInline", "RawBlock"):
+            return
+        elif node_type == "Strong":
+            visit(content, True, italic)
+        elif node_type == "Emph":
+            visit(content, bold, not italic)
+        elif content is not None:
+            visit(content, bold, italic)
+
+    visit(ast.get("blocks", []), False, False)
+    return chars
+
+
+def find_missing_glyphs(ast: dict, font_dirs: Iterable[Path], cache_path: Optional[Path] = None) -> Dict[str, Set[str]]:
+    """Return ``{character: {font file, ...}}`` for every character of *ast*
+    the face it is typeset in has no glyph for.
+
+    Whitespace and control characters are never reported.
+    """
+    font_files = {}
+    for font_dir in font_dirs:
+        for path in Path(font_dir).glob("*.ttf"):
+            font_files.setdefault(path.name, path)
+
+    text_by_font = collect_text_by_font(ast)
+    coverage = load_font_coverage(
+        [font_files[name] for name in text_by_font if name in font_files], cache_path
+    )
+
+    missing: Dict[str, Set[str]] = {}
+    for font_name, text in text_by_font.items():
+        codepoints = coverage.get(font_name)
+        if codepoints is None:
+            continue
+        for c in text:
+            if c.isspace() or ord(c) < 0x20:
+                continue
+            if ord(c) not in codepoints:
+                missing.setdefault(c, set()).add(font_name)
+    return missing
+
+
+def locate_characters(text: str, chars: Iterable[str]) -> Dict[str, List[int]]:
+    """Return ``{character: [line, ...]}`` (1-based) of each of *chars* in *text*."""
+    wanted = set(chars)
+    lines: Dict[str, List[int]] = {c: [] for c in wanted}
+    for line_number, line in enumerate(text.splitlines(), 1):
+        for c in wanted.intersection(line):
+            lines[c].append(line_number)
+    return lines
+
+
+def format_report(missing: Dict[str, Set[str]], locations: Dict[str, List[str]], limit: int = 5) -> str:
+    """Format *missing* (find_missing_glyphs) with the ``file:line`` *locations*
+    of each character, listing at most *limit* locations per character."""
+    report = []
+    for c in sorted(missing):
+        fonts = ", ".join(sorted(missing[c]))
+        where = locations.get(c, [])
+        shown = ", ".join(where[:limit])
+        if len(where) > limit:
+            shown += f", ... and {len(where) - limit} more"
+        report.append(f"    U+{ord(c):04X} {c!r} not in {fonts}: {shown or '(location unknown)'}")
+    return "\n".join(report)
+
+
+class Overflow(NamedTuple):
+    """A line or diagram predicted to run *excess_pt* past the right margin."""
+
+    excess_pt: float
+    kind: str  # "code" or "railroad"
+    text: str  # the offending line (first line of the block, for a diagram)
+
+
+def mono_char_width(fonts_dir: Path, size_pt: float = CODE_FONT_SIZE_PT) -> float:
+    """Return the width in points of a DejaVu Sans Mono character at *size_pt*.
+
+    The template loads the monospaced font with ``Scale=MatchLowercase``,
+    which scales it so its x-height matches that of the serif body font.
+    """
+    fonts_dir = Path(fonts_dir)
+    mono_advance, mono_x_height = read_font_metrics(fonts_dir / FONT_ROLES["mono"][(False, False)])
+    _serif_advance, serif_x_height = read_font_metrics(fonts_dir / FONT_ROLES["serif"][(False, False)])
+    return mono_advance * size_pt * serif_x_height / mono_x_height
+
+
+def predict_overflows(
+    ast: dict,
+    fonts_dir: Path,
+    railroad_width: Optional[Callable[[str], Optional[float]]] = None,
+    threshold_pt: float = 1.0,
+    text_width_pt: float = TEXT_WIDTH_PT,
+) -> List[Overflow]:
+    """Return the code lines and railroad diagrams of *ast* that would overflow
+    the right margin by at least *threshold_pt*, in document order.
+
+    *railroad_width* maps the code of a ``peg`` block to the width in points
+    of its diagram (None if there is none, see filter_railroad.
+    measure_diagrams); without it diagrams are not checked.  Code blocks
+    nested in lists or block quotes are indented by NESTING_INDENT_PT per
+    level.
+    """
+    char_width = mono_char_width(fonts_dir)
+    overflows = []
+
+    def check_code(classes, code, indent_pt):
+        is_peg = classes == ["peg"]
+        for line in code.split("\n"):
+            # filter_bold_in_pre turns **...** in peg blocks into bold text.
+            shown = line.replace("**", "") if is_peg else line
+            excess = indent_pt + len(shown.expandtabs(4)) * char_width - text_width_pt
+            if excess >= threshold_pt:
+                overflows.append(Overflow(excess, "code", line))
+
+        width = railroad_width(code) if is_peg and railroad_width is not None else None
+        if width is not None:
+            excess = indent_pt + width - text_width_pt
+            if excess >= threshold_pt:
+                first_line = next((line for line in code.split("\n") if line.strip()), "")
+                overflows.append(Overflow(excess, "railroad", first_line))
+
+    def visit(node, indent_pt):
+        if isinstance(node, list):
+            for item in node:
+                visit(item, indent_pt)
+            return
+        if not isinstance(node, dict):
+            return
+
+        node_type = node.get("t")
+        content = node.get("c")
+        if node_type == "CodeBlock":
+            # ```math blocks become display math (filter_convert_mathblocks).
+            if content[0][1][:1] != ["math"]:
+                check_code(content[0][1], content[1], indent_pt)
+        elif node_type in ("BulletList", "OrderedList", "BlockQuote", "DefinitionList"):
+            visit(content, indent_pt + NESTING_INDENT_PT)
+        elif content is not None:
+            visit(content, indent_pt)
+
+    visit(ast.get("blocks", []), 0.0)
+    return overflows
+
+
+def locate_lines_in_order(text: str, needles: Iterable[str]) -> List[Optional[int]]:
+    """Return the 1-based line of each of *needles* in *text*, or None.
+
+    Needles are searched for in order, each from the line of the previous
+    match on, so a line repeated across blocks resolves to the occurrence in
+    the block being reported (and one block's needles may share a line).
+    """
+    lines = text.splitlines()
+    found = []
+    cursor = 0
+    for needle in needles:
+        needle = needle.strip()
+        for index in range(cursor, len(lines)):
+            if needle in lines[index]:
+                found.append(index + 1)
+                cursor = index
+                break
+        else:
+            found.append(None)
+    return found
+
+
+def format_overflow_report(overflows: List[Overflow], locations: List[str], limit: int = 20) -> str:
+    """Format *overflows* (predict_overflows) with their ``file:line`` *locations*,
+    worst first, listing at most *limit*."""
+    ranked = sorted(zip(overflows, locations), key=lambda pair: pair[0].excess_pt, reverse=True)
+    report = []
+    for overflow, location in ranked[:limit]:
+        what = "railroad diagram" if overflow.kind == "railroad" else overflow.text.strip()
+        report.append(f"    {overflow.excess_pt:8.2f}pt  {location}  {what}")
+    if len(ranked) > limit:
+        report.append(f"    ... and {len(ranked) - limit} more")
+    return "\n".join(report)
@@ -0,0 +1,79 @@
+"""Line map from the combined spec back to the Markdown files it was built from.
+
+DocBuilder.flatten() inlines every section file into a single combined
+Markdown file, and preprocess_build() then wraps it in the legal intro and
+outro.  Anything that reports a location in the combined file (glyph
+pre-check, ISO checks on the build AST, ...) uses a SourceMap to translate
+it to the ``file:line`` an author would edit.
+
+The map is a sorted list of segments, each a run of consecutive combined
+lines that come from consecutive lines of one source file.  It is written
+next to the combined file as SOURCE_MAP_FILENAME.
+"""
+
+import bisect
+import json
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+SOURCE_MAP_FILENAME = "source_map.json"
+
+
+class SourceMap:
+    """Translate 1-based line numbers of the combined file to source locations."""
+
+    def __init__(self, segments: Optional[List[Tuple[int, str, int, int]]] = None):
+        # (combined_start, source, source_start, count), sorted by combined_start.
+        self.segments = [tuple(segment) for segment in segments or ()]
+
+    def add(self, combined_line: int, source: str, source_line: int, count: int = 1) -> None:
+        """Record that *count* lines from *combined_line* on come from *source*."""
+        if count <= 0:
+            return
+        if self.segments:
+            start, last_source, last_line, last_count = self.segments[-1]
+            if (
+                last_source == source
+                and start + last_count == combined_line
+                and last_line + last_count == source_line
+            ):
+                self.segments[-1] = (start, source, last_line, last_count + count)
+                return
+        self.segments.append((combined_line, source, source_line, count))
+
+    def shift(self, lines: int) -> None:
+        """Move every segment down by *lines* (text was prepended to the file)."""
+        self.segments = [
+            (start + lines, source, source_line, count)
+            for start, source, source_line, count in self.segments
+        ]
+
+    def locate(self, combined_line: int) -> Optional[Tuple[str, int]]:
+        """Return ``(source, line)`` for *combined_line*, or None if it was generated."""
+        index = bisect.bisect_right(self.segments, (combined_line, "￿")) - 1
+        if index < 0:
+            return None
+        start, source, source_line, count = self.segments[index]
+        if combined_line >= start + count:
+            return None
+        return source, source_line + combined_line - start
+
+    def format(self, combined_line: int) -> str:
+        """Return ``source:line`` for *combined_line*, falling back to the combined line."""
+        location = self.locate(combined_line)
+        if location is None:
+            return f"<combined>:{combined_line}"
+        return f"{location[0]}:{location[1]}"
+
+    def save(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.segments, f)
+
+    @classmethod
+    def load(cls, path: Path) -> "SourceMap":
+        """Load the map at *path*; an empty map if it does not exist."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            return cls()
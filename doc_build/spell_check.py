@@ -0,0 +1,147 @@
+"""Spell checks of specification sources, reported at their source ``file:line``.
+
+The words are the Str values of the linters' AST (iso_lint_utils.
+parse_markdown, so +sourcepos gives every inline its line); code, math and
+raw markup are never looked at.  All the words of the checked files are
+looked up together with filters/spelling.misspelled_words, so the spell
+checker runs once, on the words not already in the known-words store, if
+at all.
+
+check_flattened() checks the sources of the build's flattened spec from its
+single parse, mapping each word to its source through the build's source
+map, as the ISO linters do during a build; check_spec() parses each file.
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from doc_build.filters.spelling import DEFAULT_LANGUAGE, misspelled_words
+from doc_build.iso_lint_utils import (
+    collect_md_files,
+    format_report as _format_report,
+    parse_markdown,
+)
+
+
+@dataclass
+class Misspelling:
+    """A misspelled word in a Markdown file."""
+    file: Path
+    lineno: int
+    text: str           # the Str value, as written
+    words: List[str]    # the misspelled words in it
+
+    def format(self, *, display_path: Optional[Path] = None) -> str:
+        """Return ``file:line: text [word, ...]``."""
+        path = display_path if display_path is not None else self.file
+        return f"{path}:{self.lineno}: {self.text} [{', '.join(self.words)}]"
+
+
+def _line(attr: list) -> Optional[int]:
+    """Return the start line of a +sourcepos wrapper Attr."""
+    for key, val in attr[2]:
+        if key == "data-pos" and val:
+            return int(val.split("@")[-1].partition(":")[0])
+    return None
+
+
+def _strs(node, line: Optional[int] = None) -> Iterator[Tuple[str, Optional[int]]]:
+    """Yield ``(Str value, source line)`` for the Str inlines of *node*."""
+    if isinstance(node, list):
+        for item in node:
+            yield from _strs(item, line)
+        return
+    if not isinstance(node, dict):
+        return
+
+    t = node.get("t")
+    if t == "Str":
+        yield node["c"], line
+    elif t == "Span":
+        # +sourcepos wraps every inline in a Span giving its position.
+        yield from _strs(node["c"][1], _line(node["c"][0]) or line)
+    elif t not in ("Code", "CodeBlock", "Math", "RawInline", "RawBlock"):
+        yield from _strs(node.get("c"), line)
+
+
+def _check(
+    occurrences: List[Tuple[Path, int, str]],
+    store_path,
+    project_words: Iterable[str],
+    language: str,
+) -> List[Misspelling]:
+    """Return the misspellings among ``(file, line, Str value)`` *occurrences*, sorted."""
+    found = misspelled_words(
+        (text for _, _, text in occurrences), language, store_path, project_words
+    )
+    misspellings = [
+        Misspelling(file=path, lineno=line, text=text, words=found[text])
+        for path, line, text in occurrences
+        if text in found
+    ]
+    misspellings.sort(key=lambda m: (str(m.file), m.lineno))
+    return misspellings
+
+
+def check_docs(
+    docs: Dict[Path, dict],
+    store_path=None,
+    project_words: Iterable[str] = (),
+    language: str = DEFAULT_LANGUAGE,
+) -> List[Misspelling]:
+    """Return the misspellings of the ``{path: AST}`` *docs*, sorted.
+
+    *store_path*, *project_words* and *language* are as for
+    spelling.misspelled_words, which checks the words of all *docs* at once.
+    """
+    occurrences = [
+        (path, line or 0, text)
+        for path, doc in docs.items()
+        for text, line in _strs(doc["blocks"])
+    ]
+    return _check(occurrences, store_path, project_words, language)
+
+
+def check_flattened(
+    doc: dict,
+    source_map,
+    spec_root: Path,
+    store_path=None,
+    project_words: Iterable[str] = (),
+    language: str = DEFAULT_LANGUAGE,
+) -> List[Misspelling]:
+    """Spell check the sources of a flattened document, reported in *spec_root*.
+
+    *doc* is the LINT_MARKDOWN_FORMAT AST of the flattened file and
+    *source_map* its doc_build.source_map.SourceMap.  Words of generated
+    text (legal intro and outro) belong to no source and are not checked.
+    """
+    occurrences = []
+    for text, line in _strs(doc["blocks"]):
+        location = source_map.locate(line) if line is not None else None
+        if location is not None:
+            source, source_line = location
+            occurrences.append((Path(os.path.normpath(Path(spec_root) / source)), source_line, text))
+    return _check(occurrences, store_path, project_words, language)
+
+
+def check_spec(
+    spec_root: Path,
+    files: Optional[List[Path]] = None,
+    store_path=None,
+    project_words: Iterable[str] = (),
+) -> List[Misspelling]:
+    """Spell check the .md files under *spec_root* (only *files*, if given)."""
+    docs = {}
+    for path in collect_md_files(spec_root, only=files):
+        doc = parse_markdown(path)
+        if doc is not None:
+            docs[path] = doc
+    return check_docs(docs, store_path, project_words)
+
+
+def format_report(misspellings: List[Misspelling], spec_root: Optional[Path] = None) -> str:
+    """Format *misspellings* per file; file paths relative to *spec_root* if given."""
+    return _format_report(misspellings, "spelling", spec_root=spec_root)
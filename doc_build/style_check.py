@@ -0,0 +1,260 @@
+"""Prose style checks for specification sources: weasel words, passive voice, repeated words.
+
+Each Markdown file is parsed with the linters' reader (iso_lint_utils.
+parse_markdown, so +sourcepos gives every inline its ``line:column``), and
+the words of its text are checked in a single pass.  Code, math and raw
+markup are never looked at, and a block boundary or inline code ends the
+run of words a phrase or a repeated word can span.
+
+Words are matched against precompiled sets rather than regexes:
+  weasel     WEASEL_PHRASES, one- or multi-word, found by a token trie
+  irregular  passive voice, a form of "to be" (BE_VERBS) followed by a
+             past participle: a word ending in "ed" or one of
+             IRREGULAR_PARTICIPLES
+  duplicate  the same word twice in a row (case-insensitive)
+
+check_spec() checks files in parallel (iso_lint_utils.run_parallel_check)
+and every StyleIssue is reported at its source ``file:line``.
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from doc_build.iso_lint_utils import (
+    DEFAULT_WORKERS,
+    collect_md_files,
+    format_report as _format_report,
+    parse_markdown,
+    run_parallel_check,
+)
+
+WEASEL_PHRASES = frozenset(
+    tuple(phrase.split())
+    for phrase in (
+        "many", "various", "very", "fairly", "several", "extremely",
+        "exceedingly", "quite", "remarkably", "few", "surprisingly", "mostly",
+        "largely", "huge", "tiny", "are a number", "is a number", "excellent",
+        "interestingly", "significantly", "substantially", "clearly", "vast",
+        "relatively", "completely",
+    )
+)
+
+BE_VERBS = frozenset({"am", "are", "were", "being", "is", "been", "was", "be"})
+
+IRREGULAR_PARTICIPLES = frozenset("""
+    awoken been born beat become begun bent beset bet bid bidden bound bitten
+    bled blown broken bred brought broadcast built burnt burst bought cast
+    caught chosen clung come cost crept cut dealt dug dived done drawn dreamt
+    driven drunk eaten fallen fed felt fought found fit fled flung flown
+    forbidden forgotten foregone forgiven forsaken frozen gotten given gone
+    ground grown hung heard hidden hit held hurt kept knelt knit known laid
+    led leapt learnt left lent let lain lighted lost made meant met misspelt
+    mistaken mown overcome overdone overtaken overthrown paid pled proven
+    put quit read rid ridden rung risen run sawn said seen sought sold sent
+    set sewn shaken shaven shorn shed shone shod shot shown shrunk shut sung
+    sunk sat slept slain slid slung slit smitten sown spoken sped spent spilt
+    spun spit split spread sprung stood stolen stuck stung stunk stridden
+    struck strung striven sworn swept swollen swum swung taken taught torn
+    told thought thrived thrown thrust trodden understood upheld upset woken
+    worn woven wed wept wound won withheld withstood wrung written
+""".split())
+
+# ANSI colour of each kind of issue, as in the stylecheck legend.
+COLORS = {"weasel": "\033[91m", "irregular": "\033[95m", "duplicate": "\033[93m"}
+_RESET = "\033[0m"
+
+# Inlines and blocks whose text is not prose.
+_SKIPPED_TYPES = frozenset({"Code", "CodeBlock", "Math", "RawInline", "RawBlock"})
+# Inlines that separate words without ending a run.
+_SPACE_TYPES = frozenset({"Space", "SoftBreak", "LineBreak"})
+# Nodes that end a run of words: blocks, and footnotes (text from elsewhere).
+_BREAK_TYPES = frozenset({
+    "Plain", "Para", "LineBlock", "BlockQuote", "OrderedList", "BulletList",
+    "DefinitionList", "Header", "HorizontalRule", "Table", "Figure", "Div",
+    "Note",
+})
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]+")
+_WORD_RE = re.compile(r"\w")
+_PARTICIPLE_RE = re.compile(r"^\w+ed$", re.IGNORECASE)
+
+
+@dataclass
+class StyleIssue:
+    """A style issue in a Markdown file."""
+    file: Path
+    lineno: int
+    column: int                 # 1-based column of the first word
+    end_column: Optional[int]   # column after the last word, None if on a later line
+    kind: str                   # "weasel", "irregular" or "duplicate"
+    text: str                   # the words, as written
+    line: str                   # the source line, for display
+
+    def format(self, *, display_path: Optional[Path] = None) -> str:
+        """Return ``file:line: <source line>`` with the issue highlighted."""
+        path = display_path if display_path is not None else self.file
+        start = self.column - 1
+        end = len(self.line) if self.end_column is None else self.end_column - 1
+        if not (0 <= start < end <= len(self.line)):
+            return f"{path}:{self.lineno}: {self.line.strip()} [{self.kind}: {self.text}]"
+        highlighted = (
+            self.line[:start] + COLORS[self.kind] + self.line[start:end] + _RESET + self.line[end:]
+        )
+        return f"{path}:{self.lineno}: {highlighted.strip()}"
+
+
+# A word or punctuation mark of the text: (text, line, column, end column).
+_Token = Tuple[str, int, int, int]
+# Ends a run of words.
+_BREAK = None
+
+
+def _position(attr: list) -> Optional[Tuple[int, int]]:
+    """Return the start ``(line, column)`` of a +sourcepos wrapper Attr."""
+    for key, val in attr[2]:
+        if key == "data-pos" and val:
+            line, _, column = val.split("@")[-1].split("-")[0].partition(":")
+            return int(line), int(column)
+    return None
+
+
+def _tokens(node, position: Optional[Tuple[int, int]] = None) -> Iterator[Optional[_Token]]:
+    """Yield the word and punctuation tokens of *node*, with _BREAK between runs."""
+    if isinstance(node, list):
+        for item in node:
+            yield from _tokens(item, position)
+        return
+    if not isinstance(node, dict):
+        return
+
+    t = node.get("t")
+    if t in _SKIPPED_TYPES:
+        yield _BREAK
+    elif t == "Str":
+        line, column = position or (0, 0)
+        for m in _TOKEN_RE.finditer(node["c"]):
+            yield m.group(), line, column + m.start(), column + m.end()
+    elif t in _SPACE_TYPES:
+        pass
+    elif t == "Span":
+        # +sourcepos wraps every inline in a Span giving its position.
+        yield from _tokens(node["c"][1], _position(node["c"][0]) or position)
+    elif t in _BREAK_TYPES:
+        yield _BREAK
+        yield from _tokens(node.get("c"), position)
+        yield _BREAK
+    else:
+        yield from _tokens(node.get("c"), position)
+
+
+def _phrase_trie(phrases) -> dict:
+    """Return the token trie of *phrases*; the key None marks a phrase end."""
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for word in phrase:
+            node = node.setdefault(word, {})
+        node[None] = True
+    return trie
+
+
+_WEASEL_TRIE = _phrase_trie(WEASEL_PHRASES)
+
+
+def _find_issues(doc: dict) -> Iterator[Tuple[str, _Token, _Token]]:
+    """Yield ``(kind, first token, last token)`` for each issue in *doc*."""
+    partial: List[Tuple[dict, _Token]] = []   # weasel phrases begun so far
+    previous: Optional[_Token] = None         # the word just before, if no punctuation between
+    for token in _tokens(doc["blocks"]):
+        if token is _BREAK or not _WORD_RE.match(token[0]):
+            partial, previous = [], None
+            continue
+
+        word = token[0].lower()
+        matched = []
+        for node, first in partial + [(_WEASEL_TRIE, token)]:
+            node = node.get(word)
+            if node is not None:
+                matched.append((node, first))
+                if None in node:
+                    yield "weasel", first, token
+        partial = [(node, first) for node, first in matched if len(node) > (None in node)]
+
+        if previous is not None:
+            last = previous[0].lower()
+            if last in BE_VERBS and (word in IRREGULAR_PARTICIPLES or _PARTICIPLE_RE.match(word)):
+                yield "irregular", previous, token
+            if last == word:
+                yield "duplicate", previous, token
+        previous = token
+
+
+def check_file(path: Path, doc: Optional[dict] = None) -> List[StyleIssue]:
+    """Return the style issues of the Markdown file at *path*.
+
+    The file is parsed with parse_markdown unless its AST is passed as
+    *doc*.  Returns [] if it cannot be read or parsed.
+    """
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    if doc is None:
+        doc = parse_markdown(path)
+    if doc is None:
+        return []
+
+    issues: List[StyleIssue] = []
+    for kind, first, last in _find_issues(doc):
+        lineno, column = first[1], first[2]
+        line = lines[lineno - 1] if 0 < lineno <= len(lines) else ""
+        end_column = last[3] if last[1] == lineno else None
+        if not line.startswith(first[0], column - 1):
+            # Columns drift where the source spells text differently
+            # (entities, escapes): fall back to the word's first occurrence.
+            found = line.find(first[0])
+            if found < 0:
+                end_column = None
+            elif end_column is not None:
+                end_column += found + 1 - column
+            column = found + 1
+        if end_column is not None:
+            text = line[column - 1:end_column - 1]
+        else:
+            text = f"{first[0]} … {last[0]}"
+        issues.append(StyleIssue(
+            file=path,
+            lineno=lineno,
+            column=column,
+            end_column=end_column,
+            kind=kind,
+            text=text,
+            line=line,
+        ))
+    return issues
+
+
+def check_spec(
+    spec_root: Path,
+    workers: int = DEFAULT_WORKERS,
+    files: Optional[List[Path]] = None,
+) -> List[StyleIssue]:
+    """Return the style issues of the .md files under *spec_root*, sorted.
+
+    *spec_root* may be a single ``.md`` file or a directory.  If *files*
+    is given, only those of the .md files are checked.  Files are checked
+    in parallel, in up to *workers* processes.
+    """
+    return run_parallel_check(
+        collect_md_files(spec_root, only=files),
+        check_fn=check_file,
+        sort_key=lambda v: (str(v.file), v.lineno, v.column),
+        workers=workers,
+    )
+
+
+def format_report(issues: List[StyleIssue], spec_root: Optional[Path] = None) -> str:
+    """Format *issues* per file; file paths relative to *spec_root* if given."""
+    return _format_report(issues, "style", spec_root=spec_root)
@@ -271,3 +271,39 @@ def export_git_archive(base_filename: str, branch: str, output: Path) -> Path:
         ["git", "archive", "--format", "zip", "--output", str(filepath), branch]
     )
     return filepath
+
+
+def changed_files(
+    repo_root: Path,
+    since: Optional[str] = None,
+    *,
+    staged: bool = False,
+) -> list[Path]:
+    """Return the absolute paths of files changed in the repo containing repo_root.
+
+    since:  files that differ between the since ref and the working tree,
+            plus untracked (not ignored) files.
+    staged: files whose staged content differs from HEAD, i.e. what the
+            next commit changes.
+    With both, the union is returned.  Deleted files are left out.
+    """
+    if since is None and not staged:
+        raise ValueError("changed_files needs a since ref, staged=True, or both")
+
+    top_level = Path(
+        subprocess.check_output(["git", "rev-parse", "--show-toplevel"], cwd=repo_root)
+        .decode("utf-8")
+        .strip()
+    )
+    commands = []
+    if since is not None:
+        commands.append(["git", "diff", "--name-only", "-z", "--diff-filter=d", since, "--"])
+        commands.append(["git", "ls-files", "--others", "--exclude-standard", "--full-name", "-z"])
+    if staged:
+        commands.append(["git", "diff", "--cached", "--name-only", "-z", "--diff-filter=d", "--"])
+
+    names: set[str] = set()
+    for command in commands:
+        output = subprocess.check_output(command, cwd=top_level).decode("utf-8")
+        names.update(name for name in output.split("\0") if name)
+    return [top_level / name for name in sorted(names)]
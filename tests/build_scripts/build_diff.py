@@ -134,6 +134,7 @@ def build_diff(build_html: bool, build_pdf: bool, keep_pdf_latex: bool = False)
             exclude=[],
             keep_pdf_latex=keep_pdf_latex,
             heading_case_lint=False,
+            spellcheck=False,
             heading_proper_nouns=None,
             iso_xrefs=False,
         )
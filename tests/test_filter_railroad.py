@@ -0,0 +1,90 @@
+"""Tests for doc_build/filters/filter_railroad.py — the rules of the peg blocks."""
+
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# filter_railroad is a filter-side module and imports its siblings by bare
+# name, as the filters do.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "doc_build" / "filters"))
+
+from filter_railroad import (  # noqa: E402
+    RuleModel,
+    get_grammar_cache_version,
+    load_block_rules,
+    measure_diagrams,
+    parse_peg_blocks,
+    render_diagram,
+    report_grammar,
+)
+from shared_filter_utils import (  # noqa: E402
+    get_railroad_key,
+    railroad_pixels_to_points,
+    read_svg_size,
+)
+
+
+class TestRuleModel(unittest.TestCase):
+
+    def setUp(self):
+        self.model = RuleModel(parse_peg_blocks([
+            "A <- B (C)? / 'x' NAME",
+            "B <- A / 'y'",
+            "A <- B",
+            "B <- A / 'y'",
+        ]))
+
+    def test_definitions_by_name(self):
+        self.assertEqual(
+            {name: [str(rule.rhs) for rule in rules] for name, rules in self.model.definitions.items()},
+            {"A": ["B (C)? | ＇x＇ NAME", "B"], "B": ["A | ＇y＇"]},
+        )
+        self.assertEqual(self.model.resolve("C"), [])
+
+    def test_references_across_blocks(self):
+        self.assertEqual(self.model.undefined(), {"C": {"A"}})
+        self.assertEqual(self.model.conflicts(), ["A"])
+        lines = []
+        report_grammar(self.model, lines.append)
+        self.assertEqual(lines, [
+            "peg: C is used by A but defined by no peg block\n",
+            "peg: A is defined differently by 2 peg blocks\n",
+        ])
+
+
+class TestLoadBlockRules(unittest.TestCase):
+
+    def test_rules_of_another_version_are_reparsed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "part_grammar.pickle")
+            rules = load_block_rules({"k": "A <- B"}, path)
+            self.assertEqual([rule.name for rule in rules["k"]], ["A"])
+            with open(path, "rb") as f:
+                self.assertEqual(pickle.load(f)[0], get_grammar_cache_version())
+
+            with open(path, "wb") as f:
+                pickle.dump(("old", {"k": ["stale"]}), f)
+            self.assertEqual([rule.name for rule in load_block_rules({"k": "A <- B"}, path)["k"]], ["A"])
+
+
+
+class TestMeasureDiagrams(unittest.TestCase):
+
+    def test_widths_before_and_after_rendering(self):
+        codes = ["Wide <- A B C D E F G H I J K L M N O P", "Short <- A"]
+        with tempfile.TemporaryDirectory() as tmp:
+            predicted = measure_diagrams(codes, tmp, "part")
+            self.assertFalse(any(name.endswith(".svg") for name in os.listdir(tmp)))
+
+            for code in codes:
+                svg = os.path.join(tmp, f"part_{get_railroad_key(code)}.svg")
+                render_diagram(parse_peg_blocks([code])[0], svg)
+                self.assertEqual(railroad_pixels_to_points(read_svg_size(svg)[0]), predicted[codes.index(code)])
+            self.assertEqual(measure_diagrams(codes, tmp, "part"), predicted)
+        self.assertGreater(predicted[0], predicted[1])
+
+if __name__ == "__main__":
+    unittest.main()
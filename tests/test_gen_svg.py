@@ -0,0 +1,76 @@
+"""Tests for doc_build/filters/gen_svg.py — the railroad grammar simplifier."""
+
+import sys
+import unittest
+from pathlib import Path
+
+# gen_svg is a filter-side module and imports its siblings (railroad, pegen)
+# by bare name, as the filters do.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "doc_build" / "filters"))
+
+from gen_svg import (  # noqa: E402
+    Choice,
+    Gather,
+    Nonterminal,
+    Nothing,
+    Optional,
+    Repeated,
+    Sequence,
+    Terminal,
+)
+
+A = Nonterminal("A")
+B = Nonterminal("B")
+C = Nonterminal("C")
+
+
+class TestHashConsing(unittest.TestCase):
+    """Structurally equal nodes are the same object."""
+
+    def test_equal_nodes_are_identical(self):
+        self.assertIs(Sequence([A, Optional(B)]), Sequence((A, Optional(B))))
+        self.assertIs(Nothing(), Nothing())
+
+    def test_node_class_is_part_of_identity(self):
+        self.assertIsNot(Sequence([A, B]), Choice([A, B]))
+        self.assertIsNot(Terminal("A"), Nonterminal("A"))
+
+
+class TestSimplify(unittest.TestCase):
+    """simplify() returns the fixed point of the rewrite rules in one call."""
+
+    def test_simplify_is_idempotent(self):
+        rule = Choice([Sequence([A, B]), Sequence([A, C]), Nothing()])
+        simplified = rule.simplify()
+        self.assertIs(simplified.simplify(), simplified)
+
+    def test_sequence_flattens_and_drops_nothing(self):
+        rule = Sequence([A, Nonterminal("TYPE_COMMENT"), Sequence([B, C])])
+        self.assertIs(rule.simplify(), Sequence([A, B, C]))
+
+    def test_single_item_containers_collapse(self):
+        self.assertIs(Sequence([Choice([A])]).simplify(), A)
+        self.assertIs(Choice([]).simplify(), Nothing())
+
+    def test_choice_with_empty_alternative_becomes_optional(self):
+        self.assertIs(Choice([A, Nothing(), B]).simplify(), Optional(Choice([A, B])))
+
+    def test_common_head_is_factored_out(self):
+        rule = Choice([Sequence([A, B]), Sequence([A, C])])
+        self.assertIs(rule.simplify(), Sequence([A, Choice([B, C])]))
+
+    def test_common_tail_is_factored_out(self):
+        rule = Choice([Sequence([A, B]), Sequence([C, B])])
+        self.assertIs(rule.simplify(), Sequence([Choice([A, C]), B]))
+
+    def test_repeated_optional_becomes_optional_repeated(self):
+        self.assertIs(Repeated(Optional(A)).simplify(), Optional(Repeated(A)))
+        self.assertIs(Optional(Repeated(Optional(A))).simplify(), Optional(Repeated(A)))
+
+    def test_gather_without_separator_is_repeated(self):
+        self.assertIs(Gather(A, Nothing()).simplify(), Repeated(A))
+        self.assertIs(Gather(Nothing(), B).simplify(), Optional(Repeated(B)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Tests for doc_build/filters/heading_case.py — proper nouns in sentence case."""
+
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# heading_case is a filter-side module and imports pandocfilters by bare
+# name, as the filters do.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "doc_build" / "filters"))
+
+from heading_case import (  # noqa: E402
+    ProperNouns,
+    heading_needs_conversion,
+    is_proper_noun,
+    load_proper_nouns,
+    sentence_case_inlines,
+    yaml,
+)
+
+
+def _inlines(text):
+    words = [{"t": "Str", "c": word} for word in text.split()]
+    return [node for word in words for node in (word, {"t": "Space"})][:-1]
+
+
+class TestProperNouns(unittest.TestCase):
+
+    def setUp(self):
+        self.nouns = ProperNouns(["Pixar", "Universal Scene Description", "Scene Graph Viewer"])
+
+    def test_single_words_are_the_set(self):
+        self.assertEqual(set(self.nouns), {"Pixar"})
+        self.assertTrue(is_proper_noun("Pixar,", self.nouns))
+        self.assertFalse(is_proper_noun("Scene", self.nouns))
+
+    def test_phrase_words(self):
+        words = ["The", "Universal", "Scene", "Description,", "Scene", "graph", "Scene", "Graph", "Viewer"]
+        self.assertEqual(self.nouns.phrase_words(words), {1, 2, 3, 6, 7, 8})
+        self.assertEqual(self.nouns.phrase_words(["Universal", None, "Scene"]), set())
+
+    def test_sentence_case_keeps_phrases(self):
+        inlines = _inlines("Using Universal Scene Description With Pixar Tools")
+        self.assertTrue(heading_needs_conversion(inlines, self.nouns))
+        converted = sentence_case_inlines(inlines, self.nouns)
+        self.assertEqual(
+            " ".join(node["c"] for node in converted if node["t"] == "Str"),
+            "Using Universal Scene Description with Pixar tools",
+        )
+        self.assertFalse(heading_needs_conversion(_inlines("About Universal Scene Description"), self.nouns))
+
+    def test_pickle_round_trip(self):
+        copy = pickle.loads(pickle.dumps(self.nouns))
+        self.assertEqual(copy, self.nouns)
+        self.assertEqual(copy.phrases, self.nouns.phrases)
+
+
+@unittest.skipIf(yaml is None, "PyYAML is not installed")
+class TestLoadProperNouns(unittest.TestCase):
+
+    def test_loaded_once_per_file_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "nouns.yaml"
+            path.write_text("proper_nouns:\n  - Hydra\n", encoding="utf-8")
+            first = load_proper_nouns(path)
+            self.assertIs(load_proper_nouns(path), first)
+
+            path.write_text("proper_nouns:\n  - Hydra\n  - Open Source\n", encoding="utf-8")
+            os.utime(path, ns=(0, 0))
+            second = load_proper_nouns(path)
+            self.assertEqual(set(second), {"Hydra"})
+            self.assertEqual(second.phrase_words(["Open", "Source"]), {0, 1})
+        self.assertEqual(load_proper_nouns(Path(tmp) / "missing.yaml"), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
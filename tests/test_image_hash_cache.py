@@ -0,0 +1,68 @@
+"""Tests for doc_build/filters/image_hash_cache.py — the shared hash index."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from doc_build.filters.image_hash_cache import (
+    ImageHashCache,
+    copy_replacing,
+    link_or_copy,
+    sha256_file,
+)
+
+
+class TestImageHashCacheSave(unittest.TestCase):
+
+    def test_concurrent_saves_keep_each_others_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            index = root / "cache" / "image_hashes.json"
+            a, b = root / "a.png", root / "b.png"
+            a.write_bytes(b"a")
+            b.write_bytes(b"b")
+
+            # Two renders load the (empty) index, then each hashes one image.
+            first, second = ImageHashCache(index), ImageHashCache(index)
+            first.sha256(a)
+            second.sha256(b)
+            first.save()
+            second.save()
+
+            entries = json.loads(index.read_text(encoding="utf-8"))
+            self.assertEqual(
+                {Path(key).name: entry[3] for key, entry in entries.items()},
+                {"a.png": sha256_file(a), "b.png": sha256_file(b)},
+            )
+
+    def test_save_without_new_entries_does_not_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            index = Path(tmp) / "image_hashes.json"
+            ImageHashCache(index).save()
+            self.assertFalse(index.exists())
+
+
+
+class TestCopyReplacing(unittest.TestCase):
+
+    def test_copytree_does_not_write_through_bundle_links(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            spec, artifacts, bundle = root / "spec", root / "artifacts", root / "bundle"
+            spec.mkdir()
+            (spec / "a.png").write_bytes(b"old")
+            shutil.copytree(spec, artifacts, copy_function=copy_replacing)
+            link_or_copy(artifacts / "a.png", bundle / "a.png")
+
+            (spec / "a.png").write_bytes(b"new")
+            shutil.copytree(spec, artifacts, copy_function=copy_replacing, dirs_exist_ok=True)
+
+            self.assertEqual((artifacts / "a.png").read_bytes(), b"new")
+            self.assertEqual((bundle / "a.png").read_bytes(), b"old")
+            self.assertEqual(sorted(os.listdir(artifacts)), ["a.png"])
+
+if __name__ == "__main__":
+    unittest.main()
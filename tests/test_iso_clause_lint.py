@@ -1,14 +1,32 @@
 """Tests for doc_build.iso_clause_lint — focused on HTML comment handling."""
 
+import multiprocessing
+import os
 import tempfile
 import unittest
 from pathlib import Path
+from types import SimpleNamespace
 
 from doc_build.iso_clause_lint import (
     _is_html_comment_block,
     _strip_html_comment_lines,
     check_file,
+    check_spec,
 )
+from doc_build import iso_bold_table_lint
+from doc_build.iso_lint_utils import (
+    LintCheck,
+    LintResultsCache,
+    apply_line_fixes,
+    check_flattened,
+    collect_md_files,
+    parse_markdown,
+    run_parallel_check,
+    run_parallel_checks,
+    scan_markdown,
+    unwrap_sourcepos_spans,
+)
+from doc_build.source_map import SourceMap
 
 
 class TestIsHtmlCommentBlock(unittest.TestCase):
@@ -201,5 +219,208 @@ class TestCheckFileHtmlComments(unittest.TestCase):
         self.assertEqual(violations, [])
 
 
+
+class TestSharedParse(unittest.TestCase):
+    """check_file parses through the shared, content-memoised parse_markdown."""
+
+    def test_identical_content_parsed_once(self):
+        text = "# Parent\n\nReal body text.\n\n## Child\n\nText.\n"
+        first, second = _write_md(text), _write_md(text)
+        self.assertIs(parse_markdown(first), parse_markdown(second))
+        self.assertEqual(len(check_file(second)), 1)
+
+    def test_supplied_ast_is_used(self):
+        path = _write_md("# Parent\n\nReal body text.\n\n## Child\n\nText.\n")
+        clean = parse_markdown(_write_md("# Parent\n\n## Child\n\nText.\n"))
+        self.assertEqual(check_file(path, doc=clean), [])
+
+
+class TestResultsCache(unittest.TestCase):
+    """check_spec reuses cached results for unchanged files only."""
+
+    def test_results_survive_a_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            spec = Path(tmp) / "spec"
+            spec.mkdir()
+            (spec / "a.md").write_text("# Parent\n\nReal body text.\n\n## Child\n", encoding="utf-8")
+            (spec / "b.md").write_text("# Clean\n", encoding="utf-8")
+            cache_path = Path(tmp) / "cache.pickle"
+
+            cache = LintResultsCache(cache_path)
+            first = check_spec(spec, cache=cache)
+            cache.save()
+            self.assertTrue(cache_path.exists())
+            self.assertEqual(check_spec(spec, cache=LintResultsCache(cache_path)), first)
+
+            (spec / "a.md").write_text("# Parent\n\n## Child\n", encoding="utf-8")
+            self.assertEqual(check_spec(spec, cache=LintResultsCache(cache_path)), [])
+
+    def test_collect_only_listed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for name in ("a.md", "b.md", "c.txt"):
+                (root / name).write_text("x\n", encoding="utf-8")
+            only = [root / "b.md", root / "c.txt", root.parent / "elsewhere.md"]
+            self.assertEqual(collect_md_files(root, only=only), [root / "b.md"])
+
+
+class TestRunParallelCheck(unittest.TestCase):
+    """Worker processes give the in-process results; fail_fast stops early."""
+
+    def test_workers_and_fail_fast(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for name in ("a.md", "b.md", "c.md"):
+                (root / name).write_text(f"# {name}\n\nReal body text.\n\n## Child\n", encoding="utf-8")
+            (root / "clean.md").write_text("# Clean\n", encoding="utf-8")
+            md_files = collect_md_files(root)
+            sort_key = lambda v: (str(v.file), v.heading_lineno)
+
+            serial = run_parallel_check(md_files, check_file, sort_key, workers=1)
+            self.assertEqual(len(serial), 3)
+            self.assertEqual(run_parallel_check(md_files, check_file, sort_key, workers=2), serial)
+            # The call's pool is shut down with it: no worker outlives it.
+            self.assertEqual(multiprocessing.active_children(), [])
+
+            seen = []
+            first = run_parallel_check(
+                md_files, check_file, sort_key, workers=1,
+                on_file=lambda path, violations: seen.append((path.name, len(violations))),
+                fail_fast=True,
+            )
+            self.assertEqual(seen, [("a.md", 1)])
+            self.assertEqual(first, serial[:1])
+
+
+def _worker_of(path):
+    """A check reporting the process that checked *path*."""
+    return [(Path(path).name, os.getpid())]
+
+
+class TestRunParallelChecks(unittest.TestCase):
+    """The checks of a file run in one task; cached checks are not re-run."""
+
+    def _spec(self, root):
+        for name in ("a.md", "b.md", "c.md", "d.md"):
+            (root / name).write_text(f"# {name}\n\nReal body text.\n\n## Child\n", encoding="utf-8")
+        return collect_md_files(root)
+
+    def test_checks_of_a_file_share_its_worker(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            md_files = self._spec(Path(tmp))
+            first, second = run_parallel_checks(
+                md_files, [LintCheck(_worker_of, str), LintCheck(_worker_of, str)], workers=2,
+            )
+            self.assertEqual(len(first), 4)
+            self.assertEqual(sorted(first), sorted(second))
+            self.assertNotIn(os.getpid(), [pid for _, pid in first])
+
+    def test_partly_cached_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            md_files = self._spec(Path(tmp))
+            checked = []
+
+            def counted_check(path):
+                checked.append(path)
+                return check_file(path)
+
+            cache = LintResultsCache()
+            sort_key = lambda v: (str(v.file), v.heading_lineno)
+            clause = LintCheck(cache.wrap(counted_check, "iso_clause_lint", "1"), sort_key)
+            [expected] = run_parallel_checks(md_files, [clause], workers=1)
+
+            seen = []
+            violations, workers = run_parallel_checks(
+                md_files, [clause, LintCheck(_worker_of, str)], workers=1,
+                on_file=lambda path, found: seen.append((path.name, len(found))),
+            )
+            self.assertEqual(violations, expected)
+            self.assertEqual(len(checked), 4)
+            self.assertEqual(len(workers), 4)
+            self.assertEqual(seen, [(name, 2) for name in ("a.md", "b.md", "c.md", "d.md")])
+
+
+class TestApplyLineFixes(unittest.TestCase):
+    """Fixes of several linters found on one content are applied in one write."""
+
+    def test_fixes_of_two_linters(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.md"
+            path.write_text("# Values\n\n| Name | `code` |\n|---|---|\n| x | y |\n", encoding="utf-8")
+            path.chmod(0o640)
+            rows = iso_bold_table_lint.check_spec(path)
+            self.assertEqual(len(rows), 1)
+
+            results = apply_line_fixes([
+                ([SimpleNamespace(file=path, lineno=1)], str.upper),
+                iso_bold_table_lint.line_fixer(rows),
+            ])
+            self.assertEqual(results, [(1, 1), (1, 1)])
+            self.assertEqual(
+                path.read_text(encoding="utf-8"),
+                "# VALUES\n\n| **Name** | `code` |\n|---|---|\n| x | y |\n",
+            )
+            self.assertEqual(path.stat().st_mode & 0o777, 0o640)
+            self.assertEqual([p.name for p in Path(tmp).iterdir()], ["a.md"])
+
+
+class TestScanMarkdown(unittest.TestCase):
+    """scan_markdown finds the top-level headings Pandoc would, or says it cannot."""
+
+    def test_skips_code_and_comments(self):
+        scan = scan_markdown(
+            "# Parent ##\n\n```\n# not a heading\n| a |\n|---|\n```\n"
+            "<!--\n# hidden\n-->\n## Child\n\nText.\n"
+        )
+        self.assertFalse(scan.ambiguous)
+        self.assertEqual(
+            [(h.lineno, h.level, h.text, h.body_follows) for h in scan.headings],
+            [(1, 1, "Parent", True), (11, 2, "Child", True)],
+        )
+        self.assertEqual(scan.table_rows, [])
+
+    def test_constructs_left_to_pandoc(self):
+        for text in ("Title\n=====\n", "<div>\n# x\n</div>\n", "  # Indented\n", "```\n# open fence\n"):
+            self.assertTrue(scan_markdown(text).ambiguous, text)
+
+    def test_plain_inlines_match_pandoc(self):
+        text = "# Foo-Bar (x)/y, why? v1.2\n"
+        heading = parse_markdown(_write_md(text))["blocks"][0]
+        self.assertEqual(
+            scan_markdown(text).headings[0].plain_inlines(),
+            unwrap_sourcepos_spans(heading["c"][2]),
+        )
+        self.assertIsNone(scan_markdown("# It's *bold*\n").headings[0].plain_inlines())
+
+
+class TestCheckFlattened(unittest.TestCase):
+    """Checking a flattened document equals checking each of its sources."""
+
+    def test_matches_per_file_check(self):
+        readme = "# Spec\n\nIntro text.\n\n[Section](section.md)\n\n## Next\n"
+        section = "# Section\n\nBody text.\n\n## Sub\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "README.md").write_text(readme, encoding="utf-8")
+            (root / "section.md").write_text(section, encoding="utf-8")
+
+            # Flattened as DocBuilder.flatten does, after a generated intro.
+            readme_lines = readme.splitlines(keepends=True)
+            combined = "Intro.\n\n" + "".join(readme_lines[:4]) + section + "\n\n" + "".join(readme_lines[5:])
+            source_map = SourceMap()
+            source_map.add(3, "README.md", 1, 4)
+            source_map.add(7, "section.md", 1, 5)
+            source_map.add(14, "README.md", 6, 2)
+            combined_path = root / "combined.md"
+            combined_path.write_text(combined, encoding="utf-8")
+
+            violations = check_flattened(
+                parse_markdown(combined_path), source_map, check_file,
+                lambda v: (str(v.file), v.heading_lineno), root, root,
+            )
+            self.assertEqual(violations, check_spec(root, files=[root / "README.md", root / "section.md"]))
+            self.assertEqual([(v.file.name, v.heading_lineno) for v in violations], [("README.md", 1), ("section.md", 1)])
+
+
 if __name__ == "__main__":
     unittest.main()
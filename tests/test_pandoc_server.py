@@ -0,0 +1,105 @@
+"""Tests for doc_build/pandoc_server.py — requests, responses and the fallback."""
+
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from doc_build import pandoc_server
+from doc_build.pandoc_server import PANDOC_SERVER_ENV, PandocServer, convert
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers like ``pandoc server``, with the reply set on the server."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(request)
+        status, reply = self.server.reply(request)
+        body = json.dumps(reply).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Close the kept-alive connection without telling the client, as a
+        # server does with a connection left idle too long.
+        self.close_connection = self.server.drop_connections
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConvert(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.requests = []
+        self.server.reply = lambda request: (200, {"output": request["text"].upper()})
+        self.server.drop_connections = False
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+        env = mock.patch.dict(os.environ, {PANDOC_SERVER_ENV: self.url})
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(pandoc_server._dead_urls.clear)
+        self.addCleanup(self._close_connections)
+
+    def _close_connections(self):
+        for connection in getattr(pandoc_server._local, "connections", {}).values():
+            connection.close()
+        pandoc_server._local.connections = {}
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_request_and_output(self):
+        self.assertEqual(convert("# Title", "commonmark_x", "json", wrap="none"), "# TITLE")
+        self.assertEqual(
+            self.server.requests,
+            [{"wrap": "none", "text": "# Title", "from": "commonmark_x", "to": "json"}],
+        )
+
+    def test_unusable_replies(self):
+        for status, reply in ((500, {"output": "x"}), (200, {"base64": True, "output": "eA=="}),
+                              (200, {"error": "x"}), (200, ["x"])):
+            self.server.reply = lambda request: (status, reply)
+            self.assertIsNone(convert("x", "markdown", "plain"))
+        # Rejected conversions do not take the server out of use.
+        self.server.reply = lambda request: (200, {"output": "ok"})
+        self.assertEqual(convert("x", "markdown", "plain"), "ok")
+
+    def test_connection_closed_while_idle(self):
+        self.server.drop_connections = True
+        self.assertEqual(convert("a", "markdown", "plain"), "A")
+        self.assertEqual(convert("b", "markdown", "plain"), "B")
+        self.assertNotIn(self.url, pandoc_server._dead_urls)
+
+    def test_server_gone(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertIsNone(convert("a", "markdown", "plain"))
+        self.assertIn(self.url, pandoc_server._dead_urls)
+
+    def test_no_server(self):
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertIsNone(convert("a", "markdown", "plain"))
+        self.assertEqual(self.server.requests, [])
+
+
+class TestPandocServer(unittest.TestCase):
+
+    def test_missing_binary(self):
+        with mock.patch.dict(os.environ, clear=True):
+            with PandocServer(binary="no-such-pandoc") as server:
+                self.assertIsNone(server.url)
+                self.assertNotIn(PANDOC_SERVER_ENV, os.environ)
+                self.assertIsNone(convert("a", "markdown", "plain"))
+
+
+if __name__ == "__main__":
+    unittest.main()
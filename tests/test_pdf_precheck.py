@@ -0,0 +1,165 @@
+"""Tests for doc_build.pdf_precheck and doc_build.source_map."""
+
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from doc_build.pdf_precheck import (
+    TEXT_WIDTH_PT,
+    collect_text_by_font,
+    find_missing_glyphs,
+    load_font_coverage,
+    locate_characters,
+    locate_lines_in_order,
+    mono_char_width,
+    predict_overflows,
+    read_cmap,
+)
+from doc_build.source_map import SourceMap
+
+FONTS_DIR = Path(__file__).resolve().parent.parent / "doc_build" / "fonts"
+
+try:
+    from doc_build.doc_builder import DocBuilder
+except SystemExit:  # pandoc, tectonic or git is not installed
+    DocBuilder = None
+
+
+def _para(*inlines):
+    return {"blocks": [{"t": "Para", "c": list(inlines)}]}
+
+
+class TestReadCmap(unittest.TestCase):
+    """read_cmap() decodes the Unicode cmap subtables of the bundled fonts."""
+
+    def test_basic_latin_and_supplementary_planes(self):
+        serif = read_cmap(FONTS_DIR / "DejaVuSerif.ttf")
+        self.assertIn(ord("A"), serif)
+        self.assertNotIn(0x29F5, serif)
+        # Mathematical alphanumerics live outside the BMP (format 12 only).
+        self.assertIn(0x1D400, read_cmap(FONTS_DIR / "DejaVuMathTeXGyre.ttf"))
+
+    def test_coverage_cache_round_trip(self):
+        font = FONTS_DIR / "DejaVuSansMono.ttf"
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = Path(tmp) / "font_coverage.json"
+            first = load_font_coverage([font], cache)
+            self.assertTrue(cache.exists())
+            self.assertEqual(load_font_coverage([font], cache), first)
+        self.assertEqual(first[font.name], frozenset(read_cmap(font)))
+
+
+class TestCollectTextByFont(unittest.TestCase):
+    """Text is attributed to the face of its role and emphasis."""
+
+    def test_roles(self):
+        ast = _para(
+            {"t": "Str", "c": "a"},
+            {"t": "Code", "c": [["", [], []], "b"]},
+            {"t": "Math", "c": [{"t": "InlineMath"}, "x ∖ y"]},
+            {"t": "RawInline", "c": ["latex", "⧵"]},
+        )
+        self.assertEqual(
+            collect_text_by_font(ast),
+            {
+                "DejaVuSerif.ttf": {"a"},
+                "DejaVuSansMono.ttf": {"b"},
+                "DejaVuMathTeXGyre.ttf": {"∖"},
+            },
+        )
+
+    def test_emphasis_selects_face(self):
+        ast = _para({"t": "Strong", "c": [{"t": "Emph", "c": [{"t": "Str", "c": "z"}]}]})
+        self.assertEqual(collect_text_by_font(ast), {"DejaVuSerif-BoldItalic.ttf": {"z"}})
+
+
+class TestFindMissingGlyphs(unittest.TestCase):
+
+    def test_reports_only_uncovered_characters(self):
+        ast = _para(
+            {"t": "Str", "c": "set⧵minusé"},
+            {"t": "Math", "c": [{"t": "InlineMath"}, "a ∖ b"]},
+        )
+        self.assertEqual(find_missing_glyphs(ast, [FONTS_DIR]), {"⧵": {"DejaVuSerif.ttf"}})
+
+    def test_locate_characters(self):
+        self.assertEqual(locate_characters("a\nb⧵\n⧵", ["⧵"]), {"⧵": [2, 3]})
+
+
+class TestPredictOverflows(unittest.TestCase):
+    """Code lines and railroad diagrams are measured against the text width."""
+
+    def setUp(self):
+        self.chars_per_line = int(TEXT_WIDTH_PT // mono_char_width(FONTS_DIR))
+
+    def _code(self, code, classes=()):
+        return {"t": "CodeBlock", "c": [["", list(classes), []], code]}
+
+    def test_code_lines(self):
+        fits = "x" * self.chars_per_line
+        too_wide = "y" * (self.chars_per_line + 2)
+        ast = {"blocks": [self._code(f"{fits}\n{too_wide}"), self._code(too_wide, ["math"])]}
+        self.assertEqual([o.text for o in predict_overflows(ast, FONTS_DIR)], [too_wide])
+
+    def test_nesting_and_peg_emphasis(self):
+        fits = "x" * self.chars_per_line
+        nested = {"t": "BulletList", "c": [[self._code(fits)]]}
+        peg = self._code(f"**{fits}**", ["peg"])
+        self.assertEqual([o.text for o in predict_overflows({"blocks": [nested, peg]}, FONTS_DIR)], [fits])
+
+    def test_railroad_diagram(self):
+        ast = {"blocks": [self._code("Rule: A B", ["peg"]), self._code("Empty: ", ["peg"])]}
+        widths = {"Rule: A B": TEXT_WIDTH_PT + 5, "Empty: ": None}
+        overflows = predict_overflows(ast, FONTS_DIR, railroad_width=widths.get)
+        self.assertEqual([(o.kind, o.text) for o in overflows], [("railroad", "Rule: A B")])
+        self.assertAlmostEqual(overflows[0].excess_pt, 5)
+
+    def test_locate_lines_in_order(self):
+        text = "x\nb\nx"
+        self.assertEqual(locate_lines_in_order(text, ["b", "x", "x", "zzz"]), [2, 3, 3, None])
+
+
+class TestSourceMap(unittest.TestCase):
+
+    def test_locate_across_segments(self):
+        source_map = SourceMap()
+        source_map.add(1, "README.md", 1)
+        source_map.add(2, "README.md", 2)
+        source_map.add(3, "section.md", 1, 10)
+        source_map.shift(5)
+        self.assertEqual(source_map.segments, [(6, "README.md", 1, 2), (8, "section.md", 1, 10)])
+        self.assertEqual(source_map.locate(7), ("README.md", 2))
+        self.assertEqual(source_map.format(12), "section.md:5")
+        self.assertIsNone(source_map.locate(3))
+        self.assertIsNone(source_map.locate(18))
+
+
+@unittest.skipIf(DocBuilder is None, "the build tools are not installed")
+class TestPrecheckPdf(unittest.TestCase):
+
+    def _precheck(self, **args):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp)
+            combined = output / "combined_spec.md"
+            # A character the pre-check predicts missing, whether or not the
+            # typeset PDF would really drop it.
+            combined.write_text("Set minus: a ⧵ b\n", encoding="utf-8")
+            args = SimpleNamespace(no_overflow_precheck=True, **args)
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                DocBuilder(repo_root=tmp)._precheck_pdf(args, combined, output)
+            return stderr.getvalue()
+
+    def test_predicted_miss_is_reported_only(self):
+        self.assertIn("⧵", self._precheck())
+
+    def test_strict_precheck_fails_the_build(self):
+        with self.assertRaises(SystemExit):
+            self._precheck(strict_precheck=True)
+        self._precheck(strict_precheck=True, no_check_glyphs=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
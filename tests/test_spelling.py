@@ -0,0 +1,115 @@
+"""Tests for doc_build/filters/spelling.py — the known-words store."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from doc_build.filters.spelling import (
+    KnownWords,
+    load_word_list,
+    misspelled_words,
+    parse_pipe_output,
+)
+
+
+class _Speller:
+    """Flags the words of *bad*; records each batch it is asked to check."""
+
+    def __init__(self, bad, version="1"):
+        self.bad = set(bad)
+        self.version = version
+        self.batches = []
+
+    def dictionary(self, language):
+        return f"test {self.version}"
+
+    def check(self, words, language):
+        self.batches.append(list(words))
+        return {w: [p for p in w.strip(".,").split("-") if p in self.bad] for w in words}
+
+
+class TestParsePipeOutput(unittest.TestCase):
+
+    def test_results_per_line(self):
+        output = (
+            "@(#) International Ispell Version 3.1.20 (but really Aspell 0.60.8)\n"
+            "*\n\n"
+            "& teh 3 0: the, tea, ten\n*\n\n"
+            "\n"
+            "# Xyzzy 0\n\n"
+        )
+        self.assertEqual(
+            parse_pipe_output(["good", "teh-word", "", "Xyzzy."], output),
+            {"good": [], "teh-word": ["teh"], "": [], "Xyzzy.": ["Xyzzy"]},
+        )
+
+
+class TestMisspelledWords(unittest.TestCase):
+
+    def test_only_new_words_are_checked(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = Path(tmp) / "cache" / "known_words.json"
+            speller = _Speller({"teh"})
+            found = misspelled_words(["the", "teh,", "the"], "en", store, spellchecker=speller)
+            self.assertEqual(found, {"teh,": ["teh"]})
+            self.assertEqual(speller.batches, [["the", "teh,"]])
+
+            speller = _Speller({"teh"})
+            found = misspelled_words(["teh,", "the", "new"], "en", store, spellchecker=speller)
+            self.assertEqual(found, {"teh,": ["teh"]})
+            self.assertEqual(speller.batches, [["new"]])
+
+            speller = _Speller({"teh"})
+            misspelled_words(["the", "new"], "en", store, spellchecker=speller)
+            self.assertEqual(speller.batches, [])
+
+    def test_project_words_apply_to_known_words(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = Path(tmp) / "known_words.json"
+            speller = _Speller({"OpenUSD", "teh"})
+            self.assertEqual(
+                misspelled_words(["OpenUSD-teh", "OpenUSD."], "en", store, spellchecker=speller),
+                {"OpenUSD-teh": ["OpenUSD", "teh"], "OpenUSD.": ["OpenUSD"]},
+            )
+            self.assertEqual(
+                misspelled_words(
+                    ["OpenUSD-teh", "OpenUSD."], "en", store, {"OpenUSD"}, spellchecker=speller
+                ),
+                {"OpenUSD-teh": ["teh"]},
+            )
+            self.assertEqual(len(speller.batches), 1)
+
+    def test_new_dictionary_starts_afresh(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = Path(tmp) / "known_words.json"
+            misspelled_words(["colour"], "en", store, spellchecker=_Speller({"colour"}))
+            misspelled_words(["Farbe"], "de", store, spellchecker=_Speller(()))
+
+            speller = _Speller((), version="2")
+            self.assertEqual(misspelled_words(["colour"], "en", store, spellchecker=speller), {})
+            self.assertEqual(speller.batches, [["colour"]])
+
+            data = json.loads(store.read_text(encoding="utf-8"))
+            self.assertEqual(sorted(data), ["de | test 1", "en | test 2"])
+
+    def test_unreadable_store_is_empty(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = Path(tmp) / "known_words.json"
+            store.write_text("not json", encoding="utf-8")
+            self.assertIsNone(KnownWords(store, "en", "test 1").get("word"))
+
+
+class TestLoadWordList(unittest.TestCase):
+
+    def test_comments_and_blank_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "words.txt"
+            path.write_text("# comment\n\nOpenUSD\n  prims  \n", encoding="utf-8")
+            self.assertEqual(load_word_list(path), {"OpenUSD", "prims"})
+            self.assertEqual(load_word_list(Path(tmp) / "missing.txt"), set())
+            self.assertEqual(load_word_list(None), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Tests for doc_build.style_check."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from doc_build.style_check import check_file, check_spec
+
+
+def _issues(text):
+    with tempfile.NamedTemporaryFile("w", suffix=".md", delete=False, encoding="utf-8") as f:
+        f.write(text)
+    path = Path(f.name)
+    try:
+        return [(i.lineno, i.kind, i.text) for i in check_file(path)]
+    finally:
+        path.unlink()
+
+
+class TestCheckFile(unittest.TestCase):
+
+    def test_kinds_and_locations(self):
+        text = (
+            "# Title\n\n"
+            "It is used in *many* places, and there are a number\n"
+            "of them. The the end was written [down](x.md).\n"
+        )
+        self.assertEqual(
+            _issues(text),
+            [
+                (3, "irregular", "is used"),
+                (3, "weasel", "many"),
+                (3, "weasel", "are a number"),
+                (4, "duplicate", "The the"),
+                (4, "irregular", "was written"),
+            ],
+        )
+
+    def test_code_math_and_punctuation_end_runs(self):
+        text = "Code `is used` and $x$ is $y$ computed.\n\nIt is. Done, done.\n\n```\nvery very\n```\n"
+        self.assertEqual(_issues(text), [])
+
+    def test_phrases_span_lines_and_markup(self):
+        self.assertEqual(_issues("It was\n**built** here.\n"), [(1, "irregular", "was … built")])
+
+
+class TestCheckSpec(unittest.TestCase):
+
+    def test_only_listed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "a.md").write_text("Very clear.\n", encoding="utf-8")
+            (root / "b.md").write_text("Quite clear.\n", encoding="utf-8")
+            issues = check_spec(root, files=[root / "b.md"])
+            self.assertEqual([(i.file.name, i.lineno, i.text) for i in issues], [("b.md", 1, "Quite")])
+
+
+if __name__ == "__main__":
+    unittest.main()